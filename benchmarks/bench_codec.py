@@ -0,0 +1,105 @@
+"""Compare the sysex codec with the former list-building `Device` dump / load functions.
+
+Run with `python -m benchmarks.bench_codec`.
+"""
+
+from timeit import timeit
+from typing import List, Sequence, Tuple
+
+from mverb3.core.bank import BANK
+from mverb3.core.model import Bank, Program
+from mverb3.core import codec
+
+PROG_MAP_TABLE = list(BANK[-257:-1])
+NUMBER = 200
+
+
+def _load_value(byte_1: int, byte_2: int) -> int:
+    return ((byte_2 & 7) << 7) | (byte_1 & 127)
+
+
+def _dump_value(value: int) -> Tuple[int, int]:
+    return value & 127, (value >> 7) & 7
+
+
+def legacy_dump_program_to_bin(program: Program) -> List[int]:
+    return [
+        *_dump_value(program.in_eq),
+        *_dump_value(program.out_eq),
+        *_dump_value(program.chrs_type),
+        *_dump_value(program.chrs_speed),
+        *_dump_value(program.dly_time >> 8),
+        *_dump_value(program.dly_time),
+        *_dump_value(program.dly_regen),
+        *_dump_value(program.rev_type),
+        *_dump_value(program.rev_decay),
+        *_dump_value(program.rev_mix),
+        *_dump_value(program.dly_mix),
+        *_dump_value(program.configuration),
+        *_dump_value(program.mod_routing),
+        *_dump_value(program.mod_amount),
+        0, 0, 0, 0,
+    ]
+
+
+def legacy_dump_current_bank_to_syx(bank: Bank, midi_channel: int) -> bytes:
+    data = [0xF0, *codec.HEADER[1:], 0x00]
+    for prog in bank.programs:
+        data.extend(legacy_dump_program_to_bin(prog))
+    data.extend(legacy_dump_program_to_bin(bank.edit_buffer))
+    data.extend((*_dump_value(bank.program_id), 0, 0, 0, 0, 0, 0, *_dump_value(midi_channel), *_dump_value(1)))
+    data.extend(PROG_MAP_TABLE)
+    data.append(0xF7)
+    return bytes(data)
+
+
+def legacy_load_program_from_bin(data: Sequence[int]) -> Program:
+    dly_time = (_load_value(data[8], 0) << 8) | _load_value(data[10], data[11])
+    return Program(
+        in_eq=_load_value(data[0], data[1]),
+        out_eq=_load_value(data[2], data[3]),
+        chrs_type=_load_value(data[4], data[5]),
+        chrs_speed=_load_value(data[6], data[7]),
+        dly_time=dly_time,
+        dly_regen=_load_value(data[12], data[13]),
+        rev_type=_load_value(data[14], data[15]),
+        rev_decay=_load_value(data[16], data[17]),
+        rev_mix=_load_value(data[18], data[19]),
+        dly_mix=_load_value(data[20], data[21]),
+        configuration=_load_value(data[22], data[23]),
+        mod_routing=_load_value(data[24], data[25]),
+        mod_amount=_load_value(data[26], data[27]),
+    )
+
+
+def legacy_load_current_bank_from_syx(data: Sequence[int]) -> Bank:
+    data = data[6:-1]
+    programs = [legacy_load_program_from_bin(data[n * 32 : n * 32 + 32]) for n in range(101)]
+    offset = 101 * 32
+    return Bank(programs=programs[:-1], edit_buffer=programs[-1], program_id=_load_value(data[offset], data[offset + 1]))
+
+
+def main() -> None:
+    bank = codec.decode_bank(BANK, 6)
+    assert legacy_load_current_bank_from_syx(BANK) == bank
+    assert legacy_dump_current_bank_to_syx(bank, 15) == codec.encode_bank_message(bank, 15, PROG_MAP_TABLE)
+    cases = [
+        (
+            "bank encode",
+            lambda: legacy_dump_current_bank_to_syx(bank, 15),
+            lambda: codec.encode_bank_message(bank, 15, PROG_MAP_TABLE),
+        ),
+        (
+            "bank decode",
+            lambda: legacy_load_current_bank_from_syx(BANK),
+            lambda: codec.decode_bank(BANK, 6),
+        ),
+    ]
+    for name, legacy, current in cases:
+        t_legacy = timeit(legacy, number=NUMBER) / NUMBER * 1e6
+        t_current = timeit(current, number=NUMBER) / NUMBER * 1e6
+        print(f"{name:12} legacy {t_legacy:8.1f} us  codec {t_current:8.1f} us  x{t_legacy / t_current:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Measure the edit history memory and the cost of recording, undoing and redoing changes.
+
+Run with `python -m benchmarks.bench_history`. A session is simulated as slider drags (many changes of one param
+close in time, merged into one step) separated by pauses, until the history is full.
+"""
+
+import random
+from time import perf_counter
+
+from mverb3.core.schema import PARAMS
+from mverb3.history import EditHistory
+
+DRAG_LENGTH = 30  # changes per slider drag
+DRAG_STEP = 0.02  # seconds between the changes of a drag
+PAUSE = 2.0  # seconds between drags
+
+
+def main() -> None:
+    history = EditHistory()
+    size = sum(a.itemsize * len(a) for a in (history._params, history._old, history._new, history._steps))  # noqa
+    rnd = random.Random(0)
+    values = [param.minimum for param in PARAMS]
+    now, changes = 0.0, 0
+    started_at = perf_counter()
+    while len(history) < history.capacity or changes < 2 * history.capacity * DRAG_LENGTH:
+        param = rnd.choice(PARAMS)
+        for _ in range(DRAG_LENGTH):
+            new = rnd.randint(param.minimum, param.maximum)
+            history.record(param.param_id, values[param.param_id], new, now)
+            values[param.param_id] = new
+            now += DRAG_STEP
+            changes += 1
+        now += PAUSE
+    record_time = perf_counter() - started_at
+    steps = 0
+    started_at = perf_counter()
+    while history.can_undo:
+        history.undo()
+        steps += 1
+    undo_time = perf_counter() - started_at
+    started_at = perf_counter()
+    while history.can_redo:
+        history.redo()
+    redo_time = perf_counter() - started_at
+    print(f"{changes} changes merged into {steps} steps, {size / 1024:.0f} KiB ({size / history.capacity:.0f} B/step)")
+    print(f"record {record_time / changes * 1e6:.2f} us/change")
+    print(f"undo   {undo_time / steps * 1e6:.2f} us/step  redo {redo_time / steps * 1e6:.2f} us/step")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Measure the import time of the headless `mverb3.core` package.
+
+Run with `python -m benchmarks.bench_import`. Exits with an error if the core package pulls in the GUI or MIDI
+dependencies or takes longer than `BUDGET_MS` to import.
+"""
+
+import json
+import subprocess
+import sys
+from statistics import median
+
+MODULES = ["mverb3.core", "mverb3.core.codec", "mverb3.core.data", "mverb3.core.bank"]
+FORBIDDEN = ["PySide6", "rtmidi", "mverb3.app", "mverb3.ui"]
+BUDGET_MS = 100
+RUNS = 5
+
+_SCRIPT = """
+import json, sys, time
+t = time.perf_counter()
+{imports}
+t = time.perf_counter() - t
+print(json.dumps({{"ms": t * 1000, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure() -> dict:
+    script = _SCRIPT.format(imports="\n".join(f"import {name}" for name in MODULES))
+    output = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    results = [measure() for _ in range(RUNS)]
+    ms = median(result["ms"] for result in results)
+    loaded = [
+        name for name in results[0]["modules"] if any(name == f or name.startswith(f + ".") for f in FORBIDDEN)
+    ]
+    print(f"mverb3.core import: {ms:.1f} ms (median of {RUNS}, budget {BUDGET_MS} ms)")
+    if loaded:
+        sys.exit(f"mverb3.core imports GUI / MIDI modules: {', '.join(loaded)}")
+    if ms > BUDGET_MS:
+        sys.exit(f"mverb3.core import is over the budget: {ms:.1f} ms > {BUDGET_MS} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Compare the program switch redraw latency of the former `Device.refresh_ui` with `ProgramView`.
+
+Run with `python -m benchmarks.bench_refresh`. The main window is rendered by the offscreen Qt platform, each switch
+is followed by processing the pending events (including the repaint), like scrolling through `PROGRAM_ID`.
+"""
+
+import os
+from statistics import median
+from time import perf_counter
+from typing import Callable, List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QSignalBlocker  # noqa: E402
+from PySide6.QtWidgets import QApplication, QMainWindow, QWidget  # noqa: E402
+
+from mverb3.core import codec  # noqa: E402
+from mverb3.core.bank import BANK  # noqa: E402
+from mverb3.core.data import (  # noqa: E402
+    EQ, CHORUS_ALGORITHMS, REVERB_ALGORITHMS, MODULATION_SOURCES, MODULATION_DESTINATIONS
+)
+from mverb3.core.model import Program  # noqa: E402
+from mverb3.ui.main import Ui_UIMainWindow  # noqa: E402
+from mverb3.view import ProgramView  # noqa: E402
+
+ROUNDS = 5
+
+
+def legacy_refresh_ui(window: QMainWindow, ui: Ui_UIMainWindow, program: Program, program_id: int) -> None:
+    blockers = [QSignalBlocker(widget) for widget in window.findChildren(QWidget)]
+    value = program.configuration
+    if value == 13 or value == 14:
+        ui.DLY_TIME.setMaximum(490)
+    else:
+        ui.DLY_TIME.setMaximum(100)
+    ui.IN_EQ.setValue(program.in_eq)
+    ui.IN_EQ_L.setText(EQ[program.in_eq])
+    ui.OUT_EQ.setValue(program.out_eq)
+    ui.OUT_EQ_L.setText(EQ[program.out_eq])
+    ui.CHRS_TYPE.setCurrentIndex(program.chrs_type // 2)
+    ui.CHRS_TYPE.setToolTip(CHORUS_ALGORITHMS[program.chrs_type // 2]['characteristics'])
+    ui.CHRS_STEREO.setChecked(program.chrs_type % 2)
+    ui.CHRS_SPEED.setValue(program.chrs_speed)
+    ui.CHRS_SPEED_L.setText(str(program.chrs_speed))
+    ui.DLY_TIME.setValue(program.dly_time)
+    ui.DLY_TIME_L.setText(str(program.dly_time))
+    ui.DLY_REGEN.setValue(program.dly_regen)
+    ui.DLY_REGEN_L.setText(str(program.dly_regen))
+    ui.DLY_MIX.setValue(program.dly_mix)
+    ui.DLY_MIX_L.setText(str(program.dly_mix))
+    ui.REV_DECAY.setValue(program.rev_decay)
+    ui.REV_DECAY_L.setText(str(program.rev_decay))
+    ui.REV_MIX.setValue(program.rev_mix)
+    ui.REV_MIX_L.setText(str(program.rev_mix))
+    ui.REVERB_TYPE.setCurrentIndex(program.rev_type)
+    ui.REVERB_TYPE.setToolTip(REVERB_ALGORITHMS[program.rev_type]['characteristics'])
+    ui.MOD_AMT.setValue(program.mod_amount)
+    ui.MOD_AMT_L.setText(str(program.mod_amount - 99))
+    if program.mod_routing == 0:
+        ui.MOD_SOURCE.setCurrentIndex(0)
+        ui.MOD_DEST.setCurrentIndex(0)
+    elif program.mod_routing % 8 == 0:
+        ui.MOD_SOURCE.setCurrentIndex(0)
+        ui.MOD_DEST.setCurrentIndex(program.mod_routing // 8)
+    else:
+        ui.MOD_SOURCE.setCurrentIndex(program.mod_routing % 8)
+        ui.MOD_DEST.setCurrentIndex(program.mod_routing // 8 + 1)
+    ui.MOD_SOURCE.setToolTip(MODULATION_SOURCES[ui.MOD_SOURCE.currentIndex()]['description'])
+    ui.MOD_DEST.setToolTip(MODULATION_DESTINATIONS[ui.MOD_DEST.currentIndex()]['description'])
+    ui.CONFIGURATION.setCurrentIndex(program.configuration)
+    ui.PROGRAM_ID.setValue(program_id)
+    ui.BANK_PATH.setText("bank.syx")
+    ui.PROG_NAME.setText("---")
+    blockers.clear()
+
+
+def measure(app: QApplication, programs: List[Program], refresh: Callable[[int, Program], None]) -> List[float]:
+    """Get the switch latencies in milliseconds scrolling through all the programs `ROUNDS` times."""
+    latencies = []
+    for _ in range(ROUNDS):
+        for n, program in enumerate(programs):
+            started_at = perf_counter()
+            refresh(n, program)
+            app.processEvents()
+            latencies.append((perf_counter() - started_at) * 1000)
+    return latencies
+
+
+def main() -> None:
+    app = QApplication([])
+    window = QMainWindow()
+    ui = Ui_UIMainWindow()
+    ui.setupUi(window)
+    window.show()
+    app.processEvents()
+    programs = list(codec.decode_bank(BANK, 6).programs)
+    view = ProgramView(ui)
+
+    def _view_refresh(n: int, program: Program) -> None:
+        view.render(program)
+        blocker = QSignalBlocker(ui.PROGRAM_ID)
+        ui.PROGRAM_ID.setValue(n + 100)
+        blocker.unblock()
+
+    cases = [
+        ("legacy", lambda n, program: legacy_refresh_ui(window, ui, program, n + 100)),
+        ("view", _view_refresh),
+    ]
+    for name, refresh in cases:
+        latencies = sorted(measure(app, programs, refresh))
+        p95 = latencies[int(len(latencies) * 0.95)]
+        print(f"{name:8} median {median(latencies):6.2f} ms  p95 {p95:6.2f} ms  max {latencies[-1]:6.2f} ms")
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,12 @@
-import sys
-from PySide6.QtWidgets import QApplication
-from mverb3.app import _MainWindow, Device
-
 __all__ = ["main"]
 
 
 def main():
+    # the GUI is imported lazily, so the headless `mverb3.core` package doesn't load Qt
+    import sys
+    from PySide6.QtWidgets import QApplication
+    from mverb3.app import _MainWindow, Device
+
     app = QApplication(sys.argv)
     app.setApplicationName("MidiVerb III")
     window = _MainWindow()
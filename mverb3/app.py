@@ -1,36 +1,47 @@
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from time import monotonic
 from pathlib import Path
-from threading import Thread, Lock
-from typing import Union, List, Sequence, Tuple
-from time import sleep
+from threading import Thread
+from typing import Union, List, Optional, Sequence, Tuple
 
 import rtmidi
-from PySide6.QtCore import QUrl, QSignalBlocker
-from PySide6.QtWidgets import QMainWindow, QDialog, QFileDialog, QWidget, QComboBox, QMessageBox
+from PySide6.QtCore import Qt, QUrl, QSignalBlocker, QTimer
+from PySide6.QtWidgets import (
+    QMainWindow, QDialog, QFileDialog, QComboBox, QMessageBox, QProgressBar, QLabel
+)
 from PySide6.QtGui import QDesktopServices
 
-from mverb3.bank import BANK
+from mverb3.browser import ProgramFilterModel, ProgramTableModel
+from mverb3.core import codec, smf, sysex
+from mverb3.core.bank import BANK
+from mverb3.core.model import Program, Bank
+from mverb3.core.schema import PARAMS, PARAMS_BY_NAME
+from mverb3.compare import SLOT_NAMES, CompareSlots
+from mverb3.history import EditHistory
+from mverb3.metrics import TimedLock, TransportMetrics
+from mverb3.pacing import PacingProfile, Probe, tune
+from mverb3.proxy import DEFAULT_RATE, NOTE_NUMBER, NOTE_VELOCITY, NOTE_PRIORITIES, MonoReducer, RateLimiter, ThruProxy
+from mverb3.scheduler import MessageScheduler
+from mverb3.transport import Transport, Transfer, TransferError
+from mverb3.sync import DeviceState, plan_program_update
+from mverb3.receiver import SysexReceiver
+from mverb3.store import ProgramStore
+from mverb3.trace import SENT, TraceRecorder
 from mverb3.ui.main import Ui_UIMainWindow
+from mverb3.view import ProgramView
 from mverb3.ui.settings import Ui_SETTINGS
 from mverb3.ui.about import Ui_AboutDialog
-from mverb3.data import EQ, CHORUS_ALGORITHMS, REVERB_ALGORITHMS, MODULATION_SOURCES, MODULATION_DESTINATIONS
+from mverb3.ui.browser import Ui_BrowserDialog
 
 __all__ = ["Program", "Bank", "Settings", "Device"]
 
 
-def _load_value(byte_1: int, byte_2: int) -> int:
-    return ((byte_2 & 7) << 7) | (byte_1 & 127)
-
-
-def _dump_value(value: int) -> Tuple[int, int]:
-    return value & 127, (value >> 7) & 7
-
-
-def _trace_midi(send_message_f):
+def _trace_midi(send_message_f, recorder: TraceRecorder):
 
     def _wrap(message: Sequence[Union[bytes, int]], *args, **kws):
-        print([hex(s) for s in message])
+        recorder.record(SENT, message)
         return send_message_f(message, *args, **kws)
 
     return _wrap
@@ -50,6 +61,13 @@ class _AboutDlg(QDialog):
         self._ui.setupUi(self)
 
 
+class _BrowserDlg(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ui = Ui_BrowserDialog()
+        self._ui.setupUi(self)
+
+
 class _MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -57,30 +75,6 @@ class _MainWindow(QMainWindow):
         self._ui.setupUi(self)
 
 
-@dataclass
-class Program:
-    in_eq: int = 0
-    out_eq: int = 0
-    chrs_type: int = 0
-    chrs_speed: int = 0
-    dly_time: int = 0
-    dly_regen: int = 0
-    rev_type: int = 0
-    rev_decay: int = 0
-    rev_mix: int = 0
-    dly_mix: int = 0
-    mod_amount: int = 0
-    mod_routing: int = 0
-    configuration: int = 0
-
-
-@dataclass
-class Bank:
-    programs: List[Program]
-    edit_buffer: Program
-    program_id: int
-
-
 @dataclass
 class Settings:
     midi_in_port: Union[str, None]
@@ -91,6 +85,12 @@ class Settings:
     auto_send_prog_to_device_on_save: bool
     trace: bool
     rom_programs: list[int]
+    live_sliders: bool = False
+    pacing: dict = field(default_factory=dict)  # tuned pacing profiles by MIDI out port
+    thru_port: Union[str, None] = None
+    thru_rate: int = int(DEFAULT_RATE)  # messages per second per controller
+    thru_note_priority: Union[str, None] = "last"  # mono note priority, None to pass notes through
+    thru_retrigger: bool = False
 
 
 class Device:
@@ -100,8 +100,20 @@ class Device:
     PATH = Path("~/.mverb3").expanduser()
     SETTINGS = "settings.json"
     CURRENT_BANK = "bank.syx"
+    DEVICE_STATE = "device.json"
+    STORE = "store.db"
+    TRACE = "midi.trace"
     PROG_NUM = 100
-    REFRESH_RATE_MS = 50
+    # default pacing, used unless the device timing is tuned
+    PARAM_INTERVAL_MS = 25  # minimum gap between two parameter messages
+    PROGRAM_CHANGE_DELAY_MS = 50
+    BUFFER_DUMP_DELAY_MS = 330  # service guide recommended timeout
+    PROGRAM_STORE_DELAY_MS = 330  # same as for the buffer dump
+    BANK_DUMP_DELAY_MS = 10000  # service guide recommended timeout
+    BANK_REQUEST_TIMEOUT_MS = 10000
+    STATUS_TIMEOUT_MS = 3000
+    THRU_STATUS_INTERVAL_MS = 1000
+    METRICS_STATUS_INTERVAL_MS = 1000
     HELP_URL = "https://github.com/violet-black/midiverb3"
 
     _bank: Bank
@@ -111,19 +123,71 @@ class Device:
     def __init__(self, window: _MainWindow):
         self._window = window
         self._ui = window._ui  # noqa
-        self._midi_lock = Lock()
-        self._queue: dict[int, int] = {}
-        self._midi_thread: Thread = Thread(target=self._process_message_queue, daemon=True)
+        self._metrics = TransportMetrics(lambda: len(self._queue))
+        self._midi_lock = TimedLock(self._metrics.lock_wait)
+        self._pacing = self.default_pacing()
+        self._queue = MessageScheduler(self._send_param, self._pacing.param_interval, self._metrics)
+        self._midi_thread: Thread = Thread(target=self._queue.run, daemon=True)
+        self._device = DeviceState(self.PROG_NUM)
+        self._transport = Transport(self._midi_lock, lambda message: self._send_message(message), window)
         self._midi_in = rtmidi.MidiIn()
+        self._midi_in.ignore_types(sysex=False)
+        self._receiver = SysexReceiver()
+        self._midi_in.set_callback(self._receiver)
         self._midi_out = rtmidi.MidiOut()
+        self._thru_in = rtmidi.MidiIn()
+        self._rate_limiter = RateLimiter()
+        self._mono = MonoReducer()
+        self._thru = ThruProxy(self._send_thru, [self._mono, self._rate_limiter])
+        self._thru_thread: Thread = Thread(target=self._thru.run, daemon=True)
+        self._thru_in.set_callback(self._thru)
         self.PROG_MAP_TABLE = []
+        self._progress = QProgressBar()
+        self._progress.setMaximumWidth(200)
+        self._progress.setTextVisible(False)
+        self._progress.hide()
+        self._ui.statusbar.addPermanentWidget(self._progress)
+        self._view = ProgramView(self._ui)
+        self._history = EditHistory()
+        self._compare = CompareSlots()
+        self._programs = ProgramTableModel(
+            [self._ui.CONFIGURATION.itemText(n) for n in range(self._ui.CONFIGURATION.count())], window
+        )
+        self._browser: Optional[_BrowserDlg] = None
+        self._metrics_status = QLabel()
+        self._ui.statusbar.addPermanentWidget(self._metrics_status)
+        self._metrics_timer = QTimer(window)
+        self._metrics_timer.setInterval(self.METRICS_STATUS_INTERVAL_MS)
+        self._metrics_timer.timeout.connect(self.refresh_metrics_status)
+        self._metrics_timer.start()
+        self._thru_status = QLabel()
+        self._thru_status.hide()
+        self._ui.statusbar.addPermanentWidget(self._thru_status)
+        self._thru_timer = QTimer(window)
+        self._thru_timer.setInterval(self.THRU_STATUS_INTERVAL_MS)
+        self._thru_timer.timeout.connect(self.refresh_thru_status)
         self.init()
+        self._trace: Optional[TraceRecorder] = None
         if self._settings.trace:
-            self._send_message = _trace_midi(self._send_message)
+            self._trace = TraceRecorder(self.PATH / self.TRACE)
+            self._trace_thread = Thread(target=self._trace.run, daemon=True)
+            self._trace_thread.start()
+            self._send_message = _trace_midi(self._send_message, self._trace)
+            self._midi_in.set_callback(self._trace.tap(self._receiver))
         self._ui.actionNew.triggered.connect(self.open_bank_new_dlg)
         self._ui.actionBankSave.triggered.connect(self.save_current_bank)
+        self._ui.actionBankRevert.triggered.connect(self.revert_current_bank)
         self._ui.actionImport.triggered.connect(self.open_file_import_dlg)
+        self._ui.actionBrowsePrograms.triggered.connect(self.open_browser_dlg)
+        self._ui.actionUndo.triggered.connect(self.undo_edit)
+        self._ui.actionRedo.triggered.connect(self.redo_edit)
+        for slot, action in enumerate(
+            (self._ui.actionCompareA, self._ui.actionCompareB, self._ui.actionCompareC, self._ui.actionCompareD)
+        ):
+            action.triggered.connect(lambda *_, n=slot: self.compare_slot(n))
+        self._ui.actionCompareToggle.triggered.connect(self.toggle_compare)
         self._ui.actionBankExport.triggered.connect(self.open_bank_export_dlg)
+        self._ui.actionBankExportMidi.triggered.connect(self.open_bank_export_mid_dlg)
         self._ui.actionBufferExport.triggered.connect(self.open_program_export_dlg)
         self._ui.actionSettings.triggered.connect(self.open_settings_dlg)
         self._ui.actionHelp.triggered.connect(self.open_help)
@@ -131,33 +195,31 @@ class Device:
         self._ui.actionQuit.triggered.connect(self.close)
         self._ui.actionStoreProgram.triggered.connect(self.save_buffer_to_device_program_slot)
         self._ui.actionDeviceStoreBank.triggered.connect(self.save_current_bank_to_device)
+        self._ui.actionDeviceStoreChanges.triggered.connect(self.save_changed_programs_to_device)
         self._ui.actionDeviceRequestBank.triggered.connect(self.request_bank_dump)
+        self._ui.actionDeviceTuneTiming.triggered.connect(self.tune_device_timing)
+        self._ui.actionDeviceResetTiming.triggered.connect(self.reset_device_timing)
+        self._ui.actionDeviceCancel.triggered.connect(self._transport.cancel)
+        self._ui.actionDeviceExportMetrics.triggered.connect(self.open_metrics_export_dlg)
+        self._transport.started.connect(self.on_transfer_started)
+        self._transport.progress.connect(self.on_transfer_progress)
+        self._transport.finished.connect(self.on_transfer_finished)
+        self._transport.failed.connect(self.on_transfer_failed)
+        self._transport.cancelled.connect(self.on_transfer_cancelled)
         self._ui.PROGRAM_ID.valueChanged.connect(self.on_program_change)
-        self._ui.CONFIGURATION.currentIndexChanged.connect(self.on_configuration_change)
         self._ui.PROG_SYNC.clicked.connect(self.send_current_program_to_device_buffer)
         self._ui.PROG_RECALL.clicked.connect(self.recall_stored_program)
-        self._ui.IN_EQ.sliderReleased.connect(self.on_in_eq_change)
-        self._ui.CHRS_TYPE.currentIndexChanged.connect(self.on_chrs_type_change)
-        self._ui.CHRS_STEREO.stateChanged.connect(self.on_chrs_type_change)
-        self._ui.CHRS_SPEED.sliderReleased.connect(self.on_chrs_speed_change)
-        self._ui.DLY_TIME.sliderReleased.connect(self.on_dly_time_change)
-        self._ui.DLY_REGEN.sliderReleased.connect(self.on_dly_regen_change)
-        self._ui.DLY_MIX.sliderReleased.connect(self.on_dly_mix_change)
-        self._ui.REVERB_TYPE.currentIndexChanged.connect(self.on_rev_type_change)
-        self._ui.REV_DECAY.sliderReleased.connect(self.on_rev_decay_change)
-        self._ui.REV_MIX.sliderReleased.connect(self.on_rev_mix_change)
-        self._ui.OUT_EQ.sliderReleased.connect(self.on_out_eq_change)
-        self._ui.MOD_SOURCE.currentIndexChanged.connect(self.on_mod_source_dest_change)
-        self._ui.MOD_DEST.currentIndexChanged.connect(self.on_mod_source_dest_change)
-        self._ui.MOD_AMT.sliderReleased.connect(self.on_mod_amount_change)
+        self._view.connect(self.on_param_change)
         self._ui.PROG_NAME.textEdited.connect(self.on_program_name_change)
 
     def on_program_name_change(self, *_):
         name = self._ui.PROG_NAME.text()
         self._program_names[self._bank.program_id] = name
+        self._programs.program_changed(self._bank.program_id)
 
     def init(self) -> None:
         self.load_settings()
+        self.open_store()
         self.init_prog_map_table()
         self.open_midi_in()
         self.open_midi_out()
@@ -165,7 +227,10 @@ class Device:
             self.init_bank(self.PATH / self.CURRENT_BANK)
         else:
             self.load_current_bank_from_file(self._settings.bank_path)
+        self.open_thru()
+        self.load_device_state()
         self._midi_thread.start()
+        self._thru_thread.start()
         self._queue.clear()
 
     def init_prog_map_table(self):
@@ -178,29 +243,32 @@ class Device:
         Thus, MIDI program values 0-99 are mapped to the editable presets.
         MIDI program values 100-127 are mapped to the first 28 of not editable presets just in case.
 
-        `editable_programs` - ids of editable programs
         `rom_programs` - ids of non-editable programs
         `PROG_MAP_TABLE` contains 128 program ids in Midiverb format as expected by the device and in final order.
         """
-        editable_programs = [self.PROG_NUM + n for n in range(self.PROG_NUM)]
         self.PROG_MAP_TABLE.clear()
-
-        for n in editable_programs:
-            self.PROG_MAP_TABLE.extend(_dump_value(n))
-
-        for n in self._settings.rom_programs:
-            self.PROG_MAP_TABLE.extend(_dump_value(n))
-
-        print(self.PROG_MAP_TABLE)
+        self.PROG_MAP_TABLE.extend(codec.encode_prog_map(codec.prog_map_ids(self._settings.rom_programs)))
 
     def close(self) -> None:
+        self._transport.close()
+        self._queue.close()
         self._midi_thread.join(timeout=1.0)
+        self._metrics_timer.stop()
+        self._thru_timer.stop()
+        self._thru_in.close_port()
+        self._thru.close()
+        self._thru_thread.join(timeout=1.0)
         with self._midi_lock:
             self._midi_in.close_port()
             self._midi_out.close_port()
             self._window.close()
+        if self._trace:
+            self._trace.close()
+            self._trace_thread.join(timeout=1.0)
         self.save_settings()
+        self.save_device_state()
         self.dump_current_bank_to_file(self._settings.bank_path)
+        self._store.close()
 
     def open_midi_in(self) -> None:
         if not self._settings.midi_in_port:
@@ -213,6 +281,7 @@ class Device:
         self._queue.clear()
 
     def open_midi_out(self) -> None:
+        self.load_pacing()
         if not self._settings.midi_out_port:
             return
         self._midi_out.close_port()
@@ -221,6 +290,64 @@ class Device:
             return
         self._midi_out.open_port(ports.index(self._settings.midi_out_port))
         self._queue.clear()
+        self._device = DeviceState(self.PROG_NUM)
+
+    def open_thru(self) -> None:
+        """Forward the thru port input to the device through the rate limiter."""
+        self._thru_in.close_port()
+        self._thru_timer.stop()
+        self._thru_status.hide()
+        self._rate_limiter.rate = self._settings.thru_rate
+        self._mono.priority = self._settings.thru_note_priority or self._mono.priority
+        self._mono.retrigger = self._settings.thru_retrigger
+        self.update_thru_mono()
+        if not self._settings.thru_port:
+            return
+        ports = self._thru_in.get_ports()
+        if self._settings.thru_port not in ports:
+            return
+        self._thru_in.open_port(ports.index(self._settings.thru_port))
+        self._thru_in.ignore_types(sysex=False)
+        self.refresh_thru_status()
+        self._thru_status.show()
+        self._thru_timer.start()
+
+    def update_thru_mono(self) -> None:
+        """Collapse thru notes to one voice while the edit buffer is modulated by the note number or velocity."""
+        routing = self._bank.edit_buffer.mod_routing
+        source = routing % 8 if routing else None
+        self._mono.source = source
+        self._mono.active = bool(self._settings.thru_note_priority) and source in (NOTE_NUMBER, NOTE_VELOCITY)
+
+    def refresh_metrics_status(self) -> None:
+        self._metrics_status.setText(str(self._metrics))
+        self._metrics_status.setToolTip(
+            f"Max latency {self._metrics.latency.max * 1000:.0f} ms, max gap {self._metrics.gap.max * 1000:.0f} ms,"
+            f" max lock wait {self._metrics.lock_wait.max * 1000:.0f} ms, sent {self._metrics.messages} messages"
+        )
+
+    def refresh_thru_status(self) -> None:
+        stats = self._thru.report()
+        self._thru_status.setText(f"Thru: {stats.forwarded}/{stats.received}")
+        self._thru_status.setToolTip(
+            "\n".join([str(stats), *(f"{name}: {count} thinned" for name, count in stats.sources.items())])
+        )
+
+    def default_pacing(self) -> PacingProfile:
+        return PacingProfile(
+            param_interval=self.PARAM_INTERVAL_MS / 1000,
+            program_change_delay=self.PROGRAM_CHANGE_DELAY_MS / 1000,
+            buffer_dump_delay=self.BUFFER_DUMP_DELAY_MS / 1000,
+            program_store_delay=self.PROGRAM_STORE_DELAY_MS / 1000,
+            bank_dump_delay=self.BANK_DUMP_DELAY_MS / 1000,
+        )
+
+    def load_pacing(self) -> None:
+        """Use the tuned pacing profile of the MIDI out port or the defaults."""
+        profile = self._settings.pacing.get(self._settings.midi_out_port)
+        default = self.default_pacing()
+        self._pacing = PacingProfile.from_dict(profile, default) if profile else default
+        self._queue.interval = self._pacing.param_interval
 
     def load_settings(self) -> None:
         _path = self.PATH / self.SETTINGS
@@ -234,7 +361,13 @@ class Device:
                 auto_send_buffer_on_prog_change=False,
                 auto_send_prog_to_device_on_save=False,
                 trace=False,
-                rom_programs=rom_programs_default
+                rom_programs=rom_programs_default,
+                live_sliders=False,
+                pacing={},
+                thru_port=None,
+                thru_rate=int(DEFAULT_RATE),
+                thru_note_priority="last",
+                thru_retrigger=False,
             )
             return
 
@@ -257,7 +390,13 @@ class Device:
                     "auto_send_prog_to_device", False
                 ),
                 trace=data.get("trace", False),
-                rom_programs=rom_programs_default
+                rom_programs=rom_programs_default,
+                live_sliders=data.get("live_sliders", False),
+                pacing=data.get("pacing", {}),
+                thru_port=data.get("thru_port"),
+                thru_rate=data.get("thru_rate", int(DEFAULT_RATE)),
+                thru_note_priority=data.get("thru_note_priority", "last"),
+                thru_retrigger=data.get("thru_retrigger", False),
             )
 
     def save_settings(self) -> None:
@@ -266,6 +405,33 @@ class Device:
         with open(_path, "w") as f:
             f.write(json.dumps(asdict(self._settings)))
 
+    def load_device_state(self) -> None:
+        """Load the programs last confirmed on the device. The state is ignored if the MIDI out port has changed."""
+        _path = self.PATH / self.DEVICE_STATE
+        if not _path.exists():
+            return
+        with open(_path, "r") as f:
+            data = json.loads(f.read())
+        if data.get("midi_out_port") != self._settings.midi_out_port:
+            return
+        for n, prog in enumerate(data.get("slots", [])[:self.PROG_NUM]):
+            self._device.slots[n] = Program(**prog) if prog else None
+
+    def open_store(self) -> None:
+        _path = self.PATH / self.STORE
+        _path.parent.mkdir(parents=True, exist_ok=True)
+        self._store = ProgramStore(_path)
+
+    def save_device_state(self) -> None:
+        _path = self.PATH / self.DEVICE_STATE
+        _path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "midi_out_port": self._settings.midi_out_port,
+            "slots": [prog.asdict() if prog else None for prog in self._device.slots]
+        }
+        with open(_path, "w") as f:
+            f.write(json.dumps(data))
+
     def init_bank(self, fp: Union[str, Path]) -> None:
         fp = Path(fp)
         fp.parent.mkdir(parents=True, exist_ok=True)
@@ -276,21 +442,31 @@ class Device:
         self.load_current_bank_from_syx(BANK)
 
     def recall_stored_program(self) -> None:
-        self._bank.edit_buffer = Program(
-            **asdict(self._bank.programs[self._bank.program_id])
-        )
+        self._bank.edit_buffer = self._bank.programs[self._bank.program_id]
+        self._history.clear()
+        self._compare.detach()
         self.send_current_program_to_device_buffer()
         self.refresh_ui()
 
     def save_current_bank(self) -> None:
-        self._bank.programs[self._bank.program_id] = Program(
-            **asdict(self._bank.edit_buffer)
-        )
+        self._bank.programs[self._bank.program_id] = self._bank.edit_buffer
+        self._programs.program_changed(self._bank.program_id)
         self.dump_current_bank_to_file(self._settings.bank_path)
+        self._store.commit(self._settings.bank_path, self.dump_current_bank_to_syx())
         self.save_program_names(Path(self._settings.bank_path))
         if self._settings.auto_send_prog_to_device_on_save:
             self.save_buffer_to_device_program_slot()
 
+    def revert_current_bank(self) -> None:
+        """Load the previously saved version of the current bank. The current state is saved in the store first."""
+        snapshot = self._store.previous(self._settings.bank_path, self.dump_current_bank_to_syx())
+        if snapshot is None:
+            self._ui.statusbar.showMessage("No previous version of the bank", self.STATUS_TIMEOUT_MS)
+            return
+        self.load_current_bank_from_syx(self._store.load(snapshot.id))
+        saved_at = datetime.fromtimestamp(snapshot.created).strftime("%Y-%m-%d %H:%M:%S")
+        self._ui.statusbar.showMessage(f"Reverted to the bank saved at {saved_at}", self.STATUS_TIMEOUT_MS)
+
     def save_program_names(self, fp: Path):
         bank_filenames_fp = fp.parent / f'{fp.stem}.txt'
         with open(bank_filenames_fp, 'w') as f:
@@ -299,133 +475,83 @@ class Device:
 
     def dump_current_bank_to_file(self, fp: Union[Path, str]) -> None:
         with open(fp, "wb") as f:
-            f.write(bytes(self.dump_current_bank_to_syx()))
+            f.write(self.dump_current_bank_to_syx())
 
     def load_current_bank_from_file(self, fp: Union[Path, str]) -> None:
         with open(fp, "rb") as f:
             self.load_program_names(Path(fp))
             self.load_current_bank_from_syx(f.read())
 
-    def dump_current_bank_to_syx(self) -> List[int]:
+    def dump_current_bank_to_syx(self) -> bytearray:
         """Dump the entire bank to a syx data dump.
 
         If sent to the device the whole bank will be written to EEPROM. It may take up to 10 sec! All programs will
         be also rewritten forever!
         """
-        data = [0xF0, *self.MANUFACTURER_ID, self.DEVICE_ID, 0x00]
-        data.extend(self.dump_bank_to_bin(self._bank))
-        data.append(0xF7)
-        return data
+        return codec.encode_bank_message(self._bank, self._settings.midi_channel, self.PROG_MAP_TABLE)
 
     def load_current_bank_from_syx(self, data: Sequence[int]) -> None:
-        self._bank = self.load_bank_from_bin(data[6:-1])
+        self.set_current_bank(self.load_bank_from_bin(memoryview(bytes(data))[6:-1]))
+
+    def set_current_bank(self, bank: Bank) -> None:
+        self._bank = bank
+        self._programs.set_bank(bank, self._program_names)
+        self._history.clear()
+        self._compare.detach()
         self._queue.clear()
         self.send_current_program_id_to_device()
         self.send_current_program_to_device_buffer()
         self.refresh_ui()
 
-    def dump_bank_to_bin(self, bank: Bank) -> List[int]:
-        data = []
-        for prog in bank.programs:
-            data.extend(self.dump_program_to_bin(prog))
-        data.extend(self.dump_program_to_bin(bank.edit_buffer))
-        data.extend(
-            (
-                *_dump_value(bank.program_id),  # selected program slot
-                0, 0,  # edit buffer off
-                0, 0,  # edit step off
-                0, 0,  # midi echo off
-                *_dump_value(self._settings.midi_channel),
-                *_dump_value(1),  # program change enabled
-            )
-        )
-        data.extend(self.PROG_MAP_TABLE)
-        return data
+    def dump_current_bank_to_mid(self, fp: Union[Path, str]) -> None:
+        """Write the bank, the program change and the edit buffer to a MIDI file with the device delays between them.
 
-    def load_bank_from_bin(self, data: Sequence[int]) -> Bank:
-        offset, prog_size = 0, 32
-        programs = []
-        for n in range(self.PROG_NUM + 1):
-            program = self.load_program_from_bin(data[offset : offset + prog_size])
-            programs.append(program)
-            offset += prog_size
-        prog_num = _load_value(data[offset], data[offset + 1])
-        bank = Bank(
-            programs=programs[:-1], edit_buffer=programs[-1], program_id=prog_num
+        Playing the file restores the device state the same way `save_current_bank_to_device` and
+        `switch_device_program` do.
+        """
+        smf.write_smf(
+            fp,
+            [
+                (self.dump_current_bank_to_syx(), self.BANK_DUMP_DELAY_MS / 1000),
+                ((0xC0 + self._settings.midi_channel, self._bank.program_id), self.PROGRAM_CHANGE_DELAY_MS / 1000),
+                (self.dump_program_to_syx(self.PROG_NUM), self.BUFFER_DUMP_DELAY_MS / 1000),
+            ],
         )
-        return bank
+
+    def dump_bank_to_bin(self, bank: Bank) -> bytearray:
+        return codec.encode_bank(bank, self._settings.midi_channel, self.PROG_MAP_TABLE)
+
+    def load_bank_from_bin(self, data: codec.Buffer) -> Bank:
+        return codec.decode_bank(data)
 
     def dump_current_program_to_file(self, file_path: Path) -> None:
         with open(file_path, "wb") as f:
-            f.write(bytes(self.dump_program_to_syx()))
+            f.write(self.dump_program_to_syx())
 
     def load_current_program_from_file(self, file_path: Path) -> None:
         with open(file_path, "rb") as f:
             self.load_current_program_from_syx(f.read())
 
     def load_current_program_from_syx(self, data: Sequence[int]) -> None:
-        data = self.load_program_from_bin(data[7:-1])
+        data = self.load_program_from_bin(memoryview(bytes(data))[7:-1])
         self._bank.edit_buffer = data
+        self._history.clear()
+        self._compare.detach()
         self._queue.clear()
         self.send_current_program_to_device_buffer()
         self.refresh_ui()
 
-    def dump_program_to_syx(self, program_id: int = PROG_NUM) -> List[int]:
-        """Dump program to a syx file."""
-        data = [
-            0xF0,
-            *self.MANUFACTURER_ID,
-            self.DEVICE_ID,
-            0x01,
-            program_id,
-            *self.dump_program_to_bin(self._bank.edit_buffer),
-            0xF7,
-        ]
-        return data
+    def dump_program_to_syx(self, program_id: int = PROG_NUM, program: Optional[Program] = None) -> bytearray:
+        """Dump program (the edit buffer by default) to a syx file."""
+        return codec.encode_program_message(program or self._bank.edit_buffer, program_id)
 
-    def dump_program_to_bin(self, program: Program) -> List[int]:
-        data = [
-            *_dump_value(program.in_eq),
-            *_dump_value(program.out_eq),
-            *_dump_value(program.chrs_type),
-            *_dump_value(program.chrs_speed),
-            *_dump_value(program.dly_time >> 8),
-            *_dump_value(program.dly_time),
-            *_dump_value(program.dly_regen),
-            *_dump_value(program.rev_type),
-            *_dump_value(program.rev_decay),
-            *_dump_value(program.rev_mix),
-            *_dump_value(program.dly_mix),
-            *_dump_value(program.configuration),
-            *_dump_value(program.mod_routing),
-            *_dump_value(program.mod_amount),
-            0,
-            0,
-            0,
-            0,
-        ]
+    def dump_program_to_bin(self, program: Program) -> bytearray:
+        data = bytearray(codec.PROG_SIZE)
+        codec.encode_program(program, data)
         return data
 
-    def load_program_from_bin(self, data: Sequence[int]) -> Program:
-        dly_time_msb = _load_value(data[8], 0)
-        dly_time_lsb = _load_value(data[10], data[11])
-        dly_time = (dly_time_msb << 8) | dly_time_lsb
-        data = Program(
-            in_eq=_load_value(data[0], data[1]),
-            out_eq=_load_value(data[2], data[3]),
-            chrs_type=_load_value(data[4], data[5]),
-            chrs_speed=_load_value(data[6], data[7]),
-            dly_time=dly_time,
-            dly_regen=_load_value(data[12], data[13]),
-            rev_type=_load_value(data[14], data[15]),
-            rev_decay=_load_value(data[16], data[17]),
-            rev_mix=_load_value(data[18], data[19]),
-            dly_mix=_load_value(data[20], data[21]),
-            configuration=_load_value(data[22], data[23]),
-            mod_routing=_load_value(data[24], data[25]),
-            mod_amount=_load_value(data[26], data[27]),
-        )
-        return data
+    def load_program_from_bin(self, data: codec.Buffer) -> Program:
+        return codec.decode_program(data)
 
     def open_file_import_dlg(self, *_) -> None:
         dlg = QFileDialog(self._window)
@@ -433,25 +559,59 @@ class Device:
         dlg.setAcceptMode(QFileDialog.AcceptMode.AcceptOpen)
         if dlg.exec():
             fp = Path(dlg.selectedFiles()[0])
-            with open(fp, "rb") as f:
-                data = f.read()
-                if data[:6] == bytes(
-                    [0xF0, *self.MANUFACTURER_ID, self.DEVICE_ID, 0x00]
-                ):
-                    self._settings.bank_path = str(fp)
-                    self.load_current_bank_from_syx(data)
-                    self.load_program_names(fp)
-                elif data[:6] == bytes(
-                    [0xF0, *self.MANUFACTURER_ID, self.DEVICE_ID, 0x01]
-                ):
-                    self.load_current_program_from_syx(data)
-                else:
-                    box = QMessageBox()
-                    box.setText('Unsupported file format')
-                    box.setInformativeText(
-                        'Only MidiVerb III sysex banks or programs with the proper device id are supported. '
-                        'Are you sure you are trying to open a MidiVerb III file?')
-                    box.exec_()
+            try:
+                imported = self.import_file(fp)
+            except ValueError as exc:
+                box = QMessageBox()
+                box.setText('Unsupported file format')
+                box.setInformativeText(f'The file is malformed: {exc}.')
+                box.exec_()
+                return
+            if not imported:
+                box = QMessageBox()
+                box.setText('Unsupported file format')
+                box.setInformativeText(
+                    'Only MidiVerb III sysex banks or programs with the proper device id are supported. '
+                    'Are you sure you are trying to open a MidiVerb III file?')
+                box.exec_()
+
+    def import_file(self, fp: Path) -> bool:
+        """Import all bank and program dumps from a sysex or MIDI file in the order they were recorded.
+
+        Bank dumps replace the current bank and program dumps are stored in their slots as the device would do it,
+        so librarian captures with many messages can be imported. A file with a single program is loaded into the
+        edit buffer. Junk and unrelated messages are skipped. Returns `False` if the file has no MidiVerb III dumps.
+
+        The file becomes the working bank file only if it holds a single bank dump and nothing else, so saving the
+        bank never overwrites a capture.
+        """
+        bank = self._bank.copy()
+        is_midi = smf.is_smf(fp)
+        banks, programs, last = 0, 0, None
+        for frame in smf.read_frames(fp) if is_midi else sysex.read_frames(fp):
+            last = frame
+            if frame.command == sysex.BANK_DUMP:
+                bank = self.load_bank_from_bin(frame.body)
+                banks += 1
+                continue
+            programs += 1
+            program = self.load_program_from_bin(frame.body)
+            if frame.slot == self.PROG_NUM:
+                bank.edit_buffer = program
+            else:
+                bank.programs[frame.slot] = program
+        if last is None:
+            return False
+        if not banks and programs == 1:
+            self.load_current_program_from_syx(last.message)
+            return True
+        if banks:
+            if not is_midi and banks == 1 and not programs and fp.stat().st_size == len(last.message):
+                # only a plain bank file round-trips, a capture with other messages must not be overwritten
+                self._settings.bank_path = str(fp)
+            self.load_program_names(fp)
+        self.set_current_bank(bank)
+        return True
 
     def load_program_names(self, fp: Path) -> None:
         bank_filenames_fp = fp.parent / f'{fp.stem}.txt'
@@ -491,6 +651,26 @@ class Device:
             fp = Path(dlg.selectedFiles()[0])
             self.dump_current_bank_to_file(fp)
 
+    def open_bank_export_mid_dlg(self, *_) -> None:
+        dlg = QFileDialog(self._window)
+        dlg.setDefaultSuffix(".mid")
+        dlg.setNameFilter("MIDI files (*.mid)")
+        dlg.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
+        if dlg.exec():
+            fp = Path(dlg.selectedFiles()[0])
+            self.dump_current_bank_to_mid(fp)
+
+    def open_metrics_export_dlg(self, *_) -> None:
+        dlg = QFileDialog(self._window)
+        dlg.setDefaultSuffix(".json")
+        dlg.setNameFilters(["JSON (*.json)", "Prometheus text (*.prom)"])
+        dlg.filterSelected.connect(lambda name: dlg.setDefaultSuffix(".prom" if "*.prom" in name else ".json"))
+        dlg.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
+        if dlg.exec():
+            fp = Path(dlg.selectedFiles()[0])
+            with open(fp, "w") as f:
+                f.write(self._metrics.to_prometheus() if fp.suffix == ".prom" else self._metrics.to_json())
+
     def open_settings_dlg(self, *_) -> None:
 
         def _set_port(
@@ -515,13 +695,20 @@ class Device:
         port_out_id = _set_port(
             self._midi_out, dlg._ui.PORT_OUT, self._settings.midi_out_port
         )
+        thru_id = _set_port(self._thru_in, dlg._ui.THRU, self._settings.thru_port)
         dlg._ui.CHANNEL.setValue(self._settings.midi_channel + 1)
+        dlg._ui.THRU_RATE.setValue(self._settings.thru_rate)
+        priorities = [None, *NOTE_PRIORITIES]
+        if self._settings.thru_note_priority in priorities:
+            dlg._ui.THRU_MONO.setCurrentIndex(priorities.index(self._settings.thru_note_priority))
+        dlg._ui.OPT_RETRIGGER.setChecked(self._settings.thru_retrigger)
         dlg._ui.OPT_SEND_BUFFER.setChecked(
             self._settings.auto_send_buffer_on_prog_change
         )
         dlg._ui.OPT_DUMP_SAVE.setChecked(
             self._settings.auto_send_prog_to_device_on_save
         )
+        dlg._ui.OPT_LIVE_SLIDERS.setChecked(self._settings.live_sliders)
         if dlg.exec():
             self._settings.midi_channel = dlg._ui.CHANNEL.value() - 1
             self._settings.auto_send_buffer_on_prog_change = (
@@ -530,12 +717,52 @@ class Device:
             self._settings.auto_send_prog_to_device_on_save = (
                 dlg._ui.OPT_DUMP_SAVE.isChecked()
             )
+            self._settings.live_sliders = dlg._ui.OPT_LIVE_SLIDERS.isChecked()
             if port_in_id != dlg._ui.PORT_IN.currentIndex():
                 self._settings.midi_in_port = dlg._ui.PORT_IN.currentText()
                 self.open_midi_in()
             if port_out_id != dlg._ui.PORT_OUT.currentIndex():
                 self._settings.midi_out_port = dlg._ui.PORT_OUT.currentText()
                 self.open_midi_out()
+            if thru_id != dlg._ui.THRU.currentIndex() or self._settings.thru_rate != dlg._ui.THRU_RATE.value():
+                self._settings.thru_port = dlg._ui.THRU.currentText()
+                self._settings.thru_rate = dlg._ui.THRU_RATE.value()
+                self.open_thru()
+            self._settings.thru_note_priority = priorities[dlg._ui.THRU_MONO.currentIndex()]
+            self._settings.thru_retrigger = dlg._ui.OPT_RETRIGGER.isChecked()
+            self._mono.priority = self._settings.thru_note_priority or self._mono.priority
+            self._mono.retrigger = self._settings.thru_retrigger
+            self.update_thru_mono()
+
+    def open_browser_dlg(self, *_) -> None:
+        """Show the program browser next to the main window.
+
+        Selecting a row doesn't change anything, the program is switched (and sent to the device) only when opened
+        with a double click, Enter or the Open button.
+        """
+        if self._browser is None:
+            dlg = self._browser = _BrowserDlg(self._window)
+            proxy = ProgramFilterModel(dlg)
+            proxy.setSourceModel(self._programs)
+            dlg._ui.PROGRAMS.setModel(proxy)
+            dlg._ui.PROGRAMS.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+            dlg._ui.PROGRAMS.resizeColumnsToContents()
+            dlg._ui.FILTER.textChanged.connect(proxy.setFilterFixedString)
+            dlg._ui.PROGRAMS.activated.connect(self.open_browser_selection)
+            dlg._ui.buttonBox.accepted.connect(self.open_browser_selection)
+            geometry = self._window.frameGeometry()
+            dlg.move(geometry.right() + 1, geometry.top())
+        self._browser.show()
+        self._browser.raise_()
+        self._browser.activateWindow()
+
+    def open_browser_selection(self, *_) -> None:
+        view = self._browser._ui.PROGRAMS  # noqa
+        rows = view.selectionModel().selectedRows()
+        if not rows:
+            return
+        program_id = view.model().mapToSource(rows[0]).row()
+        self._ui.PROGRAM_ID.setValue(program_id + self.PROG_NUM)
 
     def open_about_dlg(self, *_) -> None:
         dlg = _AboutDlg(self._window)
@@ -544,251 +771,315 @@ class Device:
     def open_help(self) -> None:
         QDesktopServices.openUrl(QUrl(self.HELP_URL))
 
-    def on_in_eq_change(self, *_) -> None:
-        value = self._ui.IN_EQ.value()
-        label = EQ[value]
-        self._ui.IN_EQ_L.setText(label)
-        self._bank.edit_buffer.in_eq = value
-        self._queue[0] = value
-
-    def on_out_eq_change(self, *_) -> None:
-        value = self._ui.OUT_EQ.value()
-        label = EQ[value]
-        self._ui.OUT_EQ_L.setText(label)
-        self._bank.edit_buffer.out_eq = value
-        self._queue[1] = value
-
-    def on_chrs_type_change(self, *_) -> None:
-        value = self._ui.CHRS_TYPE.currentIndex()
-        modifier = self._ui.CHRS_STEREO.isChecked()
-        self._ui.CHRS_TYPE.setToolTip(CHORUS_ALGORITHMS[value]['characteristics'])
-        value = value * 2 + modifier
-        self._bank.edit_buffer.chrs_type = value
-        self._queue[2] = value
-
-    def on_chrs_speed_change(self, *_) -> None:
-        value = self._ui.CHRS_SPEED.value()
-        self._ui.CHRS_SPEED_L.setText(str(value))
-        self._bank.edit_buffer.chrs_speed = value
-        self._queue[3] = value
-
-    def on_dly_time_change(self, *_) -> None:
-        value = self._ui.DLY_TIME.value()
-        self._ui.DLY_TIME_L.setText(str(value))
-        self._bank.edit_buffer.dly_time = value
-        self._queue[4] = value
-
-    def on_dly_regen_change(self, *_) -> None:
-        value = self._ui.DLY_REGEN.value()
-        self._ui.DLY_REGEN_L.setText(str(value))
-        self._bank.edit_buffer.dly_regen = value
-        self._queue[5] = value
-
-    def on_rev_type_change(self, *_) -> None:
-        value = self._ui.REVERB_TYPE.currentIndex()
-        self._bank.edit_buffer.rev_type = value
-        self._queue[6] = value
-        self._ui.REVERB_TYPE.setToolTip(REVERB_ALGORITHMS[value]['characteristics'])
-
-    def on_rev_decay_change(self, *_) -> None:
-        value = self._ui.REV_DECAY.value()
-        self._ui.REV_DECAY_L.setText(str(value))
-        self._bank.edit_buffer.rev_decay = value
-        self._queue[7] = value
-
-    def on_rev_mix_change(self, *_) -> None:
-        value = self._ui.REV_MIX.value()
-        self._ui.REV_MIX_L.setText(str(value))
-        self._bank.edit_buffer.rev_mix = value
-        self._queue[8] = value
-
-    def on_dly_mix_change(self, *_) -> None:
-        value = self._ui.DLY_MIX.value()
-        self._ui.DLY_MIX_L.setText(str(value))
-        self._bank.edit_buffer.dly_mix = value
-        self._queue[9] = value
-
-    def on_configuration_change(self, *_) -> None:
-        value = self._ui.CONFIGURATION.currentIndex()
-        if value == 13 or value == 14:
-            self._ui.DLY_TIME.setMaximum(490)
-        else:
-            self._ui.DLY_TIME.setMaximum(100)
-            self._ui.DLY_TIME.setValue(min(self._ui.DLY_TIME.value(), 490))
-        self._bank.edit_buffer.configuration = value
-        self._queue[10] = value
-
-    def on_mod_source_dest_change(self, *_) -> None:
-        value = src = self._ui.MOD_SOURCE.currentIndex()
-        modifier = self._ui.MOD_DEST.currentIndex()
-        if modifier == 0:
-            # OFF switch
-            value = 0
-        else:
-            # for CC7 (source id == 0) every destination starts from 1
-            # because 0 0 is reserved for MOD OFF
-            # for every other source destination starts from 0
-            # since in the menu the first selectable is OFF we must
-            # decrement index by 1 for each source except CC7
-            if value != 0:
-                modifier -= 1
-            value = modifier * 8 + value
-        self._bank.edit_buffer.mod_routing = value
-        self._ui.MOD_SOURCE.setToolTip(MODULATION_SOURCES[src]['description'])
-        self._ui.MOD_DEST.setToolTip(MODULATION_DESTINATIONS[modifier]['description'])
-        self._queue[11] = value
-
-    def on_mod_amount_change(self, *_) -> None:
-        value = self._ui.MOD_AMT.value()
-        self._ui.MOD_AMT_L.setText(str(value - 99))
-        self._bank.edit_buffer.mod_amount = value
-        self._queue[12] = value
+    def on_param_change(self, name: str) -> None:
+        """Store a param edited by the user and send it to the device.
+
+        While dragging a slider values are sent only in the live mode, otherwise on release. The scheduler merges
+        the values per param, so the device gets the latest one at the param message rate.
+        """
+        param = PARAMS_BY_NAME[name]
+        with self._history.step():
+            value = self._view.read(name)
+            self._history.record(param.param_id, getattr(self._bank.edit_buffer, name), value)
+            setattr(self._bank.edit_buffer, name, value)
+        self.update_history_actions()
+        if name == "mod_routing":
+            self.update_thru_mono()
+        if self._view.dragging(name) and not self._settings.live_sliders:
+            return
+        self._queue.put(param.param_id, value)
+
+    def undo_edit(self) -> None:
+        self.apply_edit_changes(self._history.undo())
+
+    def redo_edit(self) -> None:
+        self.apply_edit_changes(self._history.redo())
+
+    def apply_edit_changes(self, changes: Sequence[Tuple[int, int]]) -> None:
+        """Set the edit buffer params and send only them, the device buffer isn't dumped."""
+        for param_id, value in changes:
+            setattr(self._bank.edit_buffer, PARAMS[param_id].name, value)
+            self._queue.put(param_id, value)
+        self.refresh_ui()
+
+    def compare_slot(self, slot: int) -> None:
+        self.apply_compare_changes(self._compare.switch(slot, self._bank.edit_buffer))
+
+    def toggle_compare(self) -> None:
+        self.apply_compare_changes(self._compare.toggle(self._bank.edit_buffer))
+
+    def apply_compare_changes(self, changes: Sequence[Tuple[int, int]]) -> None:
+        """Load a compare slot into the edit buffer sending only the params which differ.
+
+        The edit history is cleared since its steps belong to the previous snapshot.
+        """
+        self._history.clear()
+        self.apply_edit_changes(changes)
+        self._ui.statusbar.showMessage(
+            f"Compare {SLOT_NAMES[self._compare.active]}: {len(changes)} params changed", self.STATUS_TIMEOUT_MS
+        )
+
+    def update_history_actions(self) -> None:
+        self._ui.actionUndo.setEnabled(self._history.can_undo)
+        self._ui.actionRedo.setEnabled(self._history.can_redo)
 
     def on_program_change(self, *_) -> None:
         value = self._ui.PROGRAM_ID.value()
         self._bank.program_id = value - self.PROG_NUM
-        self._bank.edit_buffer = Program(
-            **asdict(self._bank.programs[self._bank.program_id])
-        )
+        self._bank.edit_buffer = self._bank.programs[self._bank.program_id]
+        self._history.clear()
+        self._compare.detach()
         self._queue.clear()
-        self.send_current_program_id_to_device()
-        if self._settings.auto_send_buffer_on_prog_change:
-            self.send_current_program_to_device_buffer()
+        self.switch_device_program(sync_buffer=self._settings.auto_send_buffer_on_prog_change)
         self.refresh_ui()
 
     def refresh_ui(self) -> None:
-        blockers = [
-            QSignalBlocker(widget) for widget in self._window.findChildren(QWidget)
-        ]
-        value = self._bank.edit_buffer.configuration
-        if value == 13 or value == 14:
-            self._ui.DLY_TIME.setMaximum(490)
-        else:
-            self._ui.DLY_TIME.setMaximum(100)
-        self._ui.IN_EQ.setValue(self._bank.edit_buffer.in_eq)
-        self._ui.IN_EQ_L.setText(EQ[self._bank.edit_buffer.in_eq])
-        self._ui.OUT_EQ.setValue(self._bank.edit_buffer.out_eq)
-        self._ui.OUT_EQ_L.setText(EQ[self._bank.edit_buffer.out_eq])
-        self._ui.CHRS_TYPE.setCurrentIndex(self._bank.edit_buffer.chrs_type // 2)
-        self._ui.CHRS_TYPE.setToolTip(CHORUS_ALGORITHMS[self._bank.edit_buffer.chrs_type // 2]['characteristics'])
-        self._ui.CHRS_STEREO.setChecked(self._bank.edit_buffer.chrs_type % 2)
-        self._ui.CHRS_SPEED.setValue(self._bank.edit_buffer.chrs_speed)
-        self._ui.CHRS_SPEED_L.setText(str(self._bank.edit_buffer.chrs_speed))
-        self._ui.DLY_TIME.setValue(self._bank.edit_buffer.dly_time)
-        self._ui.DLY_TIME_L.setText(str(self._bank.edit_buffer.dly_time))
-        self._ui.DLY_REGEN.setValue(self._bank.edit_buffer.dly_regen)
-        self._ui.DLY_REGEN_L.setText(str(self._bank.edit_buffer.dly_regen))
-        self._ui.DLY_MIX.setValue(self._bank.edit_buffer.dly_mix)
-        self._ui.DLY_MIX_L.setText(str(self._bank.edit_buffer.dly_mix))
-        self._ui.REV_DECAY.setValue(self._bank.edit_buffer.rev_decay)
-        self._ui.REV_DECAY_L.setText(str(self._bank.edit_buffer.rev_decay))
-        self._ui.REV_MIX.setValue(self._bank.edit_buffer.rev_mix)
-        self._ui.REV_MIX_L.setText(str(self._bank.edit_buffer.rev_mix))
-        self._ui.REVERB_TYPE.setCurrentIndex(self._bank.edit_buffer.rev_type)
-        self._ui.REVERB_TYPE.setToolTip(REVERB_ALGORITHMS[self._bank.edit_buffer.rev_type]['characteristics'])
-        self._ui.MOD_AMT.setValue(self._bank.edit_buffer.mod_amount)
-        self._ui.MOD_AMT_L.setText(str(self._bank.edit_buffer.mod_amount - 99))
-        if self._bank.edit_buffer.mod_routing == 0:
-            # OFF
-            self._ui.MOD_SOURCE.setCurrentIndex(0)
-            self._ui.MOD_DEST.setCurrentIndex(0)
-        elif self._bank.edit_buffer.mod_routing % 8 == 0:
-            # CC7
-            self._ui.MOD_SOURCE.setCurrentIndex(0)
-            self._ui.MOD_DEST.setCurrentIndex(self._bank.edit_buffer.mod_routing // 8)
-        else:
-            self._ui.MOD_SOURCE.setCurrentIndex(self._bank.edit_buffer.mod_routing % 8)
-            self._ui.MOD_DEST.setCurrentIndex(
-                self._bank.edit_buffer.mod_routing // 8 + 1
-            )
-        self._ui.MOD_SOURCE.setToolTip(MODULATION_SOURCES[self._ui.MOD_SOURCE.currentIndex()]['description'])
-        self._ui.MOD_DEST.setToolTip(MODULATION_DESTINATIONS[self._ui.MOD_DEST.currentIndex()]['description'])
-        self._ui.CONFIGURATION.setCurrentIndex(self._bank.edit_buffer.configuration)
-        self._ui.PROGRAM_ID.setValue(self._bank.program_id + self.PROG_NUM)
-        self._ui.BANK_PATH.setText(self._settings.bank_path)
-        self._ui.PROG_NAME.setText(self._program_names[self._bank.program_id])
-        blockers.clear()
+        """Show the edit buffer, only the changed fields are updated."""
+        self._view.render(self._bank.edit_buffer)
+        program_id = self._bank.program_id + self.PROG_NUM
+        if self._ui.PROGRAM_ID.value() != program_id:
+            blocker = QSignalBlocker(self._ui.PROGRAM_ID)
+            self._ui.PROGRAM_ID.setValue(program_id)
+            blocker.unblock()
+        if self._ui.BANK_PATH.text() != self._settings.bank_path:
+            self._ui.BANK_PATH.setText(self._settings.bank_path)
+        self._programs.set_current(self._bank.program_id)
+        self.update_history_actions()
+        name = self._program_names[self._bank.program_id]
+        if self._ui.PROG_NAME.text() != name:
+            self._ui.PROG_NAME.setText(name)
+        self.update_thru_mono()
+
+    def on_transfer_started(self, name: str) -> None:
+        self._ui.statusbar.showMessage(f"{name}...")
+
+    def on_transfer_progress(self, name: str, value: int, total: int) -> None:
+        self._ui.statusbar.showMessage(f"{name}...")
+        self._progress.setMaximum(total)
+        self._progress.setValue(value)
+        self._progress.show()
+
+    def on_transfer_finished(self, name: str) -> None:
+        self._progress.hide()
+        self._ui.statusbar.showMessage(f"{name}: done", self.STATUS_TIMEOUT_MS)
+
+    def on_transfer_cancelled(self, name: str) -> None:
+        self._progress.hide()
+        self._device.invalidate()
+        self._ui.statusbar.showMessage(f"{name}: cancelled", self.STATUS_TIMEOUT_MS)
+
+    def on_transfer_failed(self, name: str, error: str) -> None:
+        self._progress.hide()
+        self._device.invalidate()
+        self._ui.statusbar.showMessage(f"{name}: failed", self.STATUS_TIMEOUT_MS)
+        box = QMessageBox()
+        box.setText(f'{name} failed')
+        box.setInformativeText(error)
+        box.exec_()
 
     def send_current_program_id_to_device(self) -> None:
-        with self._midi_lock:
-            self._send_message(
-                (0xC0 + self._settings.midi_channel, self._bank.program_id)
-            )
-            sleep(0.05)
+        self.switch_device_program(sync_buffer=False)
+
+    def switch_device_program(self, sync_buffer: bool) -> None:
+        """Select the current program on the device and optionally sync the device buffer with the edit buffer.
+
+        On program change the device loads the stored program into its buffer. If its content is known, only the
+        params which differ from the edit buffer are sent instead of the whole program dump.
+        """
+        program_id = self._bank.program_id
+        message = (0xC0 + self._settings.midi_channel, program_id)
+        delay = self._pacing.program_change_delay
+        target = self._bank.edit_buffer.copy() if sync_buffer else None
+        dump = self.dump_program_to_syx(self.PROG_NUM) if sync_buffer else None
+
+        def _switch(transfer: Transfer) -> None:
+            transfer.send(message, delay)
+            self._device.load_slot(program_id)
+            if target is not None:
+                self._sync_device_buffer(transfer, target, dump)
+
+        self._transport.submit("Program change", _switch, replace=True)
 
     def send_current_program_to_device_buffer(self) -> None:
-        with self._midi_lock:
-            self._send_message(self.dump_program_to_syx(self.PROG_NUM))
-            sleep(0.33)  # service guide recommended timeout
+        message = self.dump_program_to_syx(self.PROG_NUM)
+        target = self._bank.edit_buffer.copy()
+        delay = self._pacing.buffer_dump_delay
+
+        def _send(transfer: Transfer) -> None:
+            transfer.send(message, delay)
+            self._device.buffer = target
+
+        self._transport.submit("Send buffer", _send, replace=True)
+
+    def _sync_device_buffer(self, transfer: Transfer, target: Program, dump: Sequence[int]) -> None:
+        param_interval = self._pacing.param_interval
+        buffer_delay = self._pacing.buffer_dump_delay
+        params = plan_program_update(self._device.buffer, target, param_interval, buffer_delay)
+        if params is None:
+            transfer.send(dump, buffer_delay)
+        else:
+            for param_id, value in params:
+                transfer.send(self._param_message(param_id, value), param_interval)
+        self._device.buffer = target
 
     def save_buffer_to_device_program_slot(self) -> None:
-        with self._midi_lock:
-            self._send_message(self.dump_program_to_syx(self._bank.program_id))
+        program_id = self._bank.program_id
+        message = self.dump_program_to_syx(program_id)
+        program = self._bank.edit_buffer.copy()
+
+        delay = self._pacing.program_store_delay
+
+        def _store(transfer: Transfer) -> None:
+            transfer.send(message, delay)
+            self._device.slots[program_id] = program
+
+        self._transport.submit("Store program", _store)
+
+    def save_changed_programs_to_device(self) -> None:
+        """Store only the programs which differ from the ones last confirmed on the device.
+
+        Falls back to the whole bank dump if it's faster, i.e. when the device content is unknown.
+        """
+        changed = self._device.changed_slots(self._bank.programs)
+        if not changed:
+            self._ui.statusbar.showMessage("Device bank is up to date", self.STATUS_TIMEOUT_MS)
+            return
+        delay = self._pacing.program_store_delay
+        if len(changed) * delay >= self._pacing.bank_dump_delay:
+            self.save_current_bank_to_device()
+            return
+        programs = [self._bank.programs[n].copy() for n in changed]
+        messages = [self.dump_program_to_syx(n, prog) for n, prog in zip(changed, programs)]
+
+        def _store(transfer: Transfer) -> None:
+            total = len(changed)
+            for n, (program_id, message, program) in enumerate(zip(changed, messages, programs)):
+                transfer.progress(n, total)
+                transfer.send(message, delay)
+                self._device.slots[program_id] = program
+            transfer.progress(total, total)
+
+        self._transport.submit("Store changes", _store)
 
     def save_current_bank_to_device(self) -> None:
-        with self._midi_lock:
-            self._send_message(
-                (
-                    0xF0,
-                    *self.MANUFACTURER_ID,
-                    self.DEVICE_ID,
-                    0x00,
-                    *self.dump_bank_to_bin(self._bank),
-                    0xF7,
-                )
-            )
-            sleep(10)  # service guide recommended timeout
+        message = self.dump_current_bank_to_syx()
+        delay = self._pacing.bank_dump_delay
+        programs = [prog.copy() for prog in self._bank.programs]
+
+        def _store(transfer: Transfer) -> None:
+            transfer.send(message, delay, report=True)
+            self._device.slots = programs
+            self._device.invalidate()
+
+        self._transport.submit("Store bank", _store)
 
     def request_bank_dump(self) -> None:
-        self._midi_in.ignore_types(sysex=False)
-        with self._midi_lock:
-            self._send_message(
-                (
-                    0xF0,
-                    *self.MANUFACTURER_ID,
-                    self.DEVICE_ID,
-                    0x02,
-                    0xF7,
-                )
-            )
-        timeout, data = 0, None
-        while timeout < 10:
-            data = self._midi_in.get_message()
-            if data and len(data[0]) > 500:  # hack to ignore possible short 'midi echo' messages
-                self.load_current_bank_from_syx(data[0])
-                self.save_current_bank_to_device()
-                break
-            timeout += 1
-            sleep(1)
-        else:
-            box = QMessageBox()
-            box.setText('Bank receive timeout')
-            box.setInformativeText(
-                'The bank has not been received.'
+        message = (0xF0, *self.MANUFACTURER_ID, self.DEVICE_ID, 0x02, 0xF7)
+        header = (0xF0, *self.MANUFACTURER_ID, self.DEVICE_ID, 0x00)
+        timeout = self.BANK_REQUEST_TIMEOUT_MS / 1000
+
+        def _request(transfer: Transfer) -> bytes:
+            waiter = self._receiver.expect(header, len(BANK), transfer.wake)
+            try:
+                transfer.send(message)
+                if transfer.wait_for(lambda: waiter.done, timeout):
+                    return waiter.message
+            finally:
+                self._receiver.discard(waiter)
+            if waiter.rejected:
+                raise TransferError(
+                    'The bank has been received but its length is invalid. '
+                    'Check the MIDI interface and try again.')
+            raise TransferError(
+                'The bank has not been received. '
                 'Check that both your MidiVerb III unit MIDI In and Out are connected to the MIDI interface, '
                 'and that the proper MIDI ports and the channel are provided in the application settings.')
-            box.exec_()
 
-    def _process_message_queue(self) -> None:
-        """Send data to the device.
+        self._transport.submit("Request bank", _request, on_done=self.on_bank_received)
 
-        Send interval `midi_refresh_rate_ms` is set in app settings. Messages are deduplicated — only the last
-        message for each param is sent.
+    def tune_device_timing(self) -> None:
+        """Measure how fast the device accepts params, program changes and buffer dumps and store the profile.
+
+        Each probe is followed by a bank request, so the device MIDI out must be connected. The edit buffer is sent
+        to the device at the end, since the program change probe reloads the stored program.
         """
-        header = (0xF0, *self.MANUFACTURER_ID, self.DEVICE_ID, 0x03)
-        while True:
-            _queue = {}
-            while self._queue:
-                param_id, value = self._queue.popitem()
-                _queue[param_id] = value
-            with self._midi_lock:
-                for param_id, value in _queue.items():
-                    self._send_message([*header, param_id, *_dump_value(value), 0xF7])
-                    sleep(0.025)
-            sleep(self.REFRESH_RATE_MS / 1000)
+        request = (0xF0, *self.MANUFACTURER_ID, self.DEVICE_ID, 0x02, 0xF7)
+        header = (0xF0, *self.MANUFACTURER_ID, self.DEVICE_ID, 0x00)
+        timeout = self.BANK_REQUEST_TIMEOUT_MS / 1000
+        program_id = self._bank.program_id
+        target = self._bank.edit_buffer.copy()
+        dump = self.dump_program_to_syx(self.PROG_NUM)
+        probes = [
+            Probe("param_interval", self._param_message(0, target.in_eq), 10),
+            Probe("program_change_delay", (0xC0 + self._settings.midi_channel, program_id)),
+            Probe("buffer_dump_delay", dump),
+        ]
+        default = self.default_pacing()
+
+        def _tune(transfer: Transfer) -> PacingProfile:
+
+            def _exchange(messages: List[Sequence[int]]) -> Optional[float]:
+                waiter = self._receiver.expect(header, len(BANK), transfer.wake)
+                try:
+                    started_at = monotonic()
+                    for message in messages:
+                        transfer.send(message)
+                    transfer.send(request)
+                    if transfer.wait_for(lambda: waiter.done, timeout):
+                        return monotonic() - started_at
+                    return None
+                finally:
+                    self._receiver.discard(waiter)
+
+            try:
+                profile = tune(_exchange, probes, default, progress=transfer.progress)
+            except TimeoutError:
+                raise TransferError(
+                    'The device does not answer bank requests. '
+                    'Check that both your MidiVerb III unit MIDI In and Out are connected to the MIDI interface.')
+            finally:
+                self._device.load_slot(program_id)
+            transfer.send(dump, default.buffer_dump_delay)
+            self._device.buffer = target
+            return profile
+
+        self._transport.submit("Tune timing", _tune, on_done=self.on_timing_tuned)
+
+    def on_timing_tuned(self, profile: PacingProfile) -> None:
+        self._settings.pacing[self._settings.midi_out_port] = profile.asdict()
+        self.load_pacing()
+        self._ui.statusbar.showMessage(
+            f"Param {profile.param_interval * 1000:.0f} ms, "
+            f"program change {profile.program_change_delay * 1000:.0f} ms, "
+            f"buffer {profile.buffer_dump_delay * 1000:.0f} ms",
+            self.STATUS_TIMEOUT_MS,
+        )
+
+    def reset_device_timing(self) -> None:
+        self._settings.pacing.pop(self._settings.midi_out_port, None)
+        self.load_pacing()
+        self._ui.statusbar.showMessage("Default device timing restored", self.STATUS_TIMEOUT_MS)
+
+    def on_bank_received(self, data: Sequence[int]) -> None:
+        self.load_current_bank_from_syx(data)
+        self.save_current_bank_to_device()
+
+    def _param_message(self, param_id: int, value: int) -> Tuple[int, ...]:
+        return 0xF0, *self.MANUFACTURER_ID, self.DEVICE_ID, 0x03, param_id, *codec.dump_value(value), 0xF7
+
+    def _send_param(self, param_id: int, value: int) -> None:
+        """Send a single parameter value to the device buffer. Called by the message scheduler thread."""
+        with self._midi_lock:
+            self._send_message(self._param_message(param_id, value))
+            self._device.set_param(param_id, value)
+
+    def _send_thru(self, message: bytes) -> None:
+        """Send a message forwarded by the thru proxy. Called by the proxy thread."""
+        with self._midi_lock:
+            self._send_message(message)
 
     def _send_message(self, message: Sequence[Union[bytes, int]]) -> None:
         if not self._midi_out:
             return None
-        print(message)
+        self._metrics.sent(len(message))
         return self._midi_out.send_message(message)
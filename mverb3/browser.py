@@ -0,0 +1,146 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, QSortFilterProxyModel, Qt
+from PySide6.QtGui import QFont
+
+from mverb3.core.data import CHORUS_ALGORITHMS, REVERB_ALGORITHMS, MODULATION_SOURCES, MODULATION_DESTINATIONS
+from mverb3.core.model import PROG_NUM, Bank, Program
+from mverb3.core.schema import decode_chrs_type, decode_mod_routing
+
+__all__ = ["ProgramTableModel", "ProgramFilterModel"]
+
+SORT_ROLE = Qt.ItemDataRole.UserRole
+
+# (title, tooltip)
+COLUMNS = (
+    ("#", "Program number"),
+    ("Name", "Program name"),
+    ("Rev", "Reverb algorithm"),
+    ("Decay", "Reverb decay"),
+    ("Mix", "Reverb mix"),
+    ("Chorus", "Chorus / flanger algorithm"),
+    ("Delay", "Delay time"),
+    ("Regen", "Delay regeneration"),
+    ("D.Mix", "Delay mix"),
+    ("Mod", "Modulation source > destination"),
+    ("Config", "Routing configuration"),
+)
+
+_Row = Tuple[Tuple[str, ...], Tuple[object, ...], str]  # display values, sort keys, tooltip
+
+
+class ProgramTableModel(QAbstractTableModel):
+    """Summaries of the bank programs for the program browser.
+
+    The model reads the bank slots directly and formats a row only when the view asks for it, formatted rows are
+    cached until `program_changed` is called for the slot. Program names are shared with the editor list, call
+    `program_changed` after renaming. The current program row is shown in bold.
+    """
+
+    def __init__(self, configurations: Sequence[str], parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._configurations = list(configurations)
+        self._bank: Optional[Bank] = None
+        self._names: List[str] = []
+        self._rows: Dict[int, _Row] = {}
+        self._current = 0
+        self._bold = QFont()
+        self._bold.setBold(True)
+
+    def set_bank(self, bank: Bank, names: List[str]) -> None:
+        self.beginResetModel()
+        self._bank, self._names, self._current = bank, names, bank.program_id
+        self._rows.clear()
+        self.endResetModel()
+
+    def program_changed(self, program_id: int) -> None:
+        self._rows.pop(program_id, None)
+        self.dataChanged.emit(self.index(program_id, 0), self.index(program_id, len(COLUMNS) - 1))
+
+    def set_current(self, program_id: int) -> None:
+        if program_id == self._current:
+            return
+        previous, self._current = self._current, program_id
+        for row in {previous, program_id}:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1), [Qt.ItemDataRole.FontRole])
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() or self._bank is None else PROG_NUM
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if orientation != Qt.Orientation.Horizontal:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[section][0]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return COLUMNS[section][1]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or self._bank is None:
+            return None
+        if role == Qt.ItemDataRole.FontRole:
+            return self._bold if index.row() == self._current else None
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole, SORT_ROLE):
+            return None
+        row = self._rows.get(index.row())
+        if row is None:
+            row = self._rows[index.row()] = self._format(index.row())
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row[0][index.column()]
+        if role == SORT_ROLE:
+            return row[1][index.column()]
+        return row[2]
+
+    def _format(self, program_id: int) -> _Row:
+        program: Program = self._bank.programs[program_id]
+        algorithm, stereo = decode_chrs_type(program.chrs_type)
+        chorus = CHORUS_ALGORITHMS[algorithm]
+        reverb = REVERB_ALGORITHMS[program.rev_type]
+        source, destination = decode_mod_routing(program.mod_routing)
+        if destination:
+            mod = f"{MODULATION_SOURCES[source]['display']}>{MODULATION_DESTINATIONS[destination]['display']}"
+        else:
+            mod = MODULATION_DESTINATIONS[0]['display']
+        number = program_id + PROG_NUM
+        display = (
+            str(number),
+            self._names[program_id] if program_id < len(self._names) else "",
+            reverb['display'],
+            str(program.rev_decay),
+            str(program.rev_mix),
+            chorus['display_stereo' if stereo else 'display'],
+            str(program.dly_time),
+            str(program.dly_regen),
+            str(program.dly_mix),
+            mod,
+            self._configurations[program.configuration],
+        )
+        keys = (
+            number,
+            display[1].lower(),
+            program.rev_type,
+            program.rev_decay,
+            program.rev_mix,
+            program.chrs_type,
+            program.dly_time,
+            program.dly_regen,
+            program.dly_mix,
+            program.mod_routing,
+            program.configuration,
+        )
+        tooltip = f"{reverb['algorithm']} - {reverb['label']}, {chorus['type']} {chorus['characteristics'].lower()}"
+        return display, keys, tooltip
+
+
+class ProgramFilterModel(QSortFilterProxyModel):
+    """Sorts by the raw values and filters the rows by any of the displayed texts."""
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+        self.setFilterKeyColumn(-1)
+        self.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
@@ -0,0 +1,442 @@
+"""Batch processing of MidiVerb III sysex libraries.
+
+Walks files and directories and processes every dump in a pool of worker processes, printing a line per file as soon
+as it's done. Run `midiverb3-cli --help` (or `python -m mverb3.cli --help`) for the list of commands.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from mverb3.core import codec, smf, sysex
+from mverb3.core.data import REVERB_ALGORITHMS
+from mverb3.core.model import PROG_NUM, PROGRAM_FIELDS, Bank, Program
+from mverb3.core.schema import PARAMS_BY_NAME
+from mverb3.library import Condition, Library
+from mverb3.store import ProgramStore
+
+__all__ = ["bank_to_json", "bank_from_json", "program_to_json", "program_from_json", "main"]
+
+BANK_FORMAT = "midiverb3.bank"
+PROGRAM_FORMAT = "midiverb3.program"
+SYX_SUFFIXES = (".syx",)
+JSON_SUFFIXES = (".json",)
+MID_SUFFIXES = (".mid", ".midi")
+BANK_DELAY = 10.0  # the device timing, same as in `Device`
+PROGRAM_DELAY = 0.33
+CHUNK_SIZE = 16
+ROM_PROGRAM_NUM = 128 - PROG_NUM  # MIDI programs 100-127 select ROM presets
+
+
+class Options(NamedTuple):
+    output: Optional[str]
+    midi_channel: Optional[int]
+    rom_programs: Tuple[int, ...]
+    bank_delay: float = BANK_DELAY
+    program_delay: float = PROGRAM_DELAY
+
+
+class Task(NamedTuple):
+    command: str
+    path: str
+    target: Optional[str]
+    options: Options
+
+
+class Result(NamedTuple):
+    path: str
+    error: Optional[str]
+    info: str
+
+
+def bank_to_json(data: codec.Buffer, names: Optional[Sequence[str]] = None) -> dict:
+    """Convert a bank dump message to a JSON-serializable dict."""
+    body = memoryview(bytes(data))[len(codec.HEADER) + 1 : -1]
+    bank = codec.decode_bank(body)
+    obj = {
+        "format": BANK_FORMAT,
+        "program_id": bank.program_id,
+        "midi_channel": codec.decode_midi_channel(body),
+        "prog_map": codec.decode_prog_map(body),
+        "programs": [program.asdict() for program in bank.programs],
+        "edit_buffer": bank.edit_buffer.asdict(),
+    }
+    if names is not None:
+        obj["names"] = list(names)
+    return obj
+
+
+def _program_from_dict(values: dict) -> Program:
+    """Create a program checking the values against the parameter ranges."""
+    for name, value in values.items():
+        param = PARAMS_BY_NAME.get(name)
+        if param is None:
+            raise ValueError(f"unknown program field {name!r}")
+        if not isinstance(value, int) or not param.minimum <= value <= param.maximum:
+            raise ValueError(f"{name} must be within {param.minimum}...{param.maximum}, got {value!r}")
+    return Program(**values)
+
+
+def bank_from_json(obj: dict) -> bytearray:
+    """Convert a dict created by `bank_to_json` back to a bank dump message."""
+    if obj.get("format") != BANK_FORMAT:
+        raise ValueError("not a MidiVerb III bank")
+    if len(obj["programs"]) != PROG_NUM:
+        raise ValueError(f"expected {PROG_NUM} programs, got {len(obj['programs'])}")
+    bank = Bank(
+        programs=[_program_from_dict(program) for program in obj["programs"]],
+        edit_buffer=_program_from_dict(obj["edit_buffer"]),
+        program_id=obj["program_id"],
+    )
+    return codec.encode_bank_message(bank, obj["midi_channel"], codec.encode_prog_map(obj["prog_map"]))
+
+
+def program_to_json(data: codec.Buffer) -> dict:
+    """Convert a program dump message to a JSON-serializable dict."""
+    program = codec.decode_program(memoryview(bytes(data)), len(codec.HEADER) + 2)
+    return {"format": PROGRAM_FORMAT, "program_id": data[len(codec.HEADER) + 1], "program": program.asdict()}
+
+
+def program_from_json(obj: dict) -> bytearray:
+    """Convert a dict created by `program_to_json` back to a program dump message."""
+    if obj.get("format") != PROGRAM_FORMAT:
+        raise ValueError("not a MidiVerb III program")
+    return codec.encode_program_message(_program_from_dict(obj["program"]), obj["program_id"])
+
+
+def _names_path(fp: Path) -> Path:
+    return fp.parent / f"{fp.stem}.txt"
+
+
+def _read_names(fp: Path) -> Optional[List[str]]:
+    names_fp = _names_path(fp)
+    if not names_fp.exists():
+        return None
+    names = ["---" for _ in range(PROG_NUM)]
+    with open(names_fp, "r") as f:
+        for n, s in enumerate(f.readlines()[:PROG_NUM]):
+            s = s.strip()
+            if s:
+                names[n] = s
+    return names
+
+
+def _write_names(fp: Path, names: Sequence[str]) -> None:
+    with open(_names_path(fp), "w") as f:
+        for name in names:
+            f.write(name.strip() + "\n")
+
+
+def _read_syx(path: str) -> Tuple[bytes, int]:
+    with open(path, "rb") as f:
+        data = f.read()
+    return data, codec.check_message(data)
+
+
+def _target(target: str) -> str:
+    Path(target).parent.mkdir(parents=True, exist_ok=True)
+    return target
+
+
+def _write(target: str, data: bytes) -> None:
+    with open(_target(target), "wb") as f:
+        f.write(data)
+
+
+def _validate(task: Task) -> str:
+    _, command = _read_syx(task.path)
+    return "bank" if command == 0x00 else "program"
+
+
+def _normalize(task: Task) -> str:
+    """Re-encode a dump the same way the editor saves it."""
+    data, command = _read_syx(task.path)
+    if command == 0x01:
+        program_id = data[len(codec.HEADER) + 1]
+        program = codec.decode_program(data, len(codec.HEADER) + 2)
+        _write(task.target, codec.encode_program_message(program, program_id))
+        return "program"
+    body = memoryview(data)[len(codec.HEADER) + 1 : -1]
+    midi_channel = task.options.midi_channel
+    if midi_channel is None:
+        midi_channel = codec.decode_midi_channel(body)
+    prog_map = codec.encode_prog_map(codec.prog_map_ids(task.options.rom_programs))
+    normalized = codec.encode_bank_message(codec.decode_bank(body), midi_channel, prog_map)
+    _write(task.target, normalized)
+    return "bank" if normalized == data else "bank (changed)"
+
+
+def _to_json(task: Task) -> str:
+    data, command = _read_syx(task.path)
+    if command == 0x00:
+        obj = bank_to_json(data, _read_names(Path(task.path)))
+    else:
+        obj = program_to_json(data)
+    _write(task.target, json.dumps(obj, indent=2).encode())
+    return "bank" if command == 0x00 else "program"
+
+
+def _from_json(task: Task) -> str:
+    with open(task.path, "r") as f:
+        obj = json.load(f)
+    if obj.get("format") == BANK_FORMAT:
+        _write(task.target, bank_from_json(obj))
+        if "names" in obj:
+            _write_names(Path(task.target), obj["names"])
+        return "bank"
+    _write(task.target, program_from_json(obj))
+    return "program"
+
+
+def _to_mid(task: Task) -> str:
+    """Convert all dumps of a sysex file to a MIDI file paced by the device timing."""
+    delays = {sysex.BANK_DUMP: task.options.bank_delay, sysex.PROGRAM_DUMP: task.options.program_delay}
+    messages = [(frame.message, delays[frame.command]) for frame in sysex.read_frames(task.path)]
+    if not messages:
+        raise ValueError("no MidiVerb III dumps found")
+    smf.write_smf(_target(task.target), messages)
+    return f"dumps: {len(messages)}"
+
+
+def _from_mid(task: Task) -> str:
+    """Extract the dumps from a MIDI file into a sysex file."""
+    count = 0
+    with open(_target(task.target), "wb") as f:
+        for frame in smf.read_frames(task.path):
+            f.write(frame.message)
+            count += 1
+    if not count:
+        os.remove(task.target)
+        raise ValueError("no MidiVerb III dumps found")
+    return f"dumps: {count}"
+
+
+_COMMANDS = {
+    "validate": (_validate, SYX_SUFFIXES, None),
+    "normalize": (_normalize, SYX_SUFFIXES, ".syx"),
+    "to-json": (_to_json, SYX_SUFFIXES, ".json"),
+    "from-json": (_from_json, JSON_SUFFIXES, ".syx"),
+    "to-mid": (_to_mid, SYX_SUFFIXES, ".mid"),
+    "from-mid": (_from_mid, MID_SUFFIXES, ".syx"),
+}
+
+
+def _process(task: Task) -> Result:
+    func = _COMMANDS[task.command][0]
+    try:
+        return Result(task.path, None, func(task))
+    except (OSError, ValueError, LookupError, ArithmeticError, TypeError) as exc:
+        # a bad file is reported and the batch goes on
+        return Result(task.path, f"{type(exc).__name__}: {exc}", "")
+
+
+def iter_files(paths: Sequence[str], suffixes: Sequence[str]) -> Iterator[Tuple[str, str]]:
+    """Walk the paths and yield (file path, path relative to the given root) pairs of the matching files."""
+    for root in paths:
+        if os.path.isfile(root):
+            yield root, os.path.basename(root)
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.lower().endswith(suffixes):
+                    path = os.path.join(dirpath, name)
+                    yield path, os.path.relpath(path, root)
+
+
+def iter_tasks(command: str, paths: Sequence[str], options: Options) -> Iterator[Task]:
+    _, suffixes, target_suffix = _COMMANDS[command]
+    for path, relpath in iter_files(paths, suffixes):
+        target = None
+        if target_suffix:
+            target = str(Path(options.output, relpath).with_suffix(target_suffix))
+        yield Task(command, path, target, options)
+
+
+def run(command: str, paths: Sequence[str], options: Options, jobs: Optional[int] = None) -> Dict[str, int]:
+    """Process the files in a pool of `jobs` processes and print the results as they come."""
+    stats = {"ok": 0, "failed": 0}
+    tasks = iter_tasks(command, paths, options)
+    with Pool(jobs) as pool:
+        for result in pool.imap_unordered(_process, tasks, chunksize=CHUNK_SIZE):
+            if result.error:
+                stats["failed"] += 1
+                print(f"FAIL {result.path}: {result.error}")
+            else:
+                stats["ok"] += 1
+                print(f"OK   {result.path}: {result.info}")
+    return stats
+
+
+def _rom_programs(value: str) -> Tuple[int, ...]:
+    """Parse ROM program ids, the missing ones are padded with the defaults as the editor settings do."""
+    program_ids = [int(n) for n in value.split(",") if n.strip()]
+    if len(program_ids) > ROM_PROGRAM_NUM or any(not 0 <= n < PROG_NUM for n in program_ids):
+        raise argparse.ArgumentTypeError(f"expected up to {ROM_PROGRAM_NUM} ROM program ids in 0...{PROG_NUM - 1}")
+    return (*program_ids, *range(len(program_ids), ROM_PROGRAM_NUM))
+
+
+# parameter values which may be given by name in queries
+_NAMED_VALUES = {"rev_type": [algorithm["algorithm"].lower() for algorithm in REVERB_ALGORITHMS]}
+
+
+def _query_value(field: str, value: str) -> int:
+    value = value.strip()
+    names = _NAMED_VALUES.get(field, [])
+    if value.lower() in names:
+        return names.index(value.lower())
+    return int(value)
+
+
+def _condition(value: str) -> Tuple[str, Condition]:
+    """Parse `field=value`, `field=min:max` (either end may be omitted) or `field=a,b,c`."""
+    field, sep, value = value.partition("=")
+    field = field.strip()
+    if not sep or field not in PROGRAM_FIELDS:
+        raise argparse.ArgumentTypeError(f"expected FIELD=VALUE, where FIELD is one of: {', '.join(PROGRAM_FIELDS)}")
+    try:
+        if ":" in value:
+            low, high = value.split(":", 1)
+            return field, (_query_value(field, low) if low else None, _query_value(field, high) if high else None)
+        if "," in value:
+            return field, [_query_value(field, n) for n in value.split(",")]
+        return field, _query_value(field, value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid value for {field}: {value}") from None
+
+
+def index(database: str, paths: Sequence[str]) -> None:
+    with Library(database) as library:
+        stats = library.ingest(paths)
+        files, programs = library.count()
+    print(", ".join(f"{value} {name}" for name, value in stats._asdict().items()))
+    print(f"Index: {files} files, {programs} programs")
+
+
+def query(database: str, conditions: Sequence[Tuple[str, Condition]], name: Optional[str], limit: Optional[int]) -> None:
+    with Library(database) as library:
+        matches = library.query(name=name, limit=limit, **dict(conditions))
+    for match in matches:
+        print(f"{match.path} [{match.slot}] {match.name or '---'}: {match.program}")
+    print(f"Found: {len(matches)}")
+
+
+def snapshot(database: str, paths: Sequence[str]) -> None:
+    """Store bank dumps as snapshots named by their absolute paths."""
+    with ProgramStore(database) as store:
+        for path, _ in iter_files(paths, SYX_SUFFIXES):
+            name = os.path.abspath(path)
+            try:
+                with open(path, "rb") as f:
+                    print(f"OK   {path}: snapshot {store.commit(name, f.read())}")
+            except (OSError, ValueError) as exc:
+                print(f"FAIL {path}: {type(exc).__name__}: {exc}")
+
+
+def history(database: str, name: Optional[str]) -> None:
+    with ProgramStore(database) as store:
+        previous = {}
+        for item in store.history(os.path.abspath(name) if name else None):
+            changed = ""
+            if item.name in previous:
+                slots = store.diff(previous[item.name], item.id)
+                changed = f", changed slots: {', '.join(map(str, slots)) or 'settings'}"
+            previous[item.name] = item.id
+            print(f"{item.id:6} {datetime.fromtimestamp(item.created):%Y-%m-%d %H:%M:%S} {item.name}{changed}")
+
+
+def restore(database: str, snapshot_id: int, output: str) -> None:
+    with ProgramStore(database) as store:
+        _write(output, store.load(snapshot_id))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="midiverb3-cli", description="MidiVerb III sysex library tool")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes (all CPUs)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("validate", help="check the headers and lengths of .syx dumps").add_argument(
+        "paths", nargs="+", help="files or directories"
+    )
+    normalize = commands.add_parser("normalize", help="re-encode dumps the same way the editor saves them")
+    normalize.add_argument("paths", nargs="+", help="files or directories")
+    normalize.add_argument("-o", "--output", required=True, help="output directory")
+    normalize.add_argument("--midi-channel", type=int, default=None, help="device MIDI channel (keep by default)")
+    normalize.add_argument(
+        "--rom-programs",
+        type=_rom_programs,
+        default=tuple(range(ROM_PROGRAM_NUM)),
+        help="comma separated ROM program ids for MIDI programs 100-127 (the missing ones keep the defaults)",
+    )
+    for name, text in (("to-json", "convert .syx dumps to JSON"), ("from-json", "convert JSON back to .syx dumps")):
+        convert = commands.add_parser(name, help=text)
+        convert.add_argument("paths", nargs="+", help="files or directories")
+        convert.add_argument("-o", "--output", required=True, help="output directory")
+    to_mid = commands.add_parser("to-mid", help="convert .syx dumps to MIDI files paced by the device timing")
+    to_mid.add_argument("paths", nargs="+", help="files or directories")
+    to_mid.add_argument("-o", "--output", required=True, help="output directory")
+    to_mid.add_argument("--bank-delay", type=float, default=BANK_DELAY, help="seconds after a bank dump")
+    to_mid.add_argument("--program-delay", type=float, default=PROGRAM_DELAY, help="seconds after a program dump")
+    from_mid = commands.add_parser("from-mid", help="extract MidiVerb III dumps from MIDI files")
+    from_mid.add_argument("paths", nargs="+", help="files or directories")
+    from_mid.add_argument("-o", "--output", required=True, help="output directory")
+    index_cmd = commands.add_parser("index", help="add .syx dumps to a program library index")
+    index_cmd.add_argument("database", help="SQLite database file")
+    index_cmd.add_argument("paths", nargs="+", help="files or directories")
+    query_cmd = commands.add_parser("query", help="search the program library index")
+    query_cmd.add_argument("database", help="SQLite database file")
+    query_cmd.add_argument(
+        "-w",
+        "--where",
+        type=_condition,
+        action="append",
+        default=[],
+        help="FIELD=VALUE, FIELD=MIN:MAX or FIELD=A,B; i.e. -w 'rev_type=Plate 4' -w dly_time=300: -w configuration=13,14",
+    )
+    query_cmd.add_argument("--name", default=None, help="program name pattern, i.e. '%%hall%%'")
+    query_cmd.add_argument("--limit", type=int, default=None)
+    snapshot_cmd = commands.add_parser("snapshot", help="store bank dumps in a deduplicated snapshot store")
+    snapshot_cmd.add_argument("database", help="SQLite database file, the editor uses ~/.mverb3/store.db")
+    snapshot_cmd.add_argument("paths", nargs="+", help="files or directories")
+    history_cmd = commands.add_parser("history", help="list the bank snapshots and changed slots")
+    history_cmd.add_argument("database", help="SQLite database file")
+    history_cmd.add_argument("--bank", default=None, help="bank file path")
+    restore_cmd = commands.add_parser("restore", help="write a bank snapshot to a .syx file")
+    restore_cmd.add_argument("database", help="SQLite database file")
+    restore_cmd.add_argument("snapshot", type=int, help="snapshot id")
+    restore_cmd.add_argument("-o", "--output", required=True, help="output file")
+    args = parser.parse_args(argv)
+    if args.command == "snapshot":
+        snapshot(args.database, args.paths)
+        return
+    if args.command == "history":
+        history(args.database, args.bank)
+        return
+    if args.command == "restore":
+        restore(args.database, args.snapshot, args.output)
+        return
+    if args.command == "index":
+        index(args.database, args.paths)
+        return
+    if args.command == "query":
+        query(args.database, args.where, args.name, args.limit)
+        return
+    options = Options(
+        output=getattr(args, "output", None),
+        midi_channel=getattr(args, "midi_channel", None),
+        rom_programs=getattr(args, "rom_programs", ()),
+        bank_delay=getattr(args, "bank_delay", BANK_DELAY),
+        program_delay=getattr(args, "program_delay", PROGRAM_DELAY),
+    )
+    stats = run(args.command, args.paths, options, args.jobs)
+    print(f"Done: {stats['ok']} ok, {stats['failed']} failed")
+    if stats["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
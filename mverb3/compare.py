@@ -0,0 +1,48 @@
+from typing import List, Optional, Tuple
+
+from mverb3.core.model import Program
+from mverb3.sync import diff_programs
+
+__all__ = ["SLOT_NAMES", "CompareSlots"]
+
+SLOT_NAMES = "ABCD"
+
+
+class CompareSlots:
+    """Edit buffer snapshots for A/B comparison.
+
+    The edit buffer belongs to the `active` slot: switching stores it there and loads the other slot. An empty slot
+    gets a copy of the current edit buffer. Switching returns the (param id, value) pairs which differ in the send
+    order of `diff_programs` (the configuration first), so only these params are sent to the device. Call `detach`
+    when the edit buffer is replaced by another program, so it doesn't overwrite the active snapshot on the next
+    switch.
+    """
+
+    def __init__(self, size: int = len(SLOT_NAMES)):
+        self.slots: List[Optional[Program]] = [None] * size
+        self.active: Optional[int] = None
+        self.previous: Optional[int] = None
+
+    def switch(self, slot: int, current: Program) -> List[Tuple[int, int]]:
+        if slot == self.active:
+            return []
+        if self.active is not None:
+            self.slots[self.active] = current.copy()
+            self.previous = self.active
+        self.active = slot
+        target = self.slots[slot]
+        if target is None:
+            self.slots[slot] = current.copy()
+            return []
+        return diff_programs(current, target)
+
+    def toggle(self, current: Program) -> List[Tuple[int, int]]:
+        """Switch to the previously active slot (or the next one)."""
+        if self.previous is not None and self.previous != self.active:
+            slot = self.previous
+        else:
+            slot = 0 if self.active is None else (self.active + 1) % len(self.slots)
+        return self.switch(slot, current)
+
+    def detach(self) -> None:
+        self.active = None
@@ -0,0 +1,8 @@
+"""MidiVerb III program / bank model, sysex codec and device tables.
+
+The package doesn't depend on Qt or rtmidi, so it can be used to read and write sysex files without the GUI.
+"""
+
+from mverb3.core.model import PROG_NUM, PROGRAM_FIELDS, Program, Bank
+
+__all__ = ["PROG_NUM", "PROGRAM_FIELDS", "Program", "Bank"]
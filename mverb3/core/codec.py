@@ -0,0 +1,224 @@
+"""MidiVerb III sysex codec.
+
+Values are stored as two 7-bit bytes: low 7 bits first, then the upper 3 bits. The program encoder and decoder are
+generated from the parameter schema, so programs and banks are packed directly into a preallocated `bytearray` and
+unpacked from a `memoryview` (or any other buffer) without slicing or building intermediate lists of bytes.
+"""
+
+import struct
+from array import array
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from mverb3.core.model import FIELD_NUM, PROG_NUM, Bank, Program
+from mverb3.core.schema import PARAMS, PARAMS_BY_NAME
+
+__all__ = [
+    "Buffer",
+    "HEADER",
+    "PROG_NUM",
+    "PROG_SIZE",
+    "BANK_SIZE",
+    "BANK_MESSAGE_SIZE",
+    "PROGRAM_MESSAGE_SIZE",
+    "MIDI_BYTE_TIME",
+    "FIELD_OFFSETS",
+    "BANK_SETTINGS_OFFSET",
+    "PROG_MAP_OFFSET",
+    "load_value",
+    "dump_value",
+    "encode_program",
+    "decode_program",
+    "encode_bank",
+    "decode_bank",
+    "encode_program_message",
+    "encode_bank_message",
+    "check_message",
+    "prog_map_ids",
+    "encode_prog_map",
+    "decode_prog_map",
+    "decode_midi_channel",
+]
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+HEADER = (0xF0, 0x00, 0x00, 0x0E, 0x03)  # sysex, manufacturer id, device id
+PROG_SIZE = 32
+BANK_SETTINGS_SIZE = 12
+PROG_MAP_SIZE = 256
+BANK_SETTINGS_OFFSET = (PROG_NUM + 1) * PROG_SIZE
+PROG_MAP_OFFSET = BANK_SETTINGS_OFFSET + BANK_SETTINGS_SIZE
+BANK_SIZE = PROG_MAP_OFFSET + PROG_MAP_SIZE
+BANK_MESSAGE_SIZE = len(HEADER) + 1 + BANK_SIZE + 1
+PROGRAM_MESSAGE_SIZE = len(HEADER) + 2 + PROG_SIZE + 1
+MIDI_BYTE_TIME = 10 / 31250  # 31250 baud, 10 bits per byte
+
+# value offsets inside a program dump, `dly_time` MSB is duplicated at `DLY_TIME_MSB_OFFSET`
+FIELD_OFFSETS = {param.name: param.offset for param in PARAMS}
+DLY_TIME_MSB_OFFSET = PARAMS_BY_NAME["dly_time"].msb_offset
+
+# A program dump is little-endian 16-bit words (low 7 bits, upper 3 bits) followed by padding bytes.
+_WORD_NUM = max(max(param.offset, param.msb_offset or 0) for param in PARAMS) // 2 + 1
+_PROGRAM = struct.Struct(f"<{_WORD_NUM}H{PROG_SIZE - _WORD_NUM * 2}x")
+_PROGRAM_WORDS = struct.Struct(f"<{_WORD_NUM}H")
+
+
+def load_value(byte_1: int, byte_2: int) -> int:
+    return ((byte_2 & 7) << 7) | (byte_1 & 127)
+
+
+def dump_value(value: int) -> Tuple[int, int]:
+    return value & 127, (value >> 7) & 7
+
+
+def _compile_program_codec() -> Tuple[Callable[[Sequence[int], bytearray, int], None], Callable[[Buffer, int], array]]:
+    """Generate the unrolled program encoder and decoder from `PARAMS`.
+
+    The functions are built from source the same way `collections.namedtuple` does, so packing a program is a single
+    `struct` call without loops over the schema.
+    """
+    words = ["0"] * _WORD_NUM
+    fields = []
+    for param in PARAMS:
+        v, w = f"v{param.param_id}", f"w{param.offset // 2}"
+        words[param.offset // 2] = f"({v} & 127) | (({v} << 1) & 0x700)"
+        field = f"({w} & 127) | (({w} >> 1) & 0x380)"
+        if param.msb_offset is not None:
+            words[param.msb_offset // 2] = f"({v} >> 8) & 127"
+            field += f" | ((w{param.msb_offset // 2} & 127) << 8)"
+        fields.append(field)
+    values = ", ".join(f"v{param.param_id}" for param in PARAMS)
+    source = (
+        f"def _encode_values(values, buffer, offset):\n"
+        f"    {values}, = values\n"
+        f"    _PROGRAM.pack_into(buffer, offset, {', '.join(words)})\n"
+        f"\n"
+        f"def _decode_values(data, offset):\n"
+        f"    {', '.join(f'w{n}' for n in range(_WORD_NUM))}, = _PROGRAM_WORDS.unpack_from(data, offset)\n"
+        f"    return array('H', ({', '.join(fields)}))\n"
+    )
+    namespace = {"array": array, "_PROGRAM": _PROGRAM, "_PROGRAM_WORDS": _PROGRAM_WORDS}
+    exec(source, namespace)
+    return namespace["_encode_values"], namespace["_decode_values"]
+
+
+_encode_values, _decode_values = _compile_program_codec()
+
+
+def encode_program(program: Program, buffer: bytearray, offset: int = 0) -> None:
+    """Write a program dump into the buffer at the offset."""
+    _encode_values(program.values(), buffer, offset)
+
+
+def decode_program(data: Buffer, offset: int = 0) -> Program:
+    program = Program()
+    program.set_values(_decode_values(data, offset))
+    return program
+
+
+def encode_bank(
+    bank: Bank,
+    midi_channel: int,
+    prog_map_table: Sequence[int],
+    buffer: Optional[bytearray] = None,
+    offset: int = 0,
+) -> bytearray:
+    """Write a bank dump (programs, edit buffer, device settings and program map table) into the buffer."""
+    if buffer is None:
+        buffer = bytearray(offset + BANK_SIZE)
+    values = bank.data
+    for n in range(PROG_NUM + 1):
+        _encode_values(values[n * FIELD_NUM : (n + 1) * FIELD_NUM], buffer, offset + n * PROG_SIZE)
+    settings = offset + BANK_SETTINGS_OFFSET
+    buffer[settings : settings + BANK_SETTINGS_SIZE] = bytes(
+        (
+            *dump_value(bank.program_id),  # selected program slot
+            0, 0,  # edit buffer off
+            0, 0,  # edit step off
+            0, 0,  # midi echo off
+            *dump_value(midi_channel),
+            *dump_value(1),  # program change enabled
+        )
+    )
+    prog_map = offset + PROG_MAP_OFFSET
+    buffer[prog_map : prog_map + len(prog_map_table)] = bytes(prog_map_table)
+    return buffer
+
+
+def decode_bank(data: Buffer, offset: int = 0) -> Bank:
+    settings = offset + BANK_SETTINGS_OFFSET
+    bank = Bank(program_id=load_value(data[settings], data[settings + 1]))
+    values = bank.data
+    for n in range(PROG_NUM + 1):
+        values[n * FIELD_NUM : (n + 1) * FIELD_NUM] = _decode_values(data, offset + n * PROG_SIZE)
+    return bank
+
+
+def encode_program_message(program: Program, program_id: int) -> bytearray:
+    """Encode a 0x01 program dump message. `program_id` is a slot number or `PROG_NUM` for the edit buffer."""
+    buffer = bytearray(PROGRAM_MESSAGE_SIZE)
+    buffer[: len(HEADER) + 2] = bytes((*HEADER, 0x01, program_id))
+    encode_program(program, buffer, len(HEADER) + 2)
+    buffer[-1] = 0xF7
+    return buffer
+
+
+def encode_bank_message(bank: Bank, midi_channel: int, prog_map_table: Sequence[int]) -> bytearray:
+    """Encode a 0x00 bank dump message."""
+    buffer = bytearray(BANK_MESSAGE_SIZE)
+    buffer[: len(HEADER) + 1] = bytes((*HEADER, 0x00))
+    encode_bank(bank, midi_channel, prog_map_table, buffer, len(HEADER) + 1)
+    buffer[-1] = 0xF7
+    return buffer
+
+
+def check_message(data: Buffer) -> int:
+    """Validate a bank or program dump message and return its command byte (0x00 bank, 0x01 program).
+
+    Raises `ValueError` with the reason if the message is not a valid MidiVerb III dump.
+    """
+    if len(data) < len(HEADER) + 2 or bytes(data[: len(HEADER)]) != bytes(HEADER):
+        raise ValueError("not a MidiVerb III sysex message")
+    command = data[len(HEADER)]
+    if command == 0x00:
+        size = BANK_MESSAGE_SIZE
+    elif command == 0x01:
+        size = PROGRAM_MESSAGE_SIZE
+    else:
+        raise ValueError(f"unsupported command 0x{command:02X}")
+    if len(data) != size:
+        raise ValueError(f"invalid length {len(data)}, expected {size}")
+    if data[-1] != 0xF7:
+        raise ValueError("missing the end of sysex byte")
+    if command == 0x01 and data[len(HEADER) + 1] > PROG_NUM:
+        raise ValueError(f"invalid program slot {data[len(HEADER) + 1]}")
+    if any(b & 0x80 for b in bytes(data[len(HEADER) + 1 : -1])):
+        raise ValueError("data bytes must be below 0x80")
+    return command
+
+
+def prog_map_ids(rom_programs: Sequence[int]) -> List[int]:
+    """Get the device program ids for MIDI program numbers 0-127.
+
+    MIDI programs 0-99 are mapped to the editable presets 100-199, the rest to the given ROM presets.
+    """
+    return [PROG_NUM + n for n in range(PROG_NUM)] + list(rom_programs)[: PROG_MAP_SIZE // 2 - PROG_NUM]
+
+
+def encode_prog_map(program_ids: Sequence[int]) -> List[int]:
+    """Encode program ids into the bank program map table."""
+    table = []
+    for n in program_ids:
+        table.extend(dump_value(n))
+    return table
+
+
+def decode_prog_map(data: Buffer, offset: int = 0) -> List[int]:
+    """Get the program ids from the program map table of a bank dump."""
+    prog_map = offset + PROG_MAP_OFFSET
+    return [load_value(data[n], data[n + 1]) for n in range(prog_map, prog_map + PROG_MAP_SIZE, 2)]
+
+
+def decode_midi_channel(data: Buffer, offset: int = 0) -> int:
+    """Get the device MIDI channel from the settings of a bank dump."""
+    settings = offset + BANK_SETTINGS_OFFSET
+    return load_value(data[settings + 8], data[settings + 9])
@@ -0,0 +1,205 @@
+from array import array
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+from mverb3.core.schema import PARAMS
+
+__all__ = ["PROG_NUM", "PROGRAM_FIELDS", "Program", "Bank"]
+
+PROG_NUM = 100
+
+# Program fields in the device parameter id order (0x03 param message)
+PROGRAM_FIELDS = tuple(param.name for param in PARAMS)
+FIELD_NUM = len(PROGRAM_FIELDS)
+
+
+def _zeros(size: int) -> array:
+    return array("H", bytes(2 * size))
+
+
+class Program:
+    """Program parameters.
+
+    A program is a view over `FIELD_NUM` values in an unsigned short array in the `PROGRAM_FIELDS` order. A new
+    program owns its array, while the programs returned by `Bank` are views over the bank slots, so changing them
+    changes the bank. Use `copy` to get a detached program.
+    """
+
+    __slots__ = ("_data", "_offset")
+
+    def __init__(
+        self,
+        in_eq: int = 0,
+        out_eq: int = 0,
+        chrs_type: int = 0,
+        chrs_speed: int = 0,
+        dly_time: int = 0,
+        dly_regen: int = 0,
+        rev_type: int = 0,
+        rev_decay: int = 0,
+        rev_mix: int = 0,
+        dly_mix: int = 0,
+        configuration: int = 0,
+        mod_routing: int = 0,
+        mod_amount: int = 0,
+    ):
+        self._data = array(
+            "H",
+            (
+                in_eq,
+                out_eq,
+                chrs_type,
+                chrs_speed,
+                dly_time,
+                dly_regen,
+                rev_type,
+                rev_decay,
+                rev_mix,
+                dly_mix,
+                configuration,
+                mod_routing,
+                mod_amount,
+            ),
+        )
+        self._offset = 0
+
+    @classmethod
+    def view(cls, data: array, offset: int) -> "Program":
+        program = cls.__new__(cls)
+        program._data = data
+        program._offset = offset
+        return program
+
+    def values(self) -> Tuple[int, ...]:
+        return tuple(self._data[self._offset : self._offset + FIELD_NUM])
+
+    def set_values(self, values: Sequence[int]) -> None:
+        self._data[self._offset : self._offset + FIELD_NUM] = array("H", values)
+
+    def assign(self, other: "Program") -> None:
+        """Copy all values from another program."""
+        self._data[self._offset : self._offset + FIELD_NUM] = other._data[other._offset : other._offset + FIELD_NUM]
+
+    def copy(self) -> "Program":
+        program = Program.__new__(Program)
+        program._data = self._data[self._offset : self._offset + FIELD_NUM]
+        program._offset = 0
+        return program
+
+    def asdict(self) -> Dict[str, int]:
+        return dict(zip(PROGRAM_FIELDS, self.values()))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Program):
+            return NotImplemented
+        return (
+            self._data[self._offset : self._offset + FIELD_NUM] == other._data[other._offset : other._offset + FIELD_NUM]
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Program({', '.join(f'{k}={v}' for k, v in zip(PROGRAM_FIELDS, self.values()))})"
+
+
+def _field(index: int) -> property:
+
+    def _get(self: Program) -> int:
+        return self._data[self._offset + index]
+
+    def _set(self: Program, value: int) -> None:
+        self._data[self._offset + index] = value
+
+    return property(_get, _set)
+
+
+for _index, _name in enumerate(PROGRAM_FIELDS):
+    setattr(Program, _name, _field(_index))
+
+
+class _Slots:
+    """Sequence of program views over the bank slots. Assigning a program copies its values into the slot."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: array):
+        self._data = data
+
+    def __len__(self) -> int:
+        return PROG_NUM
+
+    def __getitem__(self, n: int) -> Program:
+        return Program.view(self._data, self._offset(n))
+
+    def __setitem__(self, n: int, program: Program) -> None:
+        self[n].assign(program)
+
+    def __iter__(self) -> Iterator[Program]:
+        for n in range(PROG_NUM):
+            yield Program.view(self._data, n * FIELD_NUM)
+
+    @staticmethod
+    def _offset(n: int) -> int:
+        if n < 0:
+            n += PROG_NUM
+        if not 0 <= n < PROG_NUM:
+            raise IndexError("program slot out of range")
+        return n * FIELD_NUM
+
+
+class Bank:
+    """A bank of `PROG_NUM` programs and the edit buffer stored in a single (PROG_NUM + 1) x FIELD_NUM array.
+
+    `programs` and `edit_buffer` are views, so reading a program doesn't copy anything and a whole bank takes a
+    few kilobytes. Use `snapshot` and `from_snapshot` to keep cheap immutable copies.
+    """
+
+    __slots__ = ("data", "program_id")
+
+    def __init__(
+        self,
+        programs: Sequence[Program] = (),
+        edit_buffer: Optional[Program] = None,
+        program_id: int = 0,
+    ):
+        self.data = _zeros((PROG_NUM + 1) * FIELD_NUM)
+        self.program_id = program_id
+        slots = self.programs
+        for n, program in enumerate(programs):
+            slots[n] = program
+        if edit_buffer is not None:
+            self.edit_buffer = edit_buffer
+
+    @property
+    def programs(self) -> _Slots:
+        return _Slots(self.data)
+
+    @property
+    def edit_buffer(self) -> Program:
+        return Program.view(self.data, PROG_NUM * FIELD_NUM)
+
+    @edit_buffer.setter
+    def edit_buffer(self, program: Program) -> None:
+        self.edit_buffer.assign(program)
+
+    def snapshot(self) -> bytes:
+        return self.data.tobytes()
+
+    @classmethod
+    def from_snapshot(cls, data: bytes, program_id: int = 0) -> "Bank":
+        bank = cls(program_id=program_id)
+        bank.data = array("H")
+        bank.data.frombytes(data)
+        return bank
+
+    def copy(self) -> "Bank":
+        bank = Bank.__new__(Bank)
+        bank.data = self.data[:]
+        bank.program_id = self.program_id
+        return bank
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Bank):
+            return NotImplemented
+        return self.program_id == other.program_id and self.data == other.data
+
+    __hash__ = None
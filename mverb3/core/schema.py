@@ -0,0 +1,88 @@
+"""MidiVerb III program parameter schema.
+
+A single table describes every program parameter: its device param id (0x03 param message), the value offset inside
+a program dump, the value range and the label shown by the editor. The program model field order, the sysex codec,
+the param messages and the editor handlers are derived from it.
+
+Values are stored as two 7-bit bytes. `dly_time` is the only value longer than 10 bits, its MSB (value >> 8) is
+stored separately at `msb_offset`.
+"""
+
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from mverb3.core.data import EQ
+
+__all__ = [
+    "Param",
+    "PARAMS",
+    "PARAMS_BY_NAME",
+    "XDLY_CONFIGURATIONS",
+    "dly_time_maximum",
+    "encode_chrs_type",
+    "decode_chrs_type",
+    "encode_mod_routing",
+    "decode_mod_routing",
+]
+
+XDLY_CONFIGURATIONS = (13, 14)  # routing configurations with the extended delay
+
+
+class Param(NamedTuple):
+    name: str
+    param_id: int  # also the field index in the program model
+    offset: int  # value offset inside a program dump
+    minimum: int
+    maximum: int
+    label: Callable[[int], str] = str
+    msb_offset: Optional[int] = None
+
+
+PARAMS: Tuple[Param, ...] = (
+    Param("in_eq", 0, 0, 0, 30, EQ.__getitem__),
+    Param("out_eq", 1, 2, 0, 30, EQ.__getitem__),
+    Param("chrs_type", 2, 4, 0, 23),  # algorithm * 2 + stereo
+    Param("chrs_speed", 3, 6, 0, 99),
+    Param("dly_time", 4, 10, 1, 490, msb_offset=8),
+    Param("dly_regen", 5, 12, 0, 99),
+    Param("rev_type", 6, 14, 0, 19),
+    Param("rev_decay", 7, 16, 0, 99),
+    Param("rev_mix", 8, 18, 0, 99),
+    Param("dly_mix", 9, 20, 0, 99),
+    Param("configuration", 10, 22, 0, 14),
+    Param("mod_routing", 11, 24, 0, 48),  # destination * 8 + source
+    Param("mod_amount", 12, 26, 0, 198, lambda value: str(value - 99)),
+)
+PARAMS_BY_NAME: Dict[str, Param] = {param.name: param for param in PARAMS}
+
+assert [param.param_id for param in PARAMS] == list(range(len(PARAMS)))
+
+
+def dly_time_maximum(configuration: int) -> int:
+    return 490 if configuration in XDLY_CONFIGURATIONS else 100
+
+
+def encode_chrs_type(algorithm: int, stereo: bool) -> int:
+    return algorithm * 2 + int(stereo)
+
+
+def decode_chrs_type(value: int) -> Tuple[int, bool]:
+    return value // 2, bool(value % 2)
+
+
+def encode_mod_routing(source: int, destination: int) -> int:
+    """Get the routing value from the source index and the destination menu index (0 is OFF)."""
+    if destination == 0:
+        return 0
+    # 0 0 is reserved for OFF, so for CC7 (source 0) destinations start from 1, for other sources from 0
+    if source != 0:
+        destination -= 1
+    return destination * 8 + source
+
+
+def decode_mod_routing(value: int) -> Tuple[int, int]:
+    """Get the source index and the destination menu index (0 is OFF) from the routing value."""
+    if value == 0:
+        return 0, 0
+    if value % 8 == 0:
+        return 0, value // 8
+    return value % 8, value // 8 + 1
@@ -0,0 +1,141 @@
+"""Standard MIDI File (.mid) export and import of MidiVerb III dumps.
+
+Exported files contain a single track with the messages spaced by the device timing, so a DAW can restore the unit
+when a project is loaded. Import reads the tracks event by event and extracts the MidiVerb III dumps, so large files
+are processed in constant memory.
+"""
+
+import math
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Sequence, Tuple, Union
+
+from mverb3.core import codec, sysex
+
+__all__ = ["DIVISION", "TEMPO", "is_smf", "write_smf", "read_frames"]
+
+DIVISION = 500  # ticks per quarter note, 1 tick = 1 ms at the default tempo
+TEMPO = 500000  # microseconds per quarter note (120 BPM)
+
+_HEADER = struct.Struct(">4sL")
+_MTHD = struct.Struct(">HHH")
+_DATA_LENGTH = {0x80: 2, 0x90: 2, 0xA0: 2, 0xB0: 2, 0xC0: 1, 0xD0: 1, 0xE0: 2}
+_SYSTEM_DATA_LENGTH = {0xF1: 1, 0xF2: 2, 0xF3: 1}  # other system common and real-time messages have no data
+
+FilePath = Union[str, Path]
+
+
+def _varlen(value: int) -> bytes:
+    data = [value & 0x7F]
+    value >>= 7
+    while value:
+        data.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(data))
+
+
+def _event(message: Sequence[int]) -> bytes:
+    message = bytes(message)
+    if message[0] == 0xF0:
+        return b"\xf0" + _varlen(len(message) - 1) + message[1:]
+    return message
+
+
+def write_smf(fp: Union[FilePath, BinaryIO], messages: Iterable[Tuple[Sequence[int], float]]) -> None:
+    """Write (message, delay in seconds) pairs to a format 0 MIDI file.
+
+    Each message starts after the previous one is transmitted at the MIDI rate and its delay has passed. Event times
+    are rounded up, so the messages are never closer than the delays.
+    """
+    track = bytearray(b"\x00\xff\x51\x03" + TEMPO.to_bytes(3, "big"))
+    ticks_per_second = DIVISION * 1_000_000 / TEMPO
+    time, last_tick = 0.0, 0
+    for message, delay in messages:
+        tick = math.ceil(round(time * ticks_per_second, 6))
+        track += _varlen(tick - last_tick) + _event(message)
+        last_tick = tick
+        time += len(message) * codec.MIDI_BYTE_TIME + delay
+    track += _varlen(math.ceil(round(time * ticks_per_second, 6)) - last_tick) + b"\xff\x2f\x00"
+    data = _HEADER.pack(b"MThd", _MTHD.size) + _MTHD.pack(0, 1, DIVISION) + _HEADER.pack(b"MTrk", len(track)) + track
+    if isinstance(fp, (str, Path)):
+        with open(fp, "wb") as f:
+            f.write(data)
+    else:
+        fp.write(data)
+
+
+def is_smf(fp: FilePath) -> bool:
+    with open(fp, "rb") as f:
+        return f.read(4) == b"MThd"
+
+
+def _read(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) < size:
+        raise ValueError("unexpected end of the MIDI file")
+    return data
+
+
+def _read_varlen(f: BinaryIO) -> int:
+    value = 0
+    for _ in range(4):
+        byte = _read(f, 1)[0]
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value
+    raise ValueError("invalid variable length value")
+
+
+def _iter_track(f: BinaryIO, end: int, chunk_size: int) -> Iterator[bytes]:
+    """Yield the sysex event data of a track in pieces of up to `chunk_size` bytes."""
+    running = 0
+    while f.tell() < end:
+        _read_varlen(f)  # delta time
+        status = _read(f, 1)[0]
+        if status == 0xFF:
+            running = 0  # meta and sysex events cancel the running status
+            _read(f, 1)  # meta event type
+            f.seek(_read_varlen(f), 1)
+        elif status in (0xF0, 0xF7):
+            running = 0
+            size = _read_varlen(f)
+            prefix = b"\xf0" if status == 0xF0 else b""
+            while size:
+                piece = _read(f, min(size, chunk_size))
+                size -= len(piece)
+                yield prefix + piece
+                prefix = b""
+        elif status > 0xF0:
+            f.seek(_SYSTEM_DATA_LENGTH.get(status, 0), 1)
+        elif status & 0x80:
+            running = status
+            f.seek(_DATA_LENGTH[status & 0xF0], 1)
+        elif running:
+            f.seek(_DATA_LENGTH[running & 0xF0] - 1, 1)  # running status, the first data byte is read
+        else:
+            raise ValueError("invalid MIDI event")
+
+
+def _iter_sysex(f: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    chunk_type, size = _HEADER.unpack(_read(f, _HEADER.size))
+    if chunk_type != b"MThd":
+        raise ValueError("not a MIDI file")
+    f.seek(size, 1)
+    while True:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        chunk_type, size = _HEADER.unpack(header)
+        end = f.tell() + size
+        if chunk_type == b"MTrk":
+            yield from _iter_track(f, end, chunk_size)
+        f.seek(end)
+
+
+def read_frames(fp: Union[FilePath, BinaryIO], chunk_size: int = sysex.CHUNK_SIZE) -> Iterator[sysex.Frame]:
+    """Get the MidiVerb III bank and program dumps from the sysex events of all tracks of a MIDI file."""
+    if isinstance(fp, (str, Path)):
+        with open(fp, "rb") as f:
+            yield from sysex.iter_frames(_iter_sysex(f, chunk_size))
+    else:
+        yield from sysex.iter_frames(_iter_sysex(fp, chunk_size))
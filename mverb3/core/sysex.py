@@ -0,0 +1,128 @@
+"""Split MIDI byte streams into sysex messages.
+
+The splitter works on chunks of any size, so files and memory-mapped regions of any size are processed in constant
+memory. Bytes outside F0...F7 are skipped, real-time messages inside sysex are dropped and a message interrupted by
+a new F0 is discarded.
+"""
+
+import mmap
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from mverb3.core import codec
+
+__all__ = ["BANK_DUMP", "PROGRAM_DUMP", "Frame", "SysexSplitter", "iter_frames", "read_frames"]
+
+BANK_DUMP = 0x00
+PROGRAM_DUMP = 0x01
+CHUNK_SIZE = 1 << 16
+
+_REALTIME = bytes(range(0xF8, 0x100))
+
+
+class Frame(NamedTuple):
+    """A valid MidiVerb III bank or program dump message."""
+
+    command: int
+    message: bytes
+
+    @property
+    def slot(self) -> Optional[int]:
+        """Program dump slot, `PROG_NUM` is the edit buffer."""
+        return self.message[len(codec.HEADER) + 1] if self.command == PROGRAM_DUMP else None
+
+    @property
+    def body(self) -> memoryview:
+        """Bank or program data without the header."""
+        offset = len(codec.HEADER) + (1 if self.command == BANK_DUMP else 2)
+        return memoryview(self.message)[offset:-1]
+
+
+class SysexSplitter:
+    """Reassemble sysex messages from chunks of MIDI bytes."""
+
+    MAX_LENGTH = 65536
+
+    def __init__(self, max_length: int = MAX_LENGTH):
+        self.max_length = max_length
+        self._buffer: Optional[bytearray] = None
+
+    def reset(self) -> None:
+        self._buffer = None
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """Add a chunk and get the messages completed by it."""
+        messages = []
+        while chunk:
+            if self._buffer is None:
+                start = chunk.find(0xF0)
+                if start < 0:
+                    break
+                self._buffer = bytearray(b"\xf0")
+                chunk = chunk[start + 1 :]
+            restart = chunk.find(0xF0)
+            end = chunk.find(0xF7)
+            if restart >= 0 and (end < 0 or restart < end):
+                # the previous message is incomplete
+                self._buffer = None
+                chunk = chunk[restart:]
+                continue
+            if end < 0:
+                self._buffer += chunk.translate(None, _REALTIME)
+                if len(self._buffer) > self.max_length:
+                    self._buffer = None
+                break
+            self._buffer += chunk[: end + 1].translate(None, _REALTIME)
+            if len(self._buffer) <= self.max_length:
+                messages.append(bytes(self._buffer))
+            self._buffer = None
+            chunk = chunk[end + 1 :]
+        return messages
+
+
+def iter_frames(chunks: Iterable[bytes]) -> Iterator[Frame]:
+    """Get the MidiVerb III bank and program dumps from chunks of MIDI bytes, skipping anything else."""
+    splitter = SysexSplitter(codec.BANK_MESSAGE_SIZE)
+    for chunk in chunks:
+        for message in splitter.feed(chunk):
+            try:
+                command = codec.check_message(message)
+            except ValueError:
+                continue
+            yield Frame(command, message)
+
+
+def _iter_chunks(f: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _iter_buffer(buffer: codec.Buffer, chunk_size: int) -> Iterator[bytes]:
+    view = memoryview(buffer)
+    for offset in range(0, len(view), chunk_size):
+        yield bytes(view[offset : offset + chunk_size])
+
+
+def read_frames(
+    source: Union[str, Path, BinaryIO, codec.Buffer, mmap.mmap], chunk_size: int = CHUNK_SIZE, use_mmap: bool = False
+) -> Iterator[Frame]:
+    """Get the MidiVerb III dumps from a file path, a binary file object or a buffer (i.e. a memory-mapped region).
+
+    With `use_mmap` a file path is memory-mapped instead of read.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            if use_mmap:
+                if not f.seek(0, 2):
+                    return  # empty files can't be mapped
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    yield from iter_frames(_iter_buffer(m, chunk_size))
+            else:
+                yield from iter_frames(_iter_chunks(f, chunk_size))
+    elif hasattr(source, "read"):
+        yield from iter_frames(_iter_chunks(source, chunk_size))
+    else:
+        yield from iter_frames(_iter_buffer(source, chunk_size))
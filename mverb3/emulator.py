@@ -0,0 +1,223 @@
+"""Software MidiVerb III emulator.
+
+Opens virtual MIDI ports and replies to the same sysex commands the app sends to the device, so the transport can be
+tested and benchmarked without the hardware. Run with `python -m mverb3.emulator`. Virtual ports are not supported
+by rtmidi on Windows.
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable, Dict, List, Optional, Sequence
+
+from mverb3.core.bank import BANK
+from mverb3.core.codec import (
+    HEADER,
+    PROG_NUM,
+    PROG_SIZE,
+    BANK_SIZE,
+    BANK_SETTINGS_OFFSET as SETTINGS_OFFSET,
+    PROG_MAP_OFFSET,
+    load_value,
+    dump_value,
+)
+from mverb3.core.schema import PARAMS
+
+__all__ = ["Timing", "Violation", "Emulator", "run"]
+
+
+@dataclass
+class Timing:
+    """Minimum time in seconds the device needs after each message type."""
+
+    param: float = 0.025
+    program_change: float = 0.05
+    program: float = 0.33
+    bank: float = 10.0
+    bank_request: float = 0.05
+
+
+@dataclass
+class Violation:
+    """A message has arrived while the device was still busy with the previous one."""
+
+    command: str
+    gap: float
+    required: float
+
+
+@dataclass
+class Stats:
+    messages: Dict[str, int] = field(default_factory=dict)
+    bytes_received: int = 0
+    violations: List[Violation] = field(default_factory=list)
+    first_message_at: Optional[float] = None
+    last_message_at: Optional[float] = None
+
+    @property
+    def throughput(self) -> float:
+        """Received bytes per second."""
+        if self.first_message_at is None or self.last_message_at == self.first_message_at:
+            return 0.0
+        return self.bytes_received / (self.last_message_at - self.first_message_at)
+
+
+class Emulator:
+    """MidiVerb III memory and MIDI command handling.
+
+    `memory` has the same layout as the bank dump body: 101 programs (the last one is the edit buffer), device
+    settings and the program map table.
+    """
+
+    def __init__(self, timing: Optional[Timing] = None, on_violation: Optional[Callable[[Violation], None]] = None):
+        self.timing = timing or Timing()
+        self.memory = bytearray(BANK[len(HEADER) + 1 : -1])
+        self.stats = Stats()
+        self._on_violation = on_violation
+        self._busy_until = 0.0
+        self._last_command = ""
+        self._last_message_at = 0.0
+        self._lock = Lock()
+
+    @property
+    def midi_channel(self) -> int:
+        return load_value(self.memory[SETTINGS_OFFSET + 8], self.memory[SETTINGS_OFFSET + 9])
+
+    @property
+    def midi_echo(self) -> bool:
+        return bool(load_value(self.memory[SETTINGS_OFFSET + 6], self.memory[SETTINGS_OFFSET + 7]))
+
+    def load_bank(self, data: Sequence[int]) -> None:
+        """Load a bank .syx dump into the memory without timing checks."""
+        data = bytes(data)
+        if not data.startswith(bytes((*HEADER, 0x00))) or len(data) != len(BANK):
+            raise ValueError("Not a MidiVerb III bank dump")
+        self.memory[:] = data[len(HEADER) + 1 : -1]
+
+    def program(self, program_id: int) -> bytes:
+        """Get the stored program (0-99) or the edit buffer (100)."""
+        offset = program_id * PROG_SIZE
+        return bytes(self.memory[offset : offset + PROG_SIZE])
+
+    def handle(self, message: Sequence[int], now: Optional[float] = None) -> List[bytes]:
+        """Process an incoming message and return the messages to send back."""
+        now = monotonic() if now is None else now
+        message = bytes(message)
+        with self._lock:
+            response = self._handle(message, now)
+            if self.midi_echo:
+                response.insert(0, message)
+            return response
+
+    def _handle(self, message: bytes, now: float) -> List[bytes]:
+        if message[0] & 0xF0 == 0xC0 and len(message) == 2:
+            if message[0] & 0x0F != self.midi_channel:
+                return []
+            self._track("program_change", now, len(message))
+            self._program_change(message[1])
+            return []
+        if not message.startswith(bytes(HEADER)) or message[-1] != 0xF7 or len(message) < len(HEADER) + 2:
+            return []
+        command = message[len(HEADER)]
+        data = message[len(HEADER) + 1 : -1]
+        if command == 0x00 and len(data) == BANK_SIZE:
+            self._track("bank", now, len(message))
+            self.memory[:] = data
+        elif command == 0x01 and len(data) == PROG_SIZE + 1 and data[0] <= PROG_NUM:
+            self._track("program", now, len(message))
+            offset = data[0] * PROG_SIZE
+            self.memory[offset : offset + PROG_SIZE] = data[1:]
+        elif command == 0x02:
+            self._track("bank_request", now, len(message))
+            return [bytes((*HEADER, 0x00)) + self.memory + b"\xf7"]
+        elif command == 0x03 and len(data) == 3 and data[0] < len(PARAMS):
+            self._track("param", now, len(message))
+            self._set_param(data[0], load_value(data[1], data[2]))
+        return []
+
+    def _track(self, command: str, now: float, size: int) -> None:
+        stats = self.stats
+        stats.messages[command] = stats.messages.get(command, 0) + 1
+        stats.bytes_received += size
+        if stats.first_message_at is None:
+            stats.first_message_at = now
+        stats.last_message_at = now
+        if now < self._busy_until:
+            violation = Violation(
+                command=f"{command} after {self._last_command}",
+                gap=now - self._last_message_at,
+                required=self._busy_until - self._last_message_at,
+            )
+            stats.violations.append(violation)
+            if self._on_violation:
+                self._on_violation(violation)
+        self._last_command = command
+        self._last_message_at = now
+        self._busy_until = now + getattr(self.timing, command)
+
+    def _program_change(self, value: int) -> None:
+        offset = PROG_MAP_OFFSET + value * 2
+        program_id = load_value(self.memory[offset], self.memory[offset + 1])
+        if PROG_NUM <= program_id < PROG_NUM * 2:
+            buffer = PROG_NUM * PROG_SIZE
+            self.memory[buffer : buffer + PROG_SIZE] = self.program(program_id - PROG_NUM)
+
+    def _set_param(self, param_id: int, value: int) -> None:
+        param = PARAMS[param_id]
+        offset = PROG_NUM * PROG_SIZE
+        self.memory[offset + param.offset : offset + param.offset + 2] = bytes(dump_value(value))
+        if param.msb_offset is not None:
+            self.memory[offset + param.msb_offset : offset + param.msb_offset + 2] = bytes(dump_value(value >> 8))
+
+
+def run(name: str, bank_path: Optional[str] = None, timing: Optional[Timing] = None) -> Stats:
+    """Run the emulator on virtual ports until interrupted and return the collected stats."""
+    import rtmidi
+
+    def _report(violation: Violation) -> None:
+        print(
+            f"TIMING: {violation.command} came after {violation.gap * 1000:.1f} ms, "
+            f"required {violation.required * 1000:.1f} ms"
+        )
+
+    emulator = Emulator(timing, on_violation=_report)
+    if bank_path:
+        with open(bank_path, "rb") as f:
+            emulator.load_bank(f.read())
+    midi_in, midi_out = rtmidi.MidiIn(), rtmidi.MidiOut()
+    midi_in.ignore_types(sysex=False)
+    midi_out.open_virtual_port(name)
+    midi_in.open_virtual_port(name)
+
+    def _receive(event, _=None) -> None:
+        for response in emulator.handle(event[0]):
+            midi_out.send_message(response)
+
+    midi_in.set_callback(_receive)
+    print(f"Emulating MidiVerb III on virtual port '{name}', press Ctrl+C to stop")
+    try:
+        while True:
+            sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        midi_in.close_port()
+        midi_out.close_port()
+    stats = emulator.stats
+    print(f"Messages: {stats.messages}")
+    print(f"Throughput: {stats.throughput:.0f} bytes/s")
+    print(f"Timing violations: {len(stats.violations)}")
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="mverb3.emulator", description="MidiVerb III emulator on virtual MIDI ports")
+    parser.add_argument("--name", default="MidiVerb III Emulator", help="virtual port name")
+    parser.add_argument("--bank", default=None, help="bank .syx file to load on start")
+    args = parser.parse_args()
+    run(args.name, args.bank)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+from array import array
+from contextlib import contextmanager
+from time import monotonic
+from typing import Iterator, List, Optional, Tuple
+
+__all__ = ["EditHistory"]
+
+CAPACITY = 10000  # deltas, ~9 bytes each
+MERGE_WINDOW = 1.0  # seconds between changes of the same param merged into one step
+
+
+class EditHistory:
+    """Undo / redo history of the edit buffer.
+
+    Each change is stored as a param id with the old and the new value in preallocated arrays used as a ring buffer,
+    so the oldest steps are dropped when the history is full. Changes recorded inside a `step` block (including
+    nested ones, i.e. the delay time clamped by a configuration change) are undone together. A step with a single
+    change of the same param as the previous single-change step made within `merge_window` seconds extends that step
+    when it is closed, so a slider drag is undone at once. Steps with several changes are never merged.
+    """
+
+    def __init__(self, capacity: int = CAPACITY, merge_window: float = MERGE_WINDOW):
+        self.capacity = capacity
+        self.merge_window = merge_window
+        self._params = array("B", bytes(capacity))
+        self._old = array("H", bytes(2 * capacity))
+        self._new = array("H", bytes(2 * capacity))
+        self._steps = array("I", bytes(array("I").itemsize * capacity))
+        self._start = 0  # physical index of the oldest delta
+        self._count = 0  # stored deltas
+        self._cursor = 0  # applied deltas, the ones after the cursor can be redone
+        self._step = 0
+        self._depth = 0
+        self._step_size = 0  # deltas recorded in the current step
+        self._step_at = 0.0  # time of the first change of the current step
+        self._pending: Optional[Tuple[int, int, int]] = None  # first change of the step until it's merged or not
+        self._last_at: Optional[float] = None  # time of the last change, None if it can't be merged
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def can_undo(self) -> bool:
+        return self._cursor > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self._cursor < self._count
+
+    def clear(self) -> None:
+        self._start = self._count = self._cursor = 0
+        self._pending = None
+        self._last_at = None
+
+    @contextmanager
+    def step(self) -> Iterator[None]:
+        if self._depth == 0:
+            self._step = (self._step + 1) & 0xFFFFFFFF
+            self._step_size = 0
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0 and self._step_size:
+                self._close_step()
+
+    def record(self, param_id: int, old: int, new: int, now: Optional[float] = None) -> None:
+        """Add a change to the current step (or a new one outside of `step`)."""
+        if old == new:
+            return
+        if self._depth == 0:
+            with self.step():
+                self.record(param_id, old, new, now)
+            return
+        if self._step_size == 0:
+            self._step_at = monotonic() if now is None else now
+            if self._can_merge(param_id):
+                self._pending = param_id, old, new
+                self._step_size = 1
+                return
+        if self._pending is not None:
+            # the step has several changes, so it's not merged
+            pending, self._pending = self._pending, None
+            self._append(*pending)
+        self._append(param_id, old, new)
+        self._step_size += 1
+
+    def undo(self) -> List[Tuple[int, int]]:
+        """Revert the last step, get the (param id, value) pairs to apply in order."""
+        changes = []
+        if self._cursor:
+            step = self._steps[self._index(self._cursor - 1)]
+            while self._cursor and self._steps[self._index(self._cursor - 1)] == step:
+                self._cursor -= 1
+                n = self._index(self._cursor)
+                changes.append((self._params[n], self._old[n]))
+        self._last_at = None
+        return changes
+
+    def redo(self) -> List[Tuple[int, int]]:
+        """Apply the next undone step again, get the (param id, value) pairs to apply in order."""
+        changes = []
+        if self._cursor < self._count:
+            step = self._steps[self._index(self._cursor)]
+            while self._cursor < self._count and self._steps[self._index(self._cursor)] == step:
+                n = self._index(self._cursor)
+                changes.append((self._params[n], self._new[n]))
+                self._cursor += 1
+        self._last_at = None
+        return changes
+
+    def _index(self, position: int) -> int:
+        return (self._start + position) % self.capacity
+
+    def _append(self, param_id: int, old: int, new: int) -> None:
+        if self._cursor < self._count:
+            self._count = self._cursor
+        if self._count == self.capacity:
+            self._drop_oldest_step()
+        n = self._index(self._count)
+        self._params[n], self._old[n], self._new[n], self._steps[n] = param_id, old, new, self._step
+        self._count += 1
+        self._cursor += 1
+
+    def _can_merge(self, param_id: int) -> bool:
+        """Check if the first change of the step follows a recent single-change step of the same param."""
+        return (
+            self._last_at is not None
+            and 0 < self._cursor == self._count
+            and self._step_at - self._last_at <= self.merge_window
+            and self._params[self._index(self._count - 1)] == param_id
+        )
+
+    def _close_step(self) -> None:
+        """Merge a step with a single change into the previous one if it changed the same param."""
+        if self._step_size > 1:
+            self._last_at = None
+            return
+        if self._pending is not None:
+            _, _, new = self._pending
+            self._pending = None
+            n = self._index(self._count - 1)
+            if new == self._old[n]:
+                # back where the burst started, nothing to undo
+                self._count -= 1
+                self._cursor -= 1
+                self._last_at = None
+                return
+            self._new[n] = new
+        self._last_at = self._step_at
+
+    def _drop_oldest_step(self) -> None:
+        step = self._steps[self._start]
+        while self._count and self._steps[self._start] == step:
+            self._start = (self._start + 1) % self.capacity
+            self._count -= 1
+            self._cursor -= 1
@@ -0,0 +1,228 @@
+"""SQLite index of MidiVerb III programs from bank and program sysex files.
+
+Every program is stored as a row with a column per parameter, so the archive can be searched by parameter ranges.
+Files are re-read only if their size, mtime or the program names file have changed, and re-indexed only if their
+content hash differs.
+"""
+
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from mverb3.core import codec
+from mverb3.core.model import PROG_NUM, PROGRAM_FIELDS, Program
+
+__all__ = ["Library", "Match", "IngestStats", "Condition"]
+
+# a value, an inclusive (min, max) range with optional ends or a list of allowed values
+Condition = Union[int, Tuple[Optional[int], Optional[int]], List[int]]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    names_mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS programs (
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+    slot INTEGER NOT NULL,
+    name TEXT,
+    {", ".join(f"{name} INTEGER NOT NULL" for name in PROGRAM_FIELDS)},
+    PRIMARY KEY (file_id, slot)
+);
+CREATE INDEX IF NOT EXISTS programs_rev_type ON programs (rev_type, dly_time);
+CREATE INDEX IF NOT EXISTS programs_configuration ON programs (configuration, dly_time);
+CREATE INDEX IF NOT EXISTS programs_chrs_type ON programs (chrs_type);
+CREATE INDEX IF NOT EXISTS programs_mod_routing ON programs (mod_routing);
+"""
+
+_INSERT = (
+    f"INSERT INTO programs (file_id, slot, name, {', '.join(PROGRAM_FIELDS)}) "
+    f"VALUES ({', '.join('?' * (len(PROGRAM_FIELDS) + 3))})"
+)
+
+
+class Match(NamedTuple):
+    path: str
+    slot: int
+    name: Optional[str]
+    program: Program
+
+
+class IngestStats(NamedTuple):
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    failed: int = 0
+
+
+def _mtime_ns(fp: Path) -> int:
+    try:
+        return fp.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def _read_names(fp: Path) -> List[Optional[str]]:
+    names: List[Optional[str]] = [None] * PROG_NUM
+    if fp.exists():
+        with open(fp, "r") as f:
+            for n, s in enumerate(f.readlines()[:PROG_NUM]):
+                s = s.strip()
+                if s and s != "---":
+                    names[n] = s
+    return names
+
+
+def _read_programs(data: bytes, names: Sequence[Optional[str]]) -> Iterator[Tuple[int, Optional[str], Program]]:
+    command = codec.check_message(data)
+    if command == 0x01:
+        yield data[len(codec.HEADER) + 1], None, codec.decode_program(data, len(codec.HEADER) + 2)
+        return
+    bank = codec.decode_bank(memoryview(data)[len(codec.HEADER) + 1 : -1])
+    for slot, program in enumerate(bank.programs):
+        yield slot, names[slot], program
+
+
+class Library:
+    """Program index stored in a SQLite database."""
+
+    SUFFIXES = (".syx",)
+
+    def __init__(self, path: Union[str, Path]):
+        self._db = sqlite3.connect(str(path))
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "Library":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def ingest(self, paths: Iterable[Union[str, Path]]) -> IngestStats:
+        """Index the sysex files in the given files or directories.
+
+        Files which were indexed before under the given directories but don't exist anymore are removed from the
+        index.
+        """
+        stats: Dict[str, int] = dict.fromkeys(IngestStats._fields, 0)
+        known = {
+            row[0]: row[1:]
+            for row in self._db.execute("SELECT path, id, size, mtime_ns, names_mtime_ns, hash FROM files")
+        }
+        seen = set()
+        with self._db:
+            for root in paths:
+                root = Path(root).resolve()
+                for fp in self._iter_files(root):
+                    path = str(fp)
+                    seen.add(path)
+                    try:
+                        stats[self._ingest_file(fp, known.get(path))] += 1
+                    except (OSError, ValueError):
+                        stats["failed"] += 1
+                if root.is_dir():
+                    prefix = os.path.join(str(root), "")
+                    for path, (file_id, *_) in known.items():
+                        if path.startswith(prefix) and path not in seen:
+                            self._db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                            stats["removed"] += 1
+        return IngestStats(**stats)
+
+    def query(self, name: Optional[str] = None, limit: Optional[int] = None, **conditions: Condition) -> List[Match]:
+        """Find programs by parameter values, i.e. `query(rev_type=15, dly_time=(300, None), configuration=[13, 14])`.
+
+        `name` is an SQL LIKE pattern for the program name.
+        """
+        where, args = [], []
+        for field, condition in conditions.items():
+            if field not in PROGRAM_FIELDS:
+                raise ValueError(f"unknown program field: {field}")
+            if isinstance(condition, tuple):
+                low, high = condition
+                if low is not None:
+                    where.append(f"p.{field} >= ?")
+                    args.append(low)
+                if high is not None:
+                    where.append(f"p.{field} <= ?")
+                    args.append(high)
+            elif isinstance(condition, list):
+                where.append(f"p.{field} IN ({', '.join('?' * len(condition))})")
+                args.extend(condition)
+            else:
+                where.append(f"p.{field} = ?")
+                args.append(condition)
+        if name is not None:
+            where.append("p.name LIKE ?")
+            args.append(name)
+        sql = f"SELECT f.path, p.slot, p.name, {', '.join(f'p.{field}' for field in PROGRAM_FIELDS)} "
+        sql += "FROM programs p JOIN files f ON f.id = p.file_id"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY f.path, p.slot"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        matches = []
+        for path, slot, program_name, *values in self._db.execute(sql, args):
+            program = Program()
+            program.set_values(values)
+            matches.append(Match(path, slot, program_name, program))
+        return matches
+
+    def count(self) -> Tuple[int, int]:
+        """Get the number of indexed files and programs."""
+        files = self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        programs = self._db.execute("SELECT COUNT(*) FROM programs").fetchone()[0]
+        return files, programs
+
+    def _iter_files(self, root: Path) -> Iterator[Path]:
+        if root.is_file():
+            yield root
+            return
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.lower().endswith(self.SUFFIXES):
+                    yield Path(dirpath, name)
+
+    def _ingest_file(self, fp: Path, known: Optional[tuple]) -> str:
+        stat = fp.stat()
+        names_fp = fp.parent / f"{fp.stem}.txt"
+        names_mtime_ns = _mtime_ns(names_fp)
+        key = (stat.st_size, stat.st_mtime_ns, names_mtime_ns)
+        if known is not None and tuple(known[1:4]) == key:
+            return "unchanged"
+        with open(fp, "rb") as f:
+            data = f.read()
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if known is not None and known[3:] == (names_mtime_ns, digest):
+            self._db.execute("UPDATE files SET mtime_ns = ? WHERE id = ?", (stat.st_mtime_ns, known[0]))
+            return "unchanged"
+        programs = list(_read_programs(data, _read_names(names_fp)))
+        if known is not None:
+            file_id = known[0]
+            self._db.execute(
+                "UPDATE files SET size = ?, mtime_ns = ?, names_mtime_ns = ?, hash = ? WHERE id = ?",
+                (*key, digest, file_id),
+            )
+            self._db.execute("DELETE FROM programs WHERE file_id = ?", (file_id,))
+            status = "updated"
+        else:
+            file_id = self._db.execute(
+                "INSERT INTO files (path, size, mtime_ns, names_mtime_ns, hash) VALUES (?, ?, ?, ?, ?)",
+                (str(fp), *key, digest),
+            ).lastrowid
+            status = "added"
+        self._db.executemany(_INSERT, [(file_id, slot, name, *program.values()) for slot, name, program in programs])
+        return status
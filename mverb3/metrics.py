@@ -0,0 +1,163 @@
+"""Live transport metrics.
+
+The numbers show where the lag comes from: param updates waiting in the scheduler queue (or merged away), the time
+from a GUI event to the wire, the gaps between messages (the device delays) and the time spent waiting for the device
+lock held by transfers. Metrics can be exported as JSON or in the Prometheus text format.
+"""
+
+import json
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+__all__ = ["Summary", "TimedLock", "TransportMetrics"]
+
+# histogram bounds in seconds, around the param, program change, buffer dump and bank dump delays
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.33, 1.0, 10.0)
+IDLE_GAP = 11.0  # longer gaps between messages are idle time, not delays
+
+
+class Summary:
+    """Distribution of observed durations in seconds."""
+
+    SMOOTHING = 0.2  # weight of the newest value in `recent`
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = 0.0  # exponentially weighted mean
+        self._counts = [0] * len(self.buckets)
+        self._lock = Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+            self.recent = value if self.count == 1 else self.recent + self.SMOOTHING * (value - self.recent)
+            for n, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[n] += 1
+                    break
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Get (upper bound, number of values less or equal) pairs."""
+        with self._lock:
+            counts, result, acc = list(self._counts), [], 0
+        for bound, count in zip(self.buckets, counts):
+            acc += count
+            result.append((bound, acc))
+        return result
+
+    def asdict(self) -> Dict[str, float]:
+        return {"count": self.count, "mean": self.mean, "recent": self.recent, "max": self.max}
+
+
+class TimedLock:
+    """A lock which measures the time spent waiting for it."""
+
+    def __init__(self, summary: Summary):
+        self._lock = Lock()
+        self._summary = summary
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        started_at = monotonic()
+        acquired = self._lock.acquire(blocking, timeout)
+        self._summary.observe(monotonic() - started_at)
+        return acquired
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *_) -> None:
+        self.release()
+
+
+class TransportMetrics:
+    """Counters and timings of the device MIDI output.
+
+    `queue_depth` is a callable returning the current number of pending param updates.
+    """
+
+    def __init__(self, queue_depth: Callable[[], int] = lambda: 0):
+        self.queue_depth = queue_depth
+        self.queued = 0  # param updates put in the queue
+        self.merged = 0  # param updates replaced by a newer value before being sent
+        self.messages = 0
+        self.bytes = 0
+        self.latency = Summary()  # param update queued -> sent
+        self.gap = Summary()  # between two consecutive messages
+        self.lock_wait = Summary()
+        self._last_sent_at: Optional[float] = None
+
+    def sent(self, size: int) -> None:
+        """Count a message written to the output. Must be called under the device lock."""
+        now = monotonic()
+        if self._last_sent_at is not None and now - self._last_sent_at < IDLE_GAP:
+            self.gap.observe(now - self._last_sent_at)
+        self._last_sent_at = now
+        self.messages += 1
+        self.bytes += size
+
+    @property
+    def merge_ratio(self) -> float:
+        return self.merged / self.queued if self.queued else 0.0
+
+    def asdict(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth(),
+            "queued": self.queued,
+            "merged": self.merged,
+            "merge_ratio": self.merge_ratio,
+            "messages": self.messages,
+            "bytes": self.bytes,
+            "latency": self.latency.asdict(),
+            "gap": self.gap.asdict(),
+            "lock_wait": self.lock_wait.asdict(),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.asdict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = []
+
+        def _metric(name: str, kind: str, description: str, value: float) -> None:
+            lines.extend([f"# HELP {name} {description}", f"# TYPE {name} {kind}", f"{name} {value}"])
+
+        def _histogram(name: str, description: str, summary: Summary) -> None:
+            lines.extend([f"# HELP {name} {description}", f"# TYPE {name} histogram"])
+            for bound, count in summary.cumulative():
+                lines.append(f'{name}_bucket{{le="{bound:g}"}} {count}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {summary.count}')
+            lines.append(f"{name}_sum {summary.total}")
+            lines.append(f"{name}_count {summary.count}")
+
+        _metric("mverb3_queue_depth", "gauge", "Pending param updates.", self.queue_depth())
+        _metric("mverb3_param_updates_total", "counter", "Param updates queued.", self.queued)
+        _metric("mverb3_param_updates_merged_total", "counter", "Param updates merged into newer ones.", self.merged)
+        _metric("mverb3_messages_sent_total", "counter", "Messages sent to the device.", self.messages)
+        _metric("mverb3_bytes_sent_total", "counter", "Bytes sent to the device.", self.bytes)
+        _histogram("mverb3_send_latency_seconds", "Time from a param update to the wire.", self.latency)
+        _histogram("mverb3_message_gap_seconds", "Time between consecutive messages.", self.gap)
+        _histogram("mverb3_lock_wait_seconds", "Time spent waiting for the device lock.", self.lock_wait)
+        return "\n".join(lines) + "\n"
+
+    def __str__(self) -> str:
+        return (
+            f"Queue {self.queue_depth()} | merged {self.merged}/{self.queued}"
+            f" | latency {self.latency.recent * 1000:.0f} ms | gap {self.gap.recent * 1000:.0f} ms"
+            f" | lock {self.lock_wait.recent * 1000:.1f} ms"
+        )
@@ -0,0 +1,94 @@
+"""Device message pacing measured with timed probe exchanges.
+
+The default delays come from the service guide and cover the slowest units. A probe sends messages followed by a
+bank request: the device handles MIDI input in order, so the bank dump arrives later by the time the messages kept
+it busy. Comparing it with a bare bank request gives the time each message type really needs on this unit and MIDI
+interface. The estimate is never longer than the default. Memory writes (program store and bank dumps) are not
+probed to spare the device memory, their defaults are kept.
+"""
+
+from dataclasses import dataclass, asdict, fields
+from typing import Callable, Dict, List, Optional, Sequence
+
+from mverb3.core.codec import MIDI_BYTE_TIME
+
+__all__ = ["PacingProfile", "Probe", "estimate_delay", "tune"]
+
+SAFETY_FACTOR = 1.5
+REPEATS = 3
+
+
+@dataclass
+class PacingProfile:
+    """Delays in seconds after each message type."""
+
+    param_interval: float
+    program_change_delay: float
+    buffer_dump_delay: float
+    program_store_delay: float
+    bank_dump_delay: float
+
+    def asdict(self) -> Dict[str, float]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, float], default: "PacingProfile") -> "PacingProfile":
+        """Load a stored profile, missing values are taken from the default."""
+        return cls(**{f.name: float(data.get(f.name, getattr(default, f.name))) for f in fields(cls)})
+
+
+@dataclass
+class Probe:
+    """Profile field measured by sending `count` copies of `message` before the bank request."""
+
+    field: str
+    message: Sequence[int]
+    count: int = 1
+
+
+# sends the messages back to back followed by a bank request, returns the seconds until the bank dump is received
+# or None if it hasn't arrived
+Exchange = Callable[[List[Sequence[int]]], Optional[float]]
+
+
+def estimate_delay(
+    baseline: Sequence[float], measured: Sequence[Optional[float]], message_size: int, count: int, default: float
+) -> float:
+    """Get a safe delay after a message from the bare request and the probe exchange times.
+
+    The slowest probe is compared with the fastest bare request, the difference is split between the messages and
+    multiplied by `SAFETY_FACTOR`. A lost response (the device dropped the request) keeps the default.
+    """
+    if not baseline or not measured or any(t is None for t in measured):
+        return default
+    busy = (max(measured) - min(baseline)) / count
+    delay = max(busy * SAFETY_FACTOR, message_size * MIDI_BYTE_TIME)
+    return min(delay, default)
+
+
+def tune(
+    exchange: Exchange,
+    probes: Sequence[Probe],
+    default: PacingProfile,
+    repeats: int = REPEATS,
+    progress: Callable[[int, int], None] = lambda value, total: None,
+) -> PacingProfile:
+    """Measure the probes and get the profile, the fields which are not probed keep the default values."""
+    total, step = (len(probes) + 1) * repeats, 0
+    baseline = []
+    for _ in range(repeats):
+        elapsed = exchange([])
+        if elapsed is None:
+            raise TimeoutError("the device doesn't answer bank requests")
+        baseline.append(elapsed)
+        step += 1
+        progress(step, total)
+    values = default.asdict()
+    for probe in probes:
+        measured = []
+        for _ in range(repeats):
+            measured.append(exchange([probe.message] * probe.count))
+            step += 1
+            progress(step, total)
+        values[probe.field] = estimate_delay(baseline, measured, len(probe.message), probe.count, values[probe.field])
+    return PacingProfile(**values)
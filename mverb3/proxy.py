@@ -0,0 +1,372 @@
+"""MIDI thru proxy which thins modulation streams before they reach the device.
+
+The device CPU can't keep up with dense controller streams, which results in clicks and glitches. The proxy forwards
+messages from a host input port to the device and passes them through a chain of stages. `RateLimiter` keeps the
+continuous modulation sources (volume pedal, pitch bend, mod wheel, aftertouch, sustain and breath) below a safe
+rate, dropping duplicates and merging bursts into the latest value. `MonoReducer` collapses polyphonic note input
+to a single voice for the note number and velocity modulation sources. Other messages pass through.
+
+Run standalone with `python -m mverb3.proxy`.
+"""
+
+import argparse
+from collections import deque
+from dataclasses import dataclass, field
+from threading import Condition, Thread
+from time import monotonic, sleep
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from mverb3.core.data import MODULATION_SOURCES
+
+__all__ = ["ProxyStats", "Stage", "RateLimiter", "MonoReducer", "ThruProxy", "run"]
+
+DEFAULT_RATE = 30.0  # messages per second per controller
+
+# modulation source ids, the same as the `MODULATION_SOURCES` index
+VOLUME, PITCH_BEND, MOD_WHEEL, NOTE_NUMBER, NOTE_VELOCITY, AFTER_TOUCH, SUSTAIN, BREATH = range(len(MODULATION_SOURCES))
+_CONTROLLERS = {7: VOLUME, 1: MOD_WHEEL, 64: SUSTAIN, 2: BREATH}
+NOTE_PRIORITIES = ("last", "low", "high")
+
+# (status byte, controller or note number) of a continuous stream
+StreamKey = Tuple[int, Optional[int]]
+
+
+@dataclass
+class ProxyStats:
+    received: int = 0
+    forwarded: int = 0
+    merged: int = 0  # replaced by a newer value before being sent
+    dropped: int = 0  # the same value as the last sent one
+    sources: Dict[str, int] = field(default_factory=dict)  # merged and dropped messages per modulation source
+
+    def thinned(self, source: int) -> None:
+        name = MODULATION_SOURCES[source]["name"]
+        self.sources[name] = self.sources.get(name, 0) + 1
+
+    def __str__(self) -> str:
+        return (
+            f"received {self.received}, forwarded {self.forwarded}, merged {self.merged}, dropped {self.dropped}"
+        )
+
+
+def _parse(message: bytes) -> Optional[Tuple[StreamKey, int, int]]:
+    """Get the stream key, the source and the value of a continuous controller message."""
+    status = message[0]
+    kind = status & 0xF0
+    if kind == 0xB0 and len(message) == 3 and message[1] in _CONTROLLERS:
+        return (status, message[1]), _CONTROLLERS[message[1]], message[2]
+    if kind == 0xE0 and len(message) == 3:
+        return (status, None), PITCH_BEND, message[1] | (message[2] << 7)
+    if kind == 0xD0 and len(message) == 2:
+        return (status, None), AFTER_TOUCH, message[1]
+    if kind == 0xA0 and len(message) == 3:
+        return (status, message[1]), AFTER_TOUCH, message[2]
+    return None
+
+
+def _build(key: StreamKey, value: int) -> bytes:
+    status, number = key
+    if status & 0xF0 == 0xE0:
+        return bytes((status, value & 127, value >> 7))
+    if number is None:
+        return bytes((status, value))
+    return bytes((status, number, value))
+
+
+class Stage:
+    """A proxy processing step. Stages are called from the proxy thread only."""
+
+    def __init__(self):
+        self.stats = ProxyStats()
+
+    def process(self, message: bytes, now: float) -> List[bytes]:
+        """Get the messages to forward right away."""
+        return [message]
+
+    def flush(self, now: float) -> List[bytes]:
+        """Get the delayed messages which are due."""
+        return []
+
+    def deadline(self) -> Optional[float]:
+        """Get the time of the next delayed message."""
+        return None
+
+
+class _Stream:
+    __slots__ = ("source", "sent", "sent_at", "pending")
+
+    def __init__(self, source: int):
+        self.source = source
+        self.sent: Optional[int] = None
+        self.sent_at = float("-inf")
+        self.pending: Optional[int] = None
+
+
+class RateLimiter(Stage):
+    """Limit every continuous controller stream to `rate` messages per second.
+
+    Messages arriving faster are merged, so only the latest value is sent at the end of the interval. Values equal
+    to the last sent one are dropped. With `smoothing` (0...1) the sent value moves towards the latest one in steps,
+    which softens jumps caused by the thinning, but still ends at the exact latest value.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, smoothing: float = 0.0, rates: Optional[Dict[int, float]] = None):
+        super().__init__()
+        self.rate = rate
+        self.smoothing = smoothing
+        self.rates = rates or {}  # rate overrides per modulation source
+        self._streams: Dict[StreamKey, _Stream] = {}
+
+    def interval(self, source: int) -> float:
+        return 1 / self.rates.get(source, self.rate)
+
+    def process(self, message: bytes, now: float) -> List[bytes]:
+        parsed = _parse(message)
+        if parsed is None:
+            return [message]
+        key, source, value = parsed
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = _Stream(source)
+        if stream.pending is not None:
+            stream.pending = None
+            self.stats.merged += 1
+            self.stats.thinned(source)
+        if value == stream.sent:
+            self.stats.dropped += 1
+            self.stats.thinned(source)
+            return []
+        stream.pending = value
+        if now >= stream.sent_at + self.interval(source):
+            return [self._emit(key, stream, now)]
+        return []
+
+    def flush(self, now: float) -> List[bytes]:
+        return [
+            self._emit(key, stream, now)
+            for key, stream in self._streams.items()
+            if stream.pending is not None and now >= stream.sent_at + self.interval(stream.source)
+        ]
+
+    def deadline(self) -> Optional[float]:
+        deadlines = [
+            stream.sent_at + self.interval(stream.source)
+            for stream in self._streams.values()
+            if stream.pending is not None
+        ]
+        return min(deadlines, default=None)
+
+    def _emit(self, key: StreamKey, stream: _Stream, now: float) -> bytes:
+        target = value = stream.pending
+        if self.smoothing and stream.sent is not None:
+            value = round(stream.sent + (1 - self.smoothing) * (target - stream.sent))
+            if value == stream.sent:
+                value += 1 if target > stream.sent else -1
+        stream.pending = None if value == target else target
+        stream.sent, stream.sent_at = value, now
+        return _build(key, value)
+
+
+class MonoReducer(Stage):
+    """Collapse polyphonic note input to one voice per channel.
+
+    The voice follows the held note with the `priority` (the last pressed, the lowest or the highest one). A note-on
+    is forwarded only if it changes the modulation value of `source` (`NOTE_NUMBER`, `NOTE_VELOCITY` or None for
+    both). The voice is legato, its note-off is sent once all notes are released. With `retrigger` releasing the
+    voice note returns the voice to the next held note, otherwise the value stays until a new note is played.
+    Messages pass through while the stage isn't `active`.
+    """
+
+    def __init__(self, priority: str = "last", retrigger: bool = False, source: Optional[int] = None):
+        super().__init__()
+        if priority not in NOTE_PRIORITIES:
+            raise ValueError(f"unknown note priority: {priority}")
+        self.priority = priority
+        self.retrigger = retrigger
+        self.source = source
+        self.active = True
+        self._held: Dict[int, Dict[int, int]] = {}  # channel -> held note -> velocity, in the order of pressing
+        self._voice: Dict[int, Tuple[int, int]] = {}  # channel -> sent note and velocity
+
+    def process(self, message: bytes, now: float) -> List[bytes]:
+        kind = message[0] & 0xF0
+        if not self.active:
+            self._held.clear()
+            self._voice.clear()
+            return [message]
+        if kind not in (0x80, 0x90) or len(message) != 3:
+            return [message]
+        channel, note, velocity = message[0] & 0x0F, message[1], message[2]
+        held = self._held.setdefault(channel, {})
+        voice = self._voice.get(channel)
+        if kind == 0x90 and velocity:
+            held.pop(note, None)
+            held[note] = velocity
+            if self._select(held) == note:
+                return self._play(channel, note, velocity)
+        elif held.pop(note, None) is not None and voice is not None:
+            if not held:
+                del self._voice[channel]
+                return [bytes((0x80 | channel, voice[0], 0))]
+            if self.retrigger and voice[0] == note:
+                target = self._select(held)
+                return self._play(channel, target, held[target])
+        self._drop()
+        return []
+
+    def _select(self, held: Dict[int, int]) -> int:
+        if self.priority == "low":
+            return min(held)
+        if self.priority == "high":
+            return max(held)
+        return next(reversed(held))
+
+    def _play(self, channel: int, note: int, velocity: int) -> List[bytes]:
+        voice = self._voice.get(channel)
+        if voice is not None:
+            if self.source == NOTE_NUMBER:
+                changed = voice[0] != note
+            elif self.source == NOTE_VELOCITY:
+                changed = voice[1] != velocity
+            else:
+                changed = voice != (note, velocity)
+            if not changed:
+                self._drop()
+                return []
+        self._voice[channel] = note, velocity
+        return [bytes((0x90 | channel, note, velocity))]
+
+    def _drop(self) -> None:
+        self.stats.dropped += 1
+        self.stats.thinned(NOTE_VELOCITY if self.source == NOTE_VELOCITY else NOTE_NUMBER)
+
+
+class ThruProxy:
+    """Forward MIDI input to the device through the stages.
+
+    Use an instance as the `rtmidi.MidiIn` callback. The messages are queued and processed in the thread running
+    `run`, so the callback never waits for the device output.
+    """
+
+    def __init__(self, send: Callable[[bytes], None], stages: Sequence[Stage] = ()):
+        self.stages = list(stages)
+        self.stats = ProxyStats()
+        self._send = send
+        self._cond = Condition()
+        self._inbox: Deque[Tuple[bytes, float]] = deque()
+        self._closed = False
+
+    def __call__(self, event: Tuple[List[int], float], data=None) -> None:
+        self.put(event[0])
+
+    def put(self, message: Sequence[int]) -> None:
+        with self._cond:
+            self._inbox.append((bytes(message), monotonic()))
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def report(self) -> ProxyStats:
+        """Get the proxy totals with the merged and dropped messages of all stages."""
+        stats = ProxyStats(self.stats.received, self.stats.forwarded)
+        for stage in self.stages:
+            stats.merged += stage.stats.merged
+            stats.dropped += stage.stats.dropped
+            for name, count in stage.stats.sources.items():
+                stats.sources[name] = stats.sources.get(name, 0) + count
+        return stats
+
+    def run(self) -> None:
+        """Process and forward messages until the proxy is closed."""
+        while True:
+            with self._cond:
+                while not self._inbox and not self._closed:
+                    deadline = min((d for d in (s.deadline() for s in self.stages) if d is not None), default=None)
+                    if deadline is None:
+                        self._cond.wait()
+                    elif deadline > monotonic():
+                        self._cond.wait(deadline - monotonic())
+                    else:
+                        break
+                if self._closed:
+                    return
+                inbox, self._inbox = self._inbox, deque()
+            for message, received_at in inbox:
+                self.stats.received += 1
+                self._forward(0, [message], received_at)
+            now = monotonic()
+            for n, stage in enumerate(self.stages):
+                self._forward(n + 1, stage.flush(now), now)
+
+    def _forward(self, start: int, messages: List[bytes], now: float) -> None:
+        for stage in self.stages[start:]:
+            messages = [out for message in messages for out in stage.process(message, now)]
+        for message in messages:
+            self.stats.forwarded += 1
+            self._send(message)
+
+
+def run(
+    input_name: str,
+    output_name: str,
+    rate: float = DEFAULT_RATE,
+    smoothing: float = 0.0,
+    mono: Optional[MonoReducer] = None,
+) -> ProxyStats:
+    """Run the proxy between two MIDI ports until interrupted and return the collected stats."""
+    import rtmidi
+
+    midi_in, midi_out = rtmidi.MidiIn(), rtmidi.MidiOut()
+    in_ports, out_ports = midi_in.get_ports(), midi_out.get_ports()
+    if input_name not in in_ports or output_name not in out_ports:
+        raise SystemExit(f"Unknown port, available inputs: {in_ports}, outputs: {out_ports}")
+    stages = [RateLimiter(rate, smoothing)] if mono is None else [mono, RateLimiter(rate, smoothing)]
+    proxy = ThruProxy(lambda message: midi_out.send_message(message), stages)
+    midi_out.open_port(out_ports.index(output_name))
+    midi_in.open_port(in_ports.index(input_name))
+    midi_in.ignore_types(sysex=False)
+    midi_in.set_callback(proxy)
+    thread = Thread(target=proxy.run, daemon=True)
+    thread.start()
+    print(f"Forwarding '{input_name}' to '{output_name}' at {rate:g} messages/s per controller, press Ctrl+C to stop")
+    try:
+        while True:
+            sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        midi_in.close_port()
+        proxy.close()
+        thread.join(timeout=1.0)
+        midi_out.close_port()
+    stats = proxy.report()
+    print(f"Messages: {stats}")
+    for name, count in stats.sources.items():
+        print(f"  {name}: {count} thinned")
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="mverb3.proxy", description="MIDI thru proxy for MidiVerb III")
+    parser.add_argument("input", help="host MIDI input port name")
+    parser.add_argument("output", help="device MIDI output port name")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="messages per second per controller")
+    parser.add_argument("--smoothing", type=float, default=0.0, help="0 (off) ... 1 (slowest)")
+    parser.add_argument("--mono", choices=NOTE_PRIORITIES, help="collapse notes to one voice with the priority")
+    parser.add_argument("--retrigger", action="store_true", help="return to held notes on release (with --mono)")
+    parser.add_argument(
+        "--source", choices=("number", "velocity"), help="forward notes changing only this value (with --mono)"
+    )
+    args = parser.parse_args()
+    mono = None
+    if args.mono:
+        source = {"number": NOTE_NUMBER, "velocity": NOTE_VELOCITY}.get(args.source)
+        mono = MonoReducer(args.mono, args.retrigger, source)
+    run(args.input, args.output, args.rate, args.smoothing, mono)
+
+
+if __name__ == "__main__":
+    main()
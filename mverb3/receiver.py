@@ -0,0 +1,77 @@
+from threading import Lock
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from mverb3.core.sysex import SysexSplitter
+
+__all__ = ["SysexReceiver", "SysexWaiter"]
+
+
+class SysexWaiter:
+    """Pending request for a sysex message starting with `header` and of exact `length`."""
+
+    def __init__(self, header: Sequence[int], length: int, notify: Callable[[], None]):
+        self.header = bytes(header)
+        self.length = length
+        self.message: Optional[bytes] = None
+        self.rejected = 0  # messages with the matching header but invalid length
+        self._notify = notify
+
+    @property
+    def done(self) -> bool:
+        return self.message is not None
+
+    def offer(self, message: bytes) -> bool:
+        if not message.startswith(self.header):
+            return False
+        if len(message) != self.length:
+            self.rejected += 1
+        else:
+            self.message = message
+        self._notify()
+        return self.done
+
+
+class SysexReceiver:
+    """Reassemble sysex messages from MIDI input chunks.
+
+    Use an instance as the `rtmidi.MidiIn` callback. Some USB-MIDI interfaces split long sysex messages into
+    multiple chunks, so the data is collected between 0xF0 and 0xF7, while real-time messages are dropped from it.
+    A complete message is handed to the matching waiter as soon as the closing 0xF7 arrives.
+    """
+
+    MAX_LENGTH = 65536
+
+    def __init__(self):
+        self._lock = Lock()
+        self._splitter = SysexSplitter(self.MAX_LENGTH)
+        self._waiters: List[SysexWaiter] = []
+
+    def __call__(self, event: Tuple[List[int], float], data=None) -> None:
+        self.feed(event[0])
+
+    def expect(self, header: Sequence[int], length: int, notify: Callable[[], None]) -> SysexWaiter:
+        waiter = SysexWaiter(header, length, notify)
+        with self._lock:
+            self._waiters.append(waiter)
+        return waiter
+
+    def discard(self, waiter: SysexWaiter) -> None:
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def feed(self, data: Sequence[int]) -> None:
+        chunk = bytes(data)
+        if not chunk:
+            return
+        if 0x80 <= chunk[0] < 0xF0:
+            return  # channel message (i.e. MIDI echo), not a part of sysex
+        with self._lock:
+            for message in self._splitter.feed(chunk):
+                self._dispatch(message)
+
+    def _dispatch(self, message: bytes) -> None:
+        for waiter in self._waiters:
+            if waiter.offer(message):
+                self._waiters.remove(waiter)
+                return
@@ -0,0 +1,68 @@
+from threading import Condition
+from time import monotonic
+from typing import Callable, Dict, Optional, Tuple
+
+from mverb3.metrics import TransportMetrics
+
+__all__ = ["MessageScheduler"]
+
+
+class MessageScheduler:
+    """Parameter message scheduler.
+
+    Updates are merged per param id, so only the latest value of each param is sent. The sending thread sleeps on
+    a condition until there is work and keeps at least `interval` seconds between two consecutive messages measured
+    with a monotonic clock. With `metrics` the merged updates and the time from `put` to send are recorded.
+    """
+
+    def __init__(self, send: Callable[[int, int], None], interval: float, metrics: Optional[TransportMetrics] = None):
+        self._send = send
+        self.interval = interval
+        self.metrics = metrics
+        self._cond = Condition()
+        self._pending: Dict[int, Tuple[int, float]] = {}  # param id -> value and the time it was put
+        self._next_send_at = 0.0
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, param_id: int, value: int) -> None:
+        with self._cond:
+            if self.metrics:
+                self.metrics.queued += 1
+                if param_id in self._pending:
+                    self.metrics.merged += 1
+            self._pending[param_id] = value, monotonic()
+            self._cond.notify()
+
+    def clear(self) -> None:
+        with self._cond:
+            self._pending.clear()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def run(self) -> None:
+        """Send pending messages until the scheduler is closed."""
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._pending:
+                        delay = self._next_send_at - monotonic()
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+                param_id = next(iter(self._pending))
+                value, put_at = self._pending.pop(param_id)
+            self._send(param_id, value)
+            if self.metrics:
+                self.metrics.latency.observe(monotonic() - put_at)
+            with self._cond:
+                self._next_send_at = monotonic() + self.interval
@@ -0,0 +1,180 @@
+"""Content-addressed store of MidiVerb III bank versions.
+
+Each 32-byte program dump is stored once under its hash, and so are the bank settings with the program map table
+(the bank tail). A bank version (snapshot) is the list of its 101 program ids (100 slots and the edit buffer) and the
+tail id, so saving a bank with a few changed programs costs a few hundred bytes and snapshots can be compared without
+decoding them.
+"""
+
+import hashlib
+import sqlite3
+import time
+from array import array
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Union
+
+from mverb3.core import codec
+from mverb3.core.model import PROG_NUM
+
+__all__ = ["ProgramStore", "Snapshot"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    id INTEGER PRIMARY KEY,
+    hash BLOB NOT NULL UNIQUE,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    created REAL NOT NULL,
+    programs BLOB NOT NULL,
+    tail INTEGER NOT NULL REFERENCES objects (id)
+);
+CREATE INDEX IF NOT EXISTS snapshots_name ON snapshots (name, id);
+"""
+
+_BODY = len(codec.HEADER) + 1  # bank body offset inside a bank dump message
+_TAIL = codec.BANK_SETTINGS_OFFSET  # settings and program map table offset inside the body
+
+
+class Snapshot(NamedTuple):
+    id: int
+    name: str
+    created: float
+    programs: array  # program ids, the edit buffer is the last one
+
+
+def _hash(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class ProgramStore:
+    """Bank snapshots with deduplicated programs stored in a SQLite database.
+
+    Snapshots are grouped by name, which is usually the bank file path.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self._db = sqlite3.connect(str(path))
+        self._db.executescript(_SCHEMA)
+        self._ids = {}  # object hash -> id cache
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "ProgramStore":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def put(self, data: codec.Buffer) -> int:
+        """Store a program dump (as returned by `Device.dump_program_to_bin`) or a bank tail and get its id."""
+        data = bytes(data)
+        key = _hash(data)
+        object_id = self._ids.get(key)
+        if object_id is None:
+            row = self._db.execute("SELECT id FROM objects WHERE hash = ?", (key,)).fetchone()
+            if row is None:
+                object_id = self._db.execute("INSERT INTO objects (hash, data) VALUES (?, ?)", (key, data)).lastrowid
+            else:
+                object_id = row[0]
+            self._ids[key] = object_id
+        return object_id
+
+    def get(self, object_id: int) -> bytes:
+        return self._db.execute("SELECT data FROM objects WHERE id = ?", (object_id,)).fetchone()[0]
+
+    def commit(self, name: str, message: codec.Buffer) -> int:
+        """Store a bank dump message as a new snapshot and get its id.
+
+        If the bank hasn't changed since the latest snapshot with the same name, the latest snapshot id is returned.
+        """
+        if codec.check_message(message) != 0x00:
+            raise ValueError("not a MidiVerb III bank")
+        body = memoryview(bytes(message))[_BODY:-1]
+        try:
+            with self._db:
+                programs = array(
+                    "I",
+                    (
+                        self.put(body[n * codec.PROG_SIZE : (n + 1) * codec.PROG_SIZE])
+                        for n in range(PROG_NUM + 1)
+                    ),
+                )
+                tail = self.put(body[_TAIL:])
+                latest = self._db.execute(
+                    "SELECT id, programs, tail FROM snapshots WHERE name = ? ORDER BY id DESC LIMIT 1", (name,)
+                ).fetchone()
+                if latest is not None and latest[1] == programs.tobytes() and latest[2] == tail:
+                    return latest[0]
+                return self._db.execute(
+                    "INSERT INTO snapshots (name, created, programs, tail) VALUES (?, ?, ?, ?)",
+                    (name, time.time(), programs.tobytes(), tail),
+                ).lastrowid
+        except sqlite3.Error:
+            self._ids.clear()  # the inserted objects are rolled back
+            raise
+
+    def history(self, name: Optional[str] = None) -> List[Snapshot]:
+        """Get snapshots (all or with the given name) from the oldest to the newest."""
+        sql = "SELECT id, name, created, programs FROM snapshots"
+        args = ()
+        if name is not None:
+            sql += " WHERE name = ?"
+            args = (name,)
+        return [self._snapshot(row) for row in self._db.execute(sql + " ORDER BY id", args)]
+
+    def snapshot(self, snapshot_id: int) -> Snapshot:
+        row = self._db.execute(
+            "SELECT id, name, created, programs FROM snapshots WHERE id = ?", (snapshot_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(snapshot_id)
+        return self._snapshot(row)
+
+    def previous(self, name: str, message: codec.Buffer) -> Optional[Snapshot]:
+        """Get the newest snapshot with the name and the content different from the bank dump message.
+
+        The message itself is stored as a snapshot first, so rolling back to the previous version can be undone.
+        """
+        current = self.commit(name, message)
+        row = self._db.execute(
+            "SELECT s.id, s.name, s.created, s.programs FROM snapshots s, snapshots c "
+            "WHERE c.id = ? AND s.name = c.name AND s.id < c.id AND (s.programs != c.programs OR s.tail != c.tail) "
+            "ORDER BY s.id DESC LIMIT 1",
+            (current,),
+        ).fetchone()
+        return self._snapshot(row) if row else None
+
+    def diff(self, old_id: int, new_id: int) -> List[int]:
+        """Get the slots which differ between two snapshots. `PROG_NUM` is the edit buffer."""
+        old, new = self.snapshot(old_id).programs, self.snapshot(new_id).programs
+        return [n for n, (a, b) in enumerate(zip(old, new)) if a != b]
+
+    def load(self, snapshot_id: int) -> bytearray:
+        """Restore the bank dump message of a snapshot."""
+        row = self._db.execute("SELECT programs, tail FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+        if row is None:
+            raise KeyError(snapshot_id)
+        programs = array("I")
+        programs.frombytes(row[0])
+        ids = {*programs, row[1]}
+        data = dict(
+            self._db.execute(f"SELECT id, data FROM objects WHERE id IN ({', '.join('?' * len(ids))})", tuple(ids))
+        )
+        message = bytearray(codec.BANK_MESSAGE_SIZE)
+        message[:_BODY] = bytes((*codec.HEADER, 0x00))
+        for n, program_id in enumerate(programs):
+            offset = _BODY + n * codec.PROG_SIZE
+            message[offset : offset + codec.PROG_SIZE] = data[program_id]
+        message[_BODY + _TAIL : -1] = data[row[1]]
+        message[-1] = 0xF7
+        return message
+
+    @staticmethod
+    def _snapshot(row: tuple) -> Snapshot:
+        programs = array("I")
+        programs.frombytes(row[3])
+        return Snapshot(row[0], row[1], row[2], programs)
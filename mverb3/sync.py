@@ -0,0 +1,74 @@
+from typing import List, Optional, Sequence, Tuple
+
+from mverb3.core.codec import MIDI_BYTE_TIME
+from mverb3.core.model import PROGRAM_FIELDS as PROGRAM_PARAMS, Program
+
+__all__ = ["PROGRAM_PARAMS", "DeviceState", "diff_programs", "plan_program_update"]
+
+PARAM_MESSAGE_SIZE = 9
+PROGRAM_MESSAGE_SIZE = 40
+
+
+# the configuration sets the dly_time range, so it must reach the device before the other params
+_SEND_ORDER = (
+    PROGRAM_PARAMS.index("configuration"),
+    *(param_id for param_id, name in enumerate(PROGRAM_PARAMS) if name != "configuration"),
+)
+
+
+def diff_programs(current: Program, target: Program) -> List[Tuple[int, int]]:
+    """Get (param id, value) pairs which differ between two programs in the order they must be sent.
+
+    The configuration goes first, then the other params in the param id order.
+    """
+    old_values, new_values = current.values(), target.values()
+    return [
+        (param_id, new_values[param_id])
+        for param_id in _SEND_ORDER
+        if old_values[param_id] != new_values[param_id]
+    ]
+
+
+def plan_program_update(
+    current: Optional[Program], target: Program, param_interval: float, buffer_delay: float
+) -> Optional[List[Tuple[int, int]]]:
+    """Get param messages required to turn the current device buffer into the target program.
+
+    Returns `None` if the current buffer is unknown or a full program dump is faster than sending the params.
+    """
+    if current is None:
+        return None
+    params = diff_programs(current, target)
+    params_time = len(params) * (PARAM_MESSAGE_SIZE * MIDI_BYTE_TIME + param_interval)
+    dump_time = PROGRAM_MESSAGE_SIZE * MIDI_BYTE_TIME + buffer_delay
+    if params_time > dump_time:
+        return None
+    return params
+
+
+class DeviceState:
+    """What is known about the device memory.
+
+    `buffer` is the program currently in the device edit buffer, `slots` are the programs stored in the device
+    memory. `None` means the content is unknown. The programs must be detached copies, not bank views.
+    """
+
+    def __init__(self, size: int):
+        self.buffer: Optional[Program] = None
+        self.slots: List[Optional[Program]] = [None] * size
+
+    def load_slot(self, program_id: int) -> None:
+        """The device loads the stored program into the buffer on program change."""
+        stored = self.slots[program_id]
+        self.buffer = stored.copy() if stored is not None else None
+
+    def set_param(self, param_id: int, value: int) -> None:
+        if self.buffer is not None:
+            setattr(self.buffer, PROGRAM_PARAMS[param_id], value)
+
+    def changed_slots(self, programs: Sequence[Program]) -> List[int]:
+        """Get ids of the programs which differ from the ones last confirmed on the device."""
+        return [n for n, (stored, program) in enumerate(zip(self.slots, programs)) if stored != program]
+
+    def invalidate(self) -> None:
+        self.buffer = None
@@ -0,0 +1,199 @@
+"""Binary MIDI trace of the messages sent to and received from the device.
+
+Messages are recorded with monotonic timestamps into an in-memory ring buffer, which is written to disk by a
+background thread, so tracing doesn't slow down the MIDI threads. If the writer falls behind, the oldest records are
+overwritten and counted as lost. A recorded trace can be replayed into a MIDI port at the original speed (or scaled)
+or as fast as possible to reproduce timing issues and compare transport changes on real sessions.
+
+Run `python -m mverb3.trace` to show or replay a trace.
+"""
+
+import argparse
+import struct
+from collections import deque
+from pathlib import Path
+from threading import Condition
+from time import monotonic, monotonic_ns, sleep
+from typing import BinaryIO, Callable, Deque, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+__all__ = ["SENT", "RECEIVED", "TraceEvent", "TraceRecorder", "ReplayStats", "read_trace", "replay"]
+
+SENT = 0
+RECEIVED = 1
+DEFAULT_CAPACITY = 1 << 16  # records
+FLUSH_INTERVAL = 0.5  # seconds
+
+_MAGIC = b"MV3TRACE"
+_VERSION = 1
+_HEADER = struct.Struct("<8sB")
+_RECORD = struct.Struct("<QBH")  # nanoseconds since the trace start, direction, message length
+
+FilePath = Union[str, Path]
+
+
+class TraceEvent(NamedTuple):
+    time: float  # seconds since the trace start
+    direction: int
+    message: bytes
+
+
+class TraceRecorder:
+    """Record MIDI messages to a trace file.
+
+    `record` is safe to call from any thread, the file is written by the thread running `run`.
+    """
+
+    def __init__(self, path: FilePath, capacity: int = DEFAULT_CAPACITY, flush_interval: float = FLUSH_INTERVAL):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self.lost = 0  # records overwritten before they were written
+        self._cond = Condition()
+        self._ring: Deque[Tuple[int, int, bytes]] = deque(maxlen=capacity)
+        self._started_at = monotonic_ns()
+        self._closed = False
+
+    def record(self, direction: int, message: Sequence[int]) -> None:
+        with self._cond:
+            if len(self._ring) == self._ring.maxlen:
+                self.lost += 1
+            self._ring.append((monotonic_ns(), direction, bytes(message)))
+            self.recorded += 1
+            if len(self._ring) * 2 >= self._ring.maxlen:
+                self._cond.notify()
+
+    def tap(self, callback: Callable) -> Callable:
+        """Wrap an `rtmidi.MidiIn` callback to record the received messages."""
+
+        def _callback(event: Tuple[List[int], float], data=None) -> None:
+            self.record(RECEIVED, event[0])
+            callback(event, data)
+
+        return _callback
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def run(self) -> None:
+        """Write the recorded messages to the file until the recorder is closed."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION))
+            while True:
+                with self._cond:
+                    if not self._closed:
+                        self._cond.wait(self.flush_interval)
+                    records, closed = list(self._ring), self._closed
+                    self._ring.clear()
+                self._write(f, records)
+                if closed:
+                    return
+
+    def _write(self, f: BinaryIO, records: List[Tuple[int, int, bytes]]) -> None:
+        if not records:
+            return
+        data = bytearray()
+        for timestamp, direction, message in records:
+            data += _RECORD.pack(timestamp - self._started_at, direction, len(message))
+            data += message
+        f.write(data)
+        f.flush()
+
+
+def read_trace(fp: FilePath) -> Iterator[TraceEvent]:
+    with open(fp, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size or _HEADER.unpack(header) != (_MAGIC, _VERSION):
+            raise ValueError("not a MidiVerb III trace")
+        while True:
+            record = f.read(_RECORD.size)
+            if len(record) < _RECORD.size:
+                return  # the last record may be cut if the app was killed
+            timestamp, direction, length = _RECORD.unpack(record)
+            message = f.read(length)
+            if len(message) < length:
+                return
+            yield TraceEvent(timestamp / 1e9, direction, message)
+
+
+class ReplayStats(NamedTuple):
+    messages: int
+    duration: float  # seconds
+    max_lateness: float  # the largest delay of a message behind its scheduled time, seconds
+
+
+def replay(
+    events: Iterable[TraceEvent], send: Callable[[bytes], None], speed: Optional[float] = 1.0, direction: int = SENT
+) -> ReplayStats:
+    """Send the trace messages in the given direction keeping their timing scaled by `speed`.
+
+    With `speed` set to None the messages are sent as fast as possible.
+    """
+    messages, max_lateness = 0, 0.0
+    first: Optional[float] = None
+    started_at = monotonic()
+    for event in events:
+        if event.direction != direction:
+            continue
+        if speed is not None:
+            if first is None:
+                first = event.time
+            due = started_at + (event.time - first) / speed
+            delay = due - monotonic()
+            if delay > 0:
+                sleep(delay)
+            max_lateness = max(max_lateness, monotonic() - due)
+        send(event.message)
+        messages += 1
+    return ReplayStats(messages, monotonic() - started_at, max_lateness)
+
+
+def _show(args: argparse.Namespace) -> None:
+    for event in read_trace(args.trace):
+        arrow = ">" if event.direction == SENT else "<"
+        print(f"{event.time:12.6f} {arrow} {event.message.hex(' ')}")
+
+
+def _replay(args: argparse.Namespace) -> None:
+    import rtmidi
+
+    midi_out = rtmidi.MidiOut()
+    ports = midi_out.get_ports()
+    if args.port not in ports:
+        raise SystemExit(f"Unknown port, available outputs: {ports}")
+    midi_out.open_port(ports.index(args.port))
+    try:
+        stats = replay(
+            read_trace(args.trace),
+            lambda message: midi_out.send_message(message),
+            None if args.fast else args.speed,
+            RECEIVED if args.received else SENT,
+        )
+    finally:
+        midi_out.close_port()
+    print(f"Messages: {stats.messages}")
+    print(f"Duration: {stats.duration:.3f} s")
+    print(f"Max lateness: {stats.max_lateness * 1000:.1f} ms")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="mverb3.trace", description="MidiVerb III MIDI trace tool")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="print the trace messages")
+    show.add_argument("trace")
+    show.set_defaults(func=_show)
+    play = commands.add_parser("replay", help="send the trace messages to a MIDI port")
+    play.add_argument("trace")
+    play.add_argument("port", help="MIDI output port name")
+    play.add_argument("--speed", type=float, default=1.0, help="timing scale, 2 is twice as fast")
+    play.add_argument("--fast", action="store_true", help="send as fast as possible")
+    play.add_argument("--received", action="store_true", help="replay the received messages instead of the sent")
+    play.set_defaults(func=_replay)
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+from collections import deque
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Deque, Optional, Sequence, Union
+
+from PySide6.QtCore import QObject, Qt, Signal
+
+__all__ = ["Transport", "Transfer", "TransferError", "TransferCancelled"]
+
+
+class TransferError(Exception):
+    """Transfer has failed. The message is shown to the user."""
+
+
+class TransferCancelled(Exception):
+    """Transfer has been cancelled by the user."""
+
+
+class Transfer:
+    """A single background device operation.
+
+    `func` receives the transfer itself and may use `send`, `wait` and `progress` to talk to the device.
+    The return value is passed to `on_done` in the GUI thread.
+    """
+
+    REPORT_INTERVAL = 0.1
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[["Transfer"], Any],
+        on_done: Optional[Callable[[Any], None]],
+        transport: "Transport",
+    ):
+        self.name = name
+        self.func = func
+        self.on_done = on_done
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self._transport = transport
+        self._cond = Condition()
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def wake(self) -> None:
+        """Wake up the transfer waiting in `wait_for`. May be called from any thread."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def check(self) -> None:
+        if self._cancelled:
+            raise TransferCancelled(self.name)
+
+    def wait_for(self, predicate: Callable[[], bool], timeout: float) -> bool:
+        """Wait until `predicate` is true, the transfer is cancelled or the timeout expires.
+
+        The predicate is checked each time `wake` is called.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._cancelled or predicate(), timeout)
+        self.check()
+        return predicate()
+
+    def wait(self, timeout: float, report: bool = False) -> None:
+        """Sleep for `timeout` seconds or until the transfer is cancelled.
+
+        If `report` is set, the waiting is reported as progress, which is useful for long device timeouts.
+        """
+        if not report:
+            self.wait_for(lambda: False, timeout)
+            return
+        total = max(1, int(timeout / self.REPORT_INTERVAL))
+        for step in range(total):
+            self.progress(step, total)
+            self.wait_for(lambda: False, timeout / total)
+        self.progress(total, total)
+
+    def send(self, message: Sequence[Union[bytes, int]], delay: float = 0.0, report: bool = False) -> None:
+        """Send a message and keep the device lock for `delay` seconds so nothing else can interrupt the device."""
+        with self._transport.lock:
+            self.check()
+            self._transport.send(message)
+            if delay:
+                self.wait(delay, report=report)
+
+    def progress(self, value: int, total: int) -> None:
+        self._transport._progress.emit(self.name, value, total)
+
+
+class Transport(QObject):
+    """Run device operations one by one in a background thread.
+
+    Operations are reported to the GUI thread through Qt signals, so the window is never blocked by the device
+    timing rules.
+    """
+
+    started = Signal(str)
+    progress = Signal(str, int, int)
+    finished = Signal(str)
+    failed = Signal(str, str)
+    cancelled = Signal(str)
+    _started = Signal(str)
+    _progress = Signal(str, int, int)
+    _done = Signal(object)
+
+    def __init__(self, lock: Lock, send: Callable[[Sequence[Union[bytes, int]]], None], parent=None):
+        super().__init__(parent)
+        self.lock = lock
+        self.send = send
+        self._cond = Condition()
+        self._jobs: Deque[Transfer] = deque()
+        self._current: Optional[Transfer] = None
+        self._closed = False
+        self._thread = Thread(target=self._run, daemon=True)
+        # the worker thread emits the private signals, the public ones are re-emitted in the GUI thread
+        self._started.connect(self.started, Qt.ConnectionType.QueuedConnection)
+        self._progress.connect(self.progress, Qt.ConnectionType.QueuedConnection)
+        self._done.connect(self._on_done, Qt.ConnectionType.QueuedConnection)
+        self._thread.start()
+
+    @property
+    def busy(self) -> bool:
+        with self._cond:
+            return self._current is not None or bool(self._jobs)
+
+    def submit(
+        self,
+        name: str,
+        func: Callable[[Transfer], Any],
+        on_done: Optional[Callable[[Any], None]] = None,
+        replace: bool = False,
+    ) -> Transfer:
+        """Schedule an operation.
+
+        If `replace` is set, pending operations with the same name are dropped, i.e. only the latest program
+        change is sent when the user scrolls through programs faster than the device can follow.
+        """
+        transfer = Transfer(name, func, on_done, self)
+        with self._cond:
+            if replace:
+                self._jobs = deque(job for job in self._jobs if job.name != name)
+            self._jobs.append(transfer)
+            self._cond.notify()
+        return transfer
+
+    def cancel(self) -> None:
+        """Cancel the running operation and drop all pending ones."""
+        with self._cond:
+            dropped, self._jobs = list(self._jobs), deque()
+            if self._current:
+                self._current.cancel()
+        for job in dropped:
+            self.cancelled.emit(job.name)
+
+    def close(self) -> None:
+        self.cancel()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._jobs and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                job = self._current = self._jobs.popleft()
+            self._started.emit(job.name)
+            try:
+                job.result = job.func(job)
+            except TransferCancelled:
+                job.cancel()
+            except TransferError as exc:
+                job.error = str(exc)
+            except Exception as exc:  # noqa
+                job.error = f"{type(exc).__name__}: {exc}"
+            with self._cond:
+                self._current = None
+            self._done.emit(job)
+
+    def _on_done(self, job: Transfer) -> None:
+        if job.cancelled:
+            self.cancelled.emit(job.name)
+        elif job.error is not None:
+            self.failed.emit(job.name, job.error)
+        else:
+            if job.on_done:
+                job.on_done(job.result)
+            self.finished.emit(job.name)
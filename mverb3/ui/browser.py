@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+################################################################################
+## Form generated from reading UI file 'browser.ui'
+##
+## Created by: Qt User Interface Compiler version 6.8.1
+##
+## WARNING! All changes made in this file will be lost when recompiling UI file!
+################################################################################
+
+from PySide6.QtCore import (
+    QCoreApplication,
+    QLocale,
+    QMetaObject,
+    QRect,
+    QSize,
+    Qt,
+)
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QDialog,
+    QDialogButtonBox,
+    QLineEdit,
+    QTableView,
+)
+
+
+class Ui_BrowserDialog(object):
+    def setupUi(self, BrowserDialog):
+        if not BrowserDialog.objectName():
+            BrowserDialog.setObjectName("BrowserDialog")
+        BrowserDialog.resize(560, 420)
+        BrowserDialog.setMinimumSize(QSize(560, 420))
+        BrowserDialog.setMaximumSize(QSize(560, 420))
+        BrowserDialog.setLocale(QLocale(QLocale.English, QLocale.UnitedKingdom))
+        self.FILTER = QLineEdit(BrowserDialog)
+        self.FILTER.setObjectName("FILTER")
+        self.FILTER.setGeometry(QRect(10, 10, 540, 24))
+        self.FILTER.setClearButtonEnabled(True)
+        self.PROGRAMS = QTableView(BrowserDialog)
+        self.PROGRAMS.setObjectName("PROGRAMS")
+        self.PROGRAMS.setGeometry(QRect(10, 40, 540, 330))
+        self.PROGRAMS.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.PROGRAMS.setAlternatingRowColors(True)
+        self.PROGRAMS.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.PROGRAMS.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.PROGRAMS.setSortingEnabled(True)
+        self.PROGRAMS.verticalHeader().setVisible(False)
+        self.PROGRAMS.horizontalHeader().setStretchLastSection(True)
+        self.buttonBox = QDialogButtonBox(BrowserDialog)
+        self.buttonBox.setObjectName("buttonBox")
+        self.buttonBox.setGeometry(QRect(10, 380, 540, 32))
+        self.buttonBox.setOrientation(Qt.Orientation.Horizontal)
+        self.buttonBox.setStandardButtons(
+            QDialogButtonBox.StandardButton.Close | QDialogButtonBox.StandardButton.Open
+        )
+
+        self.retranslateUi(BrowserDialog)
+        self.buttonBox.rejected.connect(BrowserDialog.reject)
+
+        QMetaObject.connectSlotsByName(BrowserDialog)
+
+    # setupUi
+
+    def retranslateUi(self, BrowserDialog):
+        BrowserDialog.setWindowTitle(
+            QCoreApplication.translate("BrowserDialog", "Programs", None)
+        )
+        self.FILTER.setPlaceholderText(
+            QCoreApplication.translate("BrowserDialog", "Filter by name, number or algorithm (i.e. PL4)", None)
+        )
+
+    # retranslateUi
@@ -92,6 +92,41 @@ class Ui_UIMainWindow(object):
         self.actionHelp.setIcon(icon8)
         self.actionDeviceRequestBank = QAction(UIMainWindow)
         self.actionDeviceRequestBank.setObjectName(u"actionDeviceRequestBank")
+        self.actionDeviceStoreChanges = QAction(UIMainWindow)
+        self.actionDeviceStoreChanges.setObjectName(u"actionDeviceStoreChanges")
+        self.actionDeviceStoreChanges.setIcon(icon7)
+        self.actionDeviceCancel = QAction(UIMainWindow)
+        self.actionDeviceCancel.setObjectName(u"actionDeviceCancel")
+        self.actionBankRevert = QAction(UIMainWindow)
+        self.actionBankRevert.setObjectName(u"actionBankRevert")
+        icon9 = QIcon(QIcon.fromTheme(u"QIcon::ThemeIcon::DocumentRevert"))
+        self.actionBankRevert.setIcon(icon9)
+        self.actionBankExportMidi = QAction(UIMainWindow)
+        self.actionBankExportMidi.setObjectName(u"actionBankExportMidi")
+        self.actionDeviceTuneTiming = QAction(UIMainWindow)
+        self.actionDeviceTuneTiming.setObjectName(u"actionDeviceTuneTiming")
+        self.actionDeviceResetTiming = QAction(UIMainWindow)
+        self.actionDeviceResetTiming.setObjectName(u"actionDeviceResetTiming")
+        self.actionDeviceExportMetrics = QAction(UIMainWindow)
+        self.actionDeviceExportMetrics.setObjectName(u"actionDeviceExportMetrics")
+        self.actionBrowsePrograms = QAction(UIMainWindow)
+        self.actionBrowsePrograms.setObjectName(u"actionBrowsePrograms")
+        self.actionUndo = QAction(UIMainWindow)
+        self.actionUndo.setObjectName(u"actionUndo")
+        self.actionUndo.setEnabled(False)
+        self.actionRedo = QAction(UIMainWindow)
+        self.actionRedo.setObjectName(u"actionRedo")
+        self.actionRedo.setEnabled(False)
+        self.actionCompareA = QAction(UIMainWindow)
+        self.actionCompareA.setObjectName(u"actionCompareA")
+        self.actionCompareB = QAction(UIMainWindow)
+        self.actionCompareB.setObjectName(u"actionCompareB")
+        self.actionCompareC = QAction(UIMainWindow)
+        self.actionCompareC.setObjectName(u"actionCompareC")
+        self.actionCompareD = QAction(UIMainWindow)
+        self.actionCompareD.setObjectName(u"actionCompareD")
+        self.actionCompareToggle = QAction(UIMainWindow)
+        self.actionCompareToggle.setObjectName(u"actionCompareToggle")
         self.centralwidget = QWidget(UIMainWindow)
         self.centralwidget.setObjectName(u"centralwidget")
         self.CONFIGURATION = QComboBox(self.centralwidget)
@@ -479,26 +514,46 @@ class Ui_UIMainWindow(object):
         self.menubar.setGeometry(QRect(0, 0, 800, 37))
         self.menuFile = QMenu(self.menubar)
         self.menuFile.setObjectName(u"menuFile")
+        self.menuEdit = QMenu(self.menubar)
+        self.menuEdit.setObjectName(u"menuEdit")
         self.menuDevice = QMenu(self.menubar)
         self.menuDevice.setObjectName(u"menuDevice")
         UIMainWindow.setMenuBar(self.menubar)
 
         self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuEdit.menuAction())
         self.menubar.addAction(self.menuDevice.menuAction())
         self.menuFile.addAction(self.actionNew)
         self.menuFile.addAction(self.actionImport)
+        self.menuFile.addAction(self.actionBrowsePrograms)
         self.menuFile.addAction(self.actionBankSave)
+        self.menuFile.addAction(self.actionBankRevert)
         self.menuFile.addAction(self.actionBankExport)
+        self.menuFile.addAction(self.actionBankExportMidi)
         self.menuFile.addAction(self.actionBufferExport)
         self.menuFile.addSeparator()
         self.menuFile.addAction(self.actionSettings)
         self.menuFile.addAction(self.actionHelp)
         self.menuFile.addAction(self.actionAbout)
         self.menuFile.addAction(self.actionQuit)
+        self.menuEdit.addAction(self.actionUndo)
+        self.menuEdit.addAction(self.actionRedo)
+        self.menuEdit.addSeparator()
+        self.menuEdit.addAction(self.actionCompareA)
+        self.menuEdit.addAction(self.actionCompareB)
+        self.menuEdit.addAction(self.actionCompareC)
+        self.menuEdit.addAction(self.actionCompareD)
+        self.menuEdit.addAction(self.actionCompareToggle)
         self.menuDevice.addSeparator()
         self.menuDevice.addAction(self.actionStoreProgram)
         self.menuDevice.addAction(self.actionDeviceStoreBank)
+        self.menuDevice.addAction(self.actionDeviceStoreChanges)
         self.menuDevice.addAction(self.actionDeviceRequestBank)
+        self.menuDevice.addAction(self.actionDeviceTuneTiming)
+        self.menuDevice.addAction(self.actionDeviceResetTiming)
+        self.menuDevice.addSeparator()
+        self.menuDevice.addAction(self.actionDeviceCancel)
+        self.menuDevice.addAction(self.actionDeviceExportMetrics)
 
         self.retranslateUi(UIMainWindow)
 
@@ -557,6 +612,93 @@ class Ui_UIMainWindow(object):
         self.actionDeviceRequestBank.setText(QCoreApplication.translate("UIMainWindow", u"Request Bank", None))
 #if QT_CONFIG(tooltip)
         self.actionDeviceRequestBank.setToolTip(QCoreApplication.translate("UIMainWindow", u"Request a bank dump from the device and overwrite the current bank (may take up to 10 sec)", None))
+#endif // QT_CONFIG(tooltip)
+        self.actionDeviceStoreChanges.setText(QCoreApplication.translate("UIMainWindow", u"Store Changes", None))
+#if QT_CONFIG(tooltip)
+        self.actionDeviceStoreChanges.setToolTip(QCoreApplication.translate("UIMainWindow", u"Store only the programs changed since the last device sync", None))
+#endif // QT_CONFIG(tooltip)
+        self.actionDeviceCancel.setText(QCoreApplication.translate("UIMainWindow", u"Cancel Transfer", None))
+#if QT_CONFIG(tooltip)
+        self.actionDeviceCancel.setToolTip(QCoreApplication.translate("UIMainWindow", u"Cancel the running device operation and all pending ones", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(shortcut)
+        self.actionDeviceCancel.setShortcut(QCoreApplication.translate("UIMainWindow", u"Esc", None))
+#endif // QT_CONFIG(shortcut)
+        self.actionBankRevert.setText(QCoreApplication.translate("UIMainWindow", u"Revert Bank", None))
+#if QT_CONFIG(tooltip)
+        self.actionBankRevert.setToolTip(QCoreApplication.translate("UIMainWindow", u"Restore the previously saved version of the current bank", None))
+#endif // QT_CONFIG(tooltip)
+        self.actionBankExportMidi.setText(QCoreApplication.translate("UIMainWindow", u"Export MIDI File", None))
+#if QT_CONFIG(tooltip)
+        self.actionBankExportMidi.setToolTip(QCoreApplication.translate("UIMainWindow", u"Save the bank and the buffer to a MIDI file which restores the device when played", None))
+#endif // QT_CONFIG(tooltip)
+        self.actionBrowsePrograms.setText(QCoreApplication.translate("UIMainWindow", u"Browse Programs", None))
+#if QT_CONFIG(tooltip)
+        self.actionBrowsePrograms.setToolTip(QCoreApplication.translate("UIMainWindow", u"Show all the bank programs in a table", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(shortcut)
+        self.actionBrowsePrograms.setShortcut(QCoreApplication.translate("UIMainWindow", u"Ctrl+B", None))
+#endif // QT_CONFIG(shortcut)
+        self.actionUndo.setText(QCoreApplication.translate("UIMainWindow", u"Undo", None))
+#if QT_CONFIG(tooltip)
+        self.actionUndo.setToolTip(QCoreApplication.translate("UIMainWindow", u"Revert the last edit buffer change", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(shortcut)
+        self.actionUndo.setShortcut(QCoreApplication.translate("UIMainWindow", u"Ctrl+Z", None))
+#endif // QT_CONFIG(shortcut)
+        self.actionRedo.setText(QCoreApplication.translate("UIMainWindow", u"Redo", None))
+#if QT_CONFIG(tooltip)
+        self.actionRedo.setToolTip(QCoreApplication.translate("UIMainWindow", u"Apply the last undone change again", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(shortcut)
+        self.actionRedo.setShortcut(QCoreApplication.translate("UIMainWindow", u"Ctrl+Shift+Z", None))
+#endif // QT_CONFIG(shortcut)
+        self.actionCompareA.setText(QCoreApplication.translate("UIMainWindow", u"Compare A", None))
+#if QT_CONFIG(tooltip)
+        self.actionCompareA.setToolTip(QCoreApplication.translate("UIMainWindow", u"Keep the buffer in the compare slot A or load the slot", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(shortcut)
+        self.actionCompareA.setShortcut(QCoreApplication.translate("UIMainWindow", u"Ctrl+1", None))
+#endif // QT_CONFIG(shortcut)
+        self.actionCompareB.setText(QCoreApplication.translate("UIMainWindow", u"Compare B", None))
+#if QT_CONFIG(tooltip)
+        self.actionCompareB.setToolTip(QCoreApplication.translate("UIMainWindow", u"Keep the buffer in the compare slot B or load the slot", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(shortcut)
+        self.actionCompareB.setShortcut(QCoreApplication.translate("UIMainWindow", u"Ctrl+2", None))
+#endif // QT_CONFIG(shortcut)
+        self.actionCompareC.setText(QCoreApplication.translate("UIMainWindow", u"Compare C", None))
+#if QT_CONFIG(tooltip)
+        self.actionCompareC.setToolTip(QCoreApplication.translate("UIMainWindow", u"Keep the buffer in the compare slot C or load the slot", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(shortcut)
+        self.actionCompareC.setShortcut(QCoreApplication.translate("UIMainWindow", u"Ctrl+3", None))
+#endif // QT_CONFIG(shortcut)
+        self.actionCompareD.setText(QCoreApplication.translate("UIMainWindow", u"Compare D", None))
+#if QT_CONFIG(tooltip)
+        self.actionCompareD.setToolTip(QCoreApplication.translate("UIMainWindow", u"Keep the buffer in the compare slot D or load the slot", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(shortcut)
+        self.actionCompareD.setShortcut(QCoreApplication.translate("UIMainWindow", u"Ctrl+4", None))
+#endif // QT_CONFIG(shortcut)
+        self.actionCompareToggle.setText(QCoreApplication.translate("UIMainWindow", u"Toggle Compare", None))
+#if QT_CONFIG(tooltip)
+        self.actionCompareToggle.setToolTip(QCoreApplication.translate("UIMainWindow", u"Flip between the last two compare slots", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(shortcut)
+        self.actionCompareToggle.setShortcut(QCoreApplication.translate("UIMainWindow", u"Ctrl+T", None))
+#endif // QT_CONFIG(shortcut)
+        self.actionDeviceTuneTiming.setText(QCoreApplication.translate("UIMainWindow", u"Tune Timing", None))
+#if QT_CONFIG(tooltip)
+        self.actionDeviceTuneTiming.setToolTip(QCoreApplication.translate("UIMainWindow", u"Measure how fast the device accepts messages and use the shortest safe delays", None))
+#endif // QT_CONFIG(tooltip)
+        self.actionDeviceResetTiming.setText(QCoreApplication.translate("UIMainWindow", u"Reset Timing", None))
+#if QT_CONFIG(tooltip)
+        self.actionDeviceResetTiming.setToolTip(QCoreApplication.translate("UIMainWindow", u"Use the default service guide delays", None))
+#endif // QT_CONFIG(tooltip)
+        self.actionDeviceExportMetrics.setText(QCoreApplication.translate("UIMainWindow", u"Export Metrics", None))
+#if QT_CONFIG(tooltip)
+        self.actionDeviceExportMetrics.setToolTip(QCoreApplication.translate("UIMainWindow", u"Save the transport metrics as JSON or Prometheus text", None))
 #endif // QT_CONFIG(tooltip)
         self.CONFIGURATION.setItemText(0, QCoreApplication.translate("UIMainWindow", u"(EQ) > CHS > DLY > REV", None))
         self.CONFIGURATION.setItemText(1, QCoreApplication.translate("UIMainWindow", u"(EQ) > CHS > DLY   |   (EQ) > CHS > REV", None))
@@ -725,6 +867,7 @@ class Ui_UIMainWindow(object):
 #endif // QT_CONFIG(tooltip)
         self.PROG_SYNC.setText(QCoreApplication.translate("UIMainWindow", u"SYNC", None))
         self.menuFile.setTitle(QCoreApplication.translate("UIMainWindow", u"File", None))
+        self.menuEdit.setTitle(QCoreApplication.translate("UIMainWindow", u"Edit", None))
         self.menuDevice.setTitle(QCoreApplication.translate("UIMainWindow", u"Device", None))
     # retranslateUi
 
@@ -58,17 +58,17 @@ class Ui_SETTINGS(object):
     def setupUi(self, SETTINGS):
         if not SETTINGS.objectName():
             SETTINGS.setObjectName("SETTINGS")
-        SETTINGS.resize(440, 220)
+        SETTINGS.resize(440, 325)
         sizePolicy = QSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
         sizePolicy.setHeightForWidth(SETTINGS.sizePolicy().hasHeightForWidth())
         SETTINGS.setSizePolicy(sizePolicy)
-        SETTINGS.setMinimumSize(QSize(440, 220))
-        SETTINGS.setMaximumSize(QSize(440, 220))
+        SETTINGS.setMinimumSize(QSize(440, 325))
+        SETTINGS.setMaximumSize(QSize(440, 325))
         self.SETTINGS_DIAG = QDialogButtonBox(SETTINGS)
         self.SETTINGS_DIAG.setObjectName("SETTINGS_DIAG")
-        self.SETTINGS_DIAG.setGeometry(QRect(260, 180, 161, 32))
+        self.SETTINGS_DIAG.setGeometry(QRect(260, 285, 161, 32))
         self.SETTINGS_DIAG.setOrientation(Qt.Orientation.Horizontal)
         self.SETTINGS_DIAG.setStandardButtons(
             QDialogButtonBox.StandardButton.Cancel | QDialogButtonBox.StandardButton.Ok
@@ -97,24 +97,68 @@ class Ui_SETTINGS(object):
         self.PORT_OUT_T.setGeometry(QRect(20, 50, 91, 16))
         self.PORT_OUT_T.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.PORT_OUT_T.setLocale(QLocale(QLocale.English, QLocale.UnitedKingdom))
+        self.THRU = QComboBox(SETTINGS)
+        self.THRU.setObjectName("THRU")
+        self.THRU.setGeometry(QRect(110, 73, 321, 32))
+        self.THRU.setMouseTracking(True)
+        self.THRU.setTabletTracking(True)
+        self.THRU.setFocusPolicy(Qt.FocusPolicy.ClickFocus)
+        self.THRU.setLocale(QLocale(QLocale.English, QLocale.UnitedKingdom))
+        self.THRU_T = QLabel(SETTINGS)
+        self.THRU_T.setObjectName("THRU_T")
+        self.THRU_T.setGeometry(QRect(20, 80, 91, 16))
+        self.THRU_T.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.THRU_T.setLocale(QLocale(QLocale.English, QLocale.UnitedKingdom))
         self.CHANNEL = QSpinBox(SETTINGS)
         self.CHANNEL.setObjectName("CHANNEL")
-        self.CHANNEL.setGeometry(QRect(117, 77, 51, 22))
+        self.CHANNEL.setGeometry(QRect(117, 107, 51, 22))
         self.CHANNEL.setMouseTracking(True)
         self.CHANNEL.setTabletTracking(True)
         self.CHANNEL.setMinimum(1)
         self.CHANNEL.setMaximum(16)
         self.CHANNEL_T = QLabel(SETTINGS)
         self.CHANNEL_T.setObjectName("CHANNEL_T")
-        self.CHANNEL_T.setGeometry(QRect(20, 80, 91, 16))
+        self.CHANNEL_T.setGeometry(QRect(20, 110, 91, 16))
         self.CHANNEL_T.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.CHANNEL_T.setLocale(QLocale(QLocale.English, QLocale.UnitedKingdom))
+        self.THRU_RATE = QSpinBox(SETTINGS)
+        self.THRU_RATE.setObjectName("THRU_RATE")
+        self.THRU_RATE.setGeometry(QRect(360, 107, 61, 22))
+        self.THRU_RATE.setMouseTracking(True)
+        self.THRU_RATE.setTabletTracking(True)
+        self.THRU_RATE.setMinimum(1)
+        self.THRU_RATE.setMaximum(500)
+        self.THRU_RATE_T = QLabel(SETTINGS)
+        self.THRU_RATE_T.setObjectName("THRU_RATE_T")
+        self.THRU_RATE_T.setGeometry(QRect(220, 110, 131, 16))
+        self.THRU_RATE_T.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.THRU_RATE_T.setLocale(QLocale(QLocale.English, QLocale.UnitedKingdom))
+        self.THRU_MONO = QComboBox(SETTINGS)
+        self.THRU_MONO.addItem("")
+        self.THRU_MONO.addItem("")
+        self.THRU_MONO.addItem("")
+        self.THRU_MONO.addItem("")
+        self.THRU_MONO.setObjectName("THRU_MONO")
+        self.THRU_MONO.setGeometry(QRect(110, 140, 111, 32))
+        self.THRU_MONO.setFocusPolicy(Qt.FocusPolicy.ClickFocus)
+        self.THRU_MONO.setLocale(QLocale(QLocale.English, QLocale.UnitedKingdom))
+        self.THRU_MONO_T = QLabel(SETTINGS)
+        self.THRU_MONO_T.setObjectName("THRU_MONO_T")
+        self.THRU_MONO_T.setGeometry(QRect(20, 147, 91, 16))
+        self.THRU_MONO_T.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.THRU_MONO_T.setLocale(QLocale(QLocale.English, QLocale.UnitedKingdom))
+        self.OPT_RETRIGGER = QCheckBox(SETTINGS)
+        self.OPT_RETRIGGER.setObjectName("OPT_RETRIGGER")
+        self.OPT_RETRIGGER.setGeometry(QRect(240, 146, 181, 20))
         self.OPT_SEND_BUFFER = QCheckBox(SETTINGS)
         self.OPT_SEND_BUFFER.setObjectName("OPT_SEND_BUFFER")
-        self.OPT_SEND_BUFFER.setGeometry(QRect(20, 120, 251, 20))
+        self.OPT_SEND_BUFFER.setGeometry(QRect(20, 185, 251, 20))
         self.OPT_DUMP_SAVE = QCheckBox(SETTINGS)
         self.OPT_DUMP_SAVE.setObjectName("OPT_DUMP_SAVE")
-        self.OPT_DUMP_SAVE.setGeometry(QRect(20, 150, 251, 20))
+        self.OPT_DUMP_SAVE.setGeometry(QRect(20, 215, 251, 20))
+        self.OPT_LIVE_SLIDERS = QCheckBox(SETTINGS)
+        self.OPT_LIVE_SLIDERS.setObjectName("OPT_LIVE_SLIDERS")
+        self.OPT_LIVE_SLIDERS.setGeometry(QRect(20, 245, 251, 20))
 
         self.retranslateUi(SETTINGS)
         self.SETTINGS_DIAG.accepted.connect(SETTINGS.accept)
@@ -130,7 +174,29 @@ class Ui_SETTINGS(object):
         )
         self.PORT_IN_T.setText(QCoreApplication.translate("SETTINGS", "IN", None))
         self.PORT_OUT_T.setText(QCoreApplication.translate("SETTINGS", "OUT", None))
+        self.THRU_T.setText(QCoreApplication.translate("SETTINGS", "THRU", None))
+#if QT_CONFIG(tooltip)
+        self.THRU.setToolTip(
+            QCoreApplication.translate(
+                "SETTINGS", "Forward this input to the device, thinning modulation streams", None
+            )
+        )
+#endif // QT_CONFIG(tooltip)
         self.CHANNEL_T.setText(QCoreApplication.translate("SETTINGS", "CHANNEL", None))
+        self.THRU_RATE_T.setText(QCoreApplication.translate("SETTINGS", "THRU RATE (MSG/S)", None))
+        self.THRU_MONO_T.setText(QCoreApplication.translate("SETTINGS", "MONO NOTES", None))
+        self.THRU_MONO.setItemText(0, QCoreApplication.translate("SETTINGS", "OFF", None))
+        self.THRU_MONO.setItemText(1, QCoreApplication.translate("SETTINGS", "LAST", None))
+        self.THRU_MONO.setItemText(2, QCoreApplication.translate("SETTINGS", "LOW", None))
+        self.THRU_MONO.setItemText(3, QCoreApplication.translate("SETTINGS", "HIGH", None))
+#if QT_CONFIG(tooltip)
+        self.THRU_MONO.setToolTip(
+            QCoreApplication.translate(
+                "SETTINGS", "Collapse thru notes to one voice when the program modulation source is a note", None
+            )
+        )
+#endif // QT_CONFIG(tooltip)
+        self.OPT_RETRIGGER.setText(QCoreApplication.translate("SETTINGS", "Retrigger held notes", None))
         self.OPT_SEND_BUFFER.setText(
             QCoreApplication.translate(
                 "SETTINGS", "Send buffer to device on prog change", None
@@ -141,5 +207,10 @@ class Ui_SETTINGS(object):
                 "SETTINGS", "Dump program to device on save", None
             )
         )
+        self.OPT_LIVE_SLIDERS.setText(
+            QCoreApplication.translate(
+                "SETTINGS", "Send slider values while dragging", None
+            )
+        )
 
     # retranslateUi
@@ -0,0 +1,141 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from PySide6.QtCore import QSignalBlocker
+from PySide6.QtWidgets import QAbstractSlider, QCheckBox, QComboBox, QLabel, QWidget
+
+from mverb3.core.data import CHORUS_ALGORITHMS, REVERB_ALGORITHMS, MODULATION_SOURCES, MODULATION_DESTINATIONS
+from mverb3.core.model import PROGRAM_FIELDS, Program
+from mverb3.core.schema import (
+    PARAMS_BY_NAME,
+    dly_time_maximum,
+    encode_chrs_type,
+    decode_chrs_type,
+    encode_mod_routing,
+    decode_mod_routing,
+)
+from mverb3.ui.main import Ui_UIMainWindow
+
+__all__ = ["ProgramView"]
+
+# the delay time range depends on the configuration, so the slider is updated after it
+_RENDER_ORDER = ("configuration", *(name for name in PROGRAM_FIELDS if name != "configuration"))
+_DEPENDENTS = {"configuration": ("dly_time",)}
+
+
+class _Binding(NamedTuple):
+    inputs: Tuple[QWidget, ...]  # widgets edited by the user
+    write: Callable[[int], None]  # set the input widgets
+    read: Callable[[], int]  # get the value from the input widgets
+    decorate: Callable[[int], None]  # update labels, tooltips and ranges depending on the value
+    affected: Tuple[QWidget, ...] = ()  # other widgets changed by `decorate`
+
+
+class ProgramView:
+    """Binding of the `Program` fields to the editor widgets.
+
+    `render` updates only the widgets of the fields which differ from the last rendered program and blocks
+    the signals of these widgets only. User changes are reported by the field name to the handler passed to `connect`.
+    """
+
+    def __init__(self, ui: Ui_UIMainWindow):
+        self._ui = ui
+        self._bindings: Dict[str, _Binding] = {
+            "in_eq": self._slider("in_eq", ui.IN_EQ, ui.IN_EQ_L),
+            "out_eq": self._slider("out_eq", ui.OUT_EQ, ui.OUT_EQ_L),
+            "chrs_type": _Binding(
+                (ui.CHRS_TYPE, ui.CHRS_STEREO),
+                self._write_chrs_type,
+                lambda: encode_chrs_type(ui.CHRS_TYPE.currentIndex(), ui.CHRS_STEREO.isChecked()),
+                lambda value: ui.CHRS_TYPE.setToolTip(CHORUS_ALGORITHMS[value // 2]['characteristics']),
+            ),
+            "chrs_speed": self._slider("chrs_speed", ui.CHRS_SPEED, ui.CHRS_SPEED_L),
+            "dly_time": self._slider("dly_time", ui.DLY_TIME, ui.DLY_TIME_L),
+            "dly_regen": self._slider("dly_regen", ui.DLY_REGEN, ui.DLY_REGEN_L),
+            "rev_type": _Binding(
+                (ui.REVERB_TYPE,),
+                ui.REVERB_TYPE.setCurrentIndex,
+                ui.REVERB_TYPE.currentIndex,
+                lambda value: ui.REVERB_TYPE.setToolTip(REVERB_ALGORITHMS[value]['characteristics']),
+            ),
+            "rev_decay": self._slider("rev_decay", ui.REV_DECAY, ui.REV_DECAY_L),
+            "rev_mix": self._slider("rev_mix", ui.REV_MIX, ui.REV_MIX_L),
+            "dly_mix": self._slider("dly_mix", ui.DLY_MIX, ui.DLY_MIX_L),
+            "configuration": _Binding(
+                (ui.CONFIGURATION,),
+                ui.CONFIGURATION.setCurrentIndex,
+                ui.CONFIGURATION.currentIndex,
+                lambda value: ui.DLY_TIME.setMaximum(dly_time_maximum(value)),
+                (ui.DLY_TIME,),
+            ),
+            "mod_routing": _Binding(
+                (ui.MOD_SOURCE, ui.MOD_DEST),
+                self._write_mod_routing,
+                lambda: encode_mod_routing(ui.MOD_SOURCE.currentIndex(), ui.MOD_DEST.currentIndex()),
+                self._decorate_mod_routing,
+            ),
+            "mod_amount": self._slider("mod_amount", ui.MOD_AMT, ui.MOD_AMT_L),
+        }
+        self._rendered: Dict[str, Optional[int]] = dict.fromkeys(PROGRAM_FIELDS)
+
+    def connect(self, handler: Callable[[str], None]) -> None:
+        """Call the handler with the field name when the user changes a bound widget."""
+        for name, binding in self._bindings.items():
+            for widget in binding.inputs:
+                self._connect(widget, lambda *_, field=name: handler(field))
+
+    def render(self, program: Program) -> List[str]:
+        """Update the widgets of the changed fields and get their names."""
+        values = dict(zip(PROGRAM_FIELDS, program.values()))
+        changed = [name for name in _RENDER_ORDER if values[name] != self._rendered[name]]
+        for name in list(changed):
+            for dependent in _DEPENDENTS.get(name, ()):
+                if dependent not in changed:
+                    changed.append(dependent)
+        for name in changed:
+            binding = self._bindings[name]
+            blockers = [QSignalBlocker(widget) for widget in (*binding.inputs, *binding.affected)]
+            binding.decorate(values[name])
+            binding.write(values[name])
+            blockers.clear()
+            self._rendered[name] = values[name]
+        return changed
+
+    def read(self, name: str) -> int:
+        """Get the value of a field edited by the user and update its labels."""
+        binding = self._bindings[name]
+        value = self._rendered[name] = binding.read()
+        binding.decorate(value)
+        return value
+
+    def dragging(self, name: str) -> bool:
+        return any(isinstance(widget, QAbstractSlider) and widget.isSliderDown() for widget in self._bindings[name].inputs)
+
+    @staticmethod
+    def _connect(widget: QWidget, slot: Callable) -> None:
+        if isinstance(widget, QAbstractSlider):
+            widget.valueChanged.connect(slot)
+            widget.sliderReleased.connect(slot)
+        elif isinstance(widget, QComboBox):
+            widget.currentIndexChanged.connect(slot)
+        elif isinstance(widget, QCheckBox):
+            widget.stateChanged.connect(slot)
+
+    @staticmethod
+    def _slider(name: str, slider: QAbstractSlider, label: QLabel) -> _Binding:
+        param = PARAMS_BY_NAME[name]
+        return _Binding((slider,), slider.setValue, slider.value, lambda value: label.setText(param.label(value)))
+
+    def _write_chrs_type(self, value: int) -> None:
+        algorithm, stereo = decode_chrs_type(value)
+        self._ui.CHRS_TYPE.setCurrentIndex(algorithm)
+        self._ui.CHRS_STEREO.setChecked(stereo)
+
+    def _write_mod_routing(self, value: int) -> None:
+        source, destination = decode_mod_routing(value)
+        self._ui.MOD_SOURCE.setCurrentIndex(source)
+        self._ui.MOD_DEST.setCurrentIndex(destination)
+        self._decorate_mod_routing(value)
+
+    def _decorate_mod_routing(self, _: int) -> None:
+        self._ui.MOD_SOURCE.setToolTip(MODULATION_SOURCES[self._ui.MOD_SOURCE.currentIndex()]['description'])
+        self._ui.MOD_DEST.setToolTip(MODULATION_DESTINATIONS[self._ui.MOD_DEST.currentIndex()]['description'])
@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from mverb3 import cli
+from mverb3.core.bank import BANK
+
+
+def test_from_json_reports_bad_files_and_goes_on(tmp_path, capsys):
+    source = tmp_path / "json"
+    source.mkdir()
+    obj = cli.bank_to_json(BANK)
+    (source / "good.json").write_text(json.dumps(obj))
+    negative = json.loads(json.dumps(obj))
+    negative["programs"][0]["rev_decay"] = -5
+    (source / "negative.json").write_text(json.dumps(negative))
+    too_many = json.loads(json.dumps(obj))
+    too_many["programs"].append(too_many["programs"][0])
+    (source / "too_many.json").write_text(json.dumps(too_many))
+
+    with pytest.raises(SystemExit) as exc_info:
+        cli.main(["-j", "1", "from-json", "-o", str(tmp_path / "out"), str(source)])
+
+    assert exc_info.value.code == 1
+    out = capsys.readouterr().out
+    assert "FAIL" in out and "negative.json: ValueError: rev_decay" in out
+    assert "too_many.json: ValueError: expected 100 programs" in out
+    assert "Done: 1 ok, 2 failed" in out
+    assert (tmp_path / "out" / "good.syx").exists()